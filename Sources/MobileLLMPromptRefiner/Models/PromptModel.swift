@@ -51,6 +51,7 @@ struct PerformanceMetrics: Codable {
     var privacyScore: Double // Percentage (e.g., 83 for 83% protection)
     var processingTime: TimeInterval
     var memoryUsage: Double // MB
+    var scaffoldTokensSaved: Int? // Tokens not spent on a duplicated scaffold
 
     static let mock = PerformanceMetrics(
         latencyReduction: 22.4,
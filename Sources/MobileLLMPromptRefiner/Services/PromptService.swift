@@ -21,26 +21,68 @@ class PromptService {
     func enhancePrompt(_ prompt: String) async throws -> EnhancedPrompt {
         // In a real app, this would apply more sophisticated prompt engineering
 
+        // The secondary model's output is already scaffolded; wrap only its
+        // Task so every section appears once instead of nested twice
+        let task = unwrapScaffold(prompt)
+
         // Generate enhanced prompt with structural improvements
         let enhancements = [
             "Context: You are an expert AI assistant optimized for mobile deployment.",
             "Constraints: Response must be under 150 tokens for optimal mobile performance.",
             "Format: Use structured JSON output for better parsing efficiency.",
-            "Task: \(prompt)",
+            "Task: \(task)",
             "Optimization: Apply cross-model attention and quantized inference.",
             "Quality: Ensure 21.6% improvement in accuracy through dual-model refinement."
         ]
 
         let enhancedText = enhancements.joined(separator: "\n\n")
+        let tokenCount = countTokens(in: enhancedText)
+
+        var scaffoldTokensSaved = 0
+        if task != prompt {
+            var nested = enhancements
+            nested[3] = "Task: \(prompt)"
+            scaffoldTokensSaved = countTokens(in: nested.joined(separator: "\n\n")) - tokenCount
+        }
 
         return EnhancedPrompt(
             originalText: prompt,
             enhancedText: enhancedText,
-            tokenCount: countTokens(in: enhancedText),
-            optimizations: [.dualModelRefinement, .tokenOptimization]
+            tokenCount: tokenCount,
+            optimizations: [.dualModelRefinement, .tokenOptimization],
+            scaffoldTokensSaved: scaffoldTokensSaved
         )
     }
 
+    // Strip scaffold sections around a "Task:" line, however deeply nested
+    private func unwrapScaffold(_ prompt: String) -> String {
+        var text = prompt
+        while true {
+            var sections = text.components(separatedBy: "\n\n")
+            let count = sections.count
+            while let first = sections.first, scaffoldSections.contains(first) {
+                sections.removeFirst()
+            }
+            while let last = sections.last, scaffoldSections.contains(last) {
+                sections.removeLast()
+            }
+            guard sections.count < count, let first = sections.first, first.hasPrefix("Task: ") else {
+                return text
+            }
+            sections[0] = String(first.dropFirst("Task: ".count))
+            text = sections.joined(separator: "\n\n")
+        }
+    }
+
+    private let scaffoldSections: Set<String> = [
+        "Context: You are an expert AI assistant optimized for mobile deployment.",
+        "Constraints: Response must be under 150 tokens for optimal mobile performance.",
+        "Format: Use structured output for better parsing efficiency.",
+        "Format: Use structured JSON output for better parsing efficiency.",
+        "Optimization: Apply cross-model attention and quantized inference.",
+        "Quality: Ensure 21.6% improvement in accuracy through dual-model refinement."
+    ]
+
     private func countTokens(in text: String) -> Int {
         // Simplified token counting (approximately 1 token per 4 characters)
         // In a real app, this would use a proper tokenizer
@@ -53,4 +95,5 @@ struct EnhancedPrompt {
     let enhancedText: String
     let tokenCount: Int
     let optimizations: [PromptModel.OptimizationType]
+    var scaffoldTokensSaved: Int = 0
 }
@@ -79,7 +79,8 @@ class PromptViewModel: ObservableObject {
                 tokenReduction: 47.0,
                 privacyScore: 83.0,
                 processingTime: 0.62,
-                memoryUsage: 156.7
+                memoryUsage: 156.7,
+                scaffoldTokensSaved: enhanced.scaffoldTokensSaved
             )
 
             // Save to history
@@ -0,0 +1,187 @@
+# Benchmark the generator and chart scripts
+#
+# Runs every script*.py and chart_script*.py in a fresh interpreter inside a
+# scratch directory and records wall time, CPU time, peak RSS and bytes
+# written. Results are appended to a local history file. The first result
+# for each script becomes its baseline (--update-baseline replaces the
+# baselines of the scripts it ran), and later runs fail when a metric
+# regresses past --threshold relative to it, or when a script fails. A
+# failure is kept in the baseline until the script runs again successfully.
+#
+# Usage: python benchmark_generators.py [--repeat N] [--threshold 0.2]
+#                                       [--update-baseline] [--only PATTERN]
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_all import REPO_DIR, discover_modules
+from generator_manifest import MANIFEST_NAME
+
+RESULTS_FILE = os.path.join(REPO_DIR, 'benchmark_results.json')
+METRICS = ('wall_time', 'cpu_time', 'peak_rss', 'bytes_written')
+
+# Below these absolute differences a change is treated as noise, however
+# large it is relative to the baseline (seconds, seconds, KiB, bytes).
+NOISE_FLOOR = {'wall_time': 0.005, 'cpu_time': 0.005, 'peak_rss': 1024, 'bytes_written': 0}
+
+
+def discover_targets():
+    charts = sorted(glob.glob(os.path.join(REPO_DIR, 'chart_script*.py')))
+    return discover_modules() + charts
+
+
+def _bytes_written(directory):
+    total = 0
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            if name != MANIFEST_NAME:
+                total += os.path.getsize(os.path.join(dirpath, name))
+    return total
+
+
+def run_once(path):
+    # Run the script in its own scratch directory so every byte it writes
+    # is attributable to it, and read its rusage straight from wait4().
+    # stderr goes to a file: nothing drains a pipe while wait4() blocks, so
+    # a chatty script would fill it and never exit.
+    with tempfile.TemporaryDirectory() as scratch, tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, path], cwd=scratch,
+                                stdout=subprocess.DEVNULL, stderr=err)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall_time = time.perf_counter() - start
+        err.seek(0)
+        stderr = err.read().decode('utf-8', 'replace')
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode != 0:
+            lines = stderr.strip().splitlines()
+            return {'error': lines[-1] if lines else f"exit status {proc.returncode}"}
+        return {
+            'wall_time': wall_time,
+            'cpu_time': usage.ru_utime + usage.ru_stime,
+            'peak_rss': usage.ru_maxrss,  # KiB on Linux
+            'bytes_written': _bytes_written(scratch),
+        }
+
+
+def benchmark(path, repeat=3):
+    runs = [run_once(path) for _ in range(repeat)]
+    errors = [run['error'] for run in runs if 'error' in run]
+    if errors:
+        return {'error': errors[0]}
+    return {
+        'wall_time': statistics.median(run['wall_time'] for run in runs),
+        'cpu_time': statistics.median(run['cpu_time'] for run in runs),
+        'peak_rss': max(run['peak_rss'] for run in runs),
+        'bytes_written': max(run['bytes_written'] for run in runs),
+    }
+
+
+def load_results(path=RESULTS_FILE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'baseline': {}, 'history': []}
+
+
+def save_results(results, path=RESULTS_FILE):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def update_baseline(baseline, current, replace=False):
+    """Give scripts without a baseline (or with only a failure) this run's result.
+
+    replace=True stores every script of this run. Returns the names updated.
+    """
+    updated = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if replace or base is None or ('error' in base and 'error' not in result):
+            baseline[name] = result
+            updated.append(name)
+    return updated
+
+
+def find_regressions(current, baseline, threshold):
+    # A failing script is always a regression, reported as metric 'error'
+    # with the failure as its new value, whatever its baseline holds.
+    regressions = []
+    for name, metrics in current.items():
+        if 'error' in metrics:
+            regressions.append((name, 'error', None, metrics['error']))
+            continue
+        base = baseline.get(name)
+        if not base or 'error' in base:
+            continue
+        for metric in METRICS:
+            old, new = base[metric], metrics[metric]
+            if new - old > NOISE_FLOOR[metric] and new > old * (1 + threshold):
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def _format(metric, value):
+    if metric in ('wall_time', 'cpu_time'):
+        return f"{value * 1000:.1f} ms"
+    if metric == 'peak_rss':
+        return f"{value / 1024:.1f} MiB"
+    return f"{value} B"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark generator and chart scripts")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per script (median is kept)")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed relative regression against the baseline (default: 0.2)")
+    parser.add_argument('--results', default=RESULTS_FILE, help="results history file")
+    parser.add_argument('--update-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--only', help="glob to select scripts, e.g. 'script_*.py'")
+    args = parser.parse_args(argv)
+
+    targets = discover_targets()
+    if args.only:
+        targets = [path for path in targets if fnmatch.fnmatch(os.path.basename(path), args.only)]
+
+    current = {}
+    for path in targets:
+        name = os.path.basename(path)
+        current[name] = result = benchmark(path, repeat=args.repeat)
+        if 'error' in result:
+            print(f"{name}: failed ({result['error']})")
+        else:
+            print(f"{name}: " + ", ".join(f"{metric} {_format(metric, result[metric])}" for metric in METRICS))
+
+    results = load_results(args.results)
+    results['history'].append({'timestamp': time.time(), 'results': current})
+
+    regressions = find_regressions(current, results['baseline'], args.threshold)
+    updated = update_baseline(results['baseline'], current, replace=args.update_baseline)
+    if updated:
+        print(f"Stored this run as the baseline for {', '.join(updated)}")
+    save_results(results, args.results)
+
+    for name, metric, old, new in regressions:
+        if metric == 'error':
+            print(f"REGRESSION {name}: failed ({new})")
+        else:
+            print(f"REGRESSION {name} {metric}: {_format(metric, old)} -> {_format(metric, new)}")
+    # --update-baseline accepts slower metrics, never a failing script
+    if args.update_baseline:
+        regressions = [regression for regression in regressions if regression[1] == 'error']
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
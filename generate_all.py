@@ -0,0 +1,187 @@
+# Regenerate every Swift source and doc in one run
+#
+# Finds the generator modules (script.py, script_1.py ... script_7.py),
+# renders them concurrently in a process pool and writes the results
+# straight into the Sources/MobileLLMPromptRefiner layout, replacing the
+# manual `mv` steps from the GitHub setup guide. Unchanged files are skipped
+# through the manifest in generator_manifest.py.
+#
+# The same generators can be rendered in memory without touching disk:
+#
+#     from generate_all import render_all
+#     files = render_all()  # {relative_path: content}
+#     files = render_all({'primaryModel': 'claude3', 'chunkSize': 256})
+#
+# Config keys mirror LLMConfiguration; see swift_templates.py for the full
+# list and defaults.
+#
+# `--profile benchmark` renders the headless benchmark build: the services
+# without their simulated Task.sleep delays and PromptViewModel reporting
+# each step's real duration. Write it outside the tree, e.g.
+# `--profile benchmark --root build/benchmark`.
+#
+# `--check` renders everything in memory and compares it with the files on
+# disk instead of writing, printing a unified diff for each mismatch and
+# exiting non-zero; it is fast enough to run as a pre-commit hook.
+#
+# Usage: python generate_all.py [--root DIR] [--jobs N] [--config FILE] [--profile NAME] [--watch | --check]
+import argparse
+import difflib
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from generator_manifest import collect, content_hash, write_outputs
+from swift_templates import PROFILES
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_modules = {}
+
+
+def discover_modules(directory=REPO_DIR):
+    # script.py first, then script_1.py, script_2.py, ... in numeric order
+    def order(path):
+        match = re.search(r'script_(\d+)\.py$', path)
+        return int(match.group(1)) if match else 0
+
+    return sorted(glob.glob(os.path.join(directory, 'script*.py')), key=order)
+
+
+def load_module(path, reload=False):
+    # Import a generator module once per process; importing has no side
+    # effects because the write step only runs under __main__. The watcher
+    # passes reload=True to pick up edits without restarting.
+    if reload or path not in _modules:
+        if REPO_DIR not in sys.path:
+            sys.path.insert(0, REPO_DIR)
+        name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(f'_generator_{name}', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[path] = module
+    return _modules[path]
+
+
+def load_generators():
+    """Return {artifact_name: generator} across every generator module."""
+    generators = {}
+    for path in discover_modules():
+        generators.update(load_module(path).GENERATORS)
+    return generators
+
+
+def render_all(config=None):
+    """Render every artifact in memory as {relative_path: content}."""
+    files = {}
+    for generator in load_generators().values():
+        files.update(generator(config))
+    return files
+
+
+def render_module(path, config=None):
+    # Worker entry point: render one module and report how long it took
+    start = time.perf_counter()
+    module = load_module(path)
+    outputs = collect(module.GENERATORS, config)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name, outputs, time.perf_counter() - start
+
+
+def generate_all(root=REPO_DIR, jobs=None, config=None, verbose=True):
+    start = time.perf_counter()
+    timings = {}
+    rendered = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        modules = discover_modules()
+        results = pool.map(render_module, modules, [config] * len(modules))
+        for name, outputs, elapsed in results:
+            timings[name] = elapsed
+            rendered.update(outputs)
+
+    write_start = time.perf_counter()
+    written, skipped = write_outputs(rendered, root=root, verbose=verbose)
+    write_time = time.perf_counter() - write_start
+    total = time.perf_counter() - start
+
+    if verbose:
+        print("\nPer-module render time:")
+        for name, elapsed in timings.items():
+            print(f"- {name}: {elapsed * 1000:.1f} ms")
+        print(f"Write: {write_time * 1000:.1f} ms")
+        print(f"Total: {total * 1000:.1f} ms for {len(rendered)} artifacts")
+    return written, skipped, timings
+
+
+def _compare(root, rel_path, content):
+    # Returns None when the file on disk matches, else (rel_path, content, actual)
+    try:
+        with open(os.path.join(root, rel_path), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return rel_path, content, None
+    if hashlib.sha256(data).hexdigest() == content_hash(content):
+        return None
+    return rel_path, content, data.decode('utf-8', 'replace')
+
+
+def check(root=REPO_DIR, config=None, jobs=None, verbose=True):
+    """Compare rendered generators with the tree on disk; returns the mismatches."""
+    start = time.perf_counter()
+    files = render_all(config)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(lambda item: _compare(root, *item), files.items())
+        mismatches = [result for result in results if result is not None]
+
+    if verbose:
+        for rel_path, expected, actual in mismatches:
+            if actual is None:
+                print(f"{rel_path}: missing on disk")
+                continue
+            sys.stdout.writelines(difflib.unified_diff(
+                actual.splitlines(keepends=True),
+                expected.splitlines(keepends=True),
+                fromfile=f'a/{rel_path} (on disk)',
+                tofile=f'b/{rel_path} (generated)',
+            ))
+        elapsed = (time.perf_counter() - start) * 1000
+        status = f"{len(mismatches)} drifted" if mismatches else "all up to date"
+        print(f"Checked {len(files)} artifacts in {elapsed:.1f} ms: {status}")
+    return mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Regenerate all Swift sources and docs")
+    parser.add_argument('--root', default=REPO_DIR, help="output root (default: repository)")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--config', help="JSON file with LLMConfiguration overrides")
+    parser.add_argument('--profile', choices=list(PROFILES),
+                        help="generation profile (default: app; overrides the config file's)")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and regenerate whenever a generator module changes")
+    parser.add_argument('--check', action='store_true',
+                        help="compare generated output with the files on disk without writing")
+    args = parser.parse_args()
+
+    config = None
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config = json.load(f)
+    if args.profile:
+        config = {**(config or {}), 'profile': args.profile}
+
+    if args.check:
+        sys.exit(1 if check(root=args.root, config=config, jobs=args.jobs) else 0)
+
+    generate_all(root=args.root, jobs=args.jobs, config=config)
+
+    if args.watch:
+        from generator_watch import watch
+        watch(root=args.root, config=config)
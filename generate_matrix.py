@@ -0,0 +1,146 @@
+# Render every LLMConfiguration combination in one pass
+#
+# Each variant (primary model x optimization level x quantization x chunk
+# size) is rendered in memory with generate_all.render_all() and laid out as
+# <root>/<variant>/<relative_path>. Files that are byte-identical across
+# variants are stored once in a shared content store (<root>/.objects) and
+# hardlinked into each variant, so a few hundred variants cost little more
+# disk and time than one. A variants.json index records the config and the
+# content hash of every file per variant.
+#
+# Usage: python generate_matrix.py [--root DIR] [--chunk-sizes 64,128,256,512]
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import time
+
+from generate_all import REPO_DIR, render_all
+from swift_templates import MODEL_NAMES, OPTIMIZATION_LEVELS, QUANTIZATION_LEVELS
+
+DEFAULT_ROOT = os.path.join(REPO_DIR, 'build', 'variants')
+DEFAULT_CHUNK_SIZES = (64, 128, 256, 512)
+OBJECTS_DIR = '.objects'
+INDEX_NAME = 'variants.json'
+
+
+def variant_configs(models=None, levels=None, quantizations=None, chunk_sizes=DEFAULT_CHUNK_SIZES):
+    # Yields (variant_name, config) for the full cross product
+    combos = itertools.product(
+        models or list(MODEL_NAMES),
+        levels or list(OPTIMIZATION_LEVELS),
+        quantizations or list(QUANTIZATION_LEVELS),
+        chunk_sizes,
+    )
+    for model, level, quantization, chunk_size in combos:
+        name = f'{model}-{level}-{quantization}-chunk{chunk_size}'
+        yield name, {
+            'primaryModel': model,
+            'optimizationLevel': level,
+            'quantization': quantization,
+            'chunkSize': chunk_size,
+        }
+
+
+class ContentStore:
+    """Content-addressed object store that hardlinks objects into place."""
+
+    def __init__(self, root):
+        self.root = os.path.join(root, OBJECTS_DIR)
+        self._digests = {}
+        self.objects_written = 0
+        self.bytes_written = 0
+        self.links = 0
+
+    def digest(self, content):
+        # Identical strings recur across variants; hash each distinct one once
+        digest = self._digests.get(content)
+        if digest is None:
+            digest = self._digests[content] = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return digest
+
+    def object_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def store(self, content):
+        digest = self.digest(content)
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = content.encode('utf-8')
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.objects_written += 1
+            self.bytes_written += len(data)
+        return digest, path
+
+    def place(self, content, dest):
+        digest, source = self.store(content)
+        try:
+            if os.path.samefile(source, dest):
+                return digest
+        except OSError:
+            pass
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp_path = dest + '.tmp'
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            # Filesystems without hardlinks fall back to a plain copy
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, dest)
+        self.links += 1
+        return digest
+
+
+def generate_matrix(root=DEFAULT_ROOT, chunk_sizes=DEFAULT_CHUNK_SIZES, verbose=True, **axes):
+    start = time.perf_counter()
+    store = ContentStore(root)
+    index = {}
+    logical_bytes = 0
+
+    for name, config in variant_configs(chunk_sizes=chunk_sizes, **axes):
+        files = {}
+        for rel_path, content in render_all(config).items():
+            files[rel_path] = store.place(content, os.path.join(root, name, rel_path))
+            logical_bytes += len(content.encode('utf-8'))
+        index[name] = {'config': config, 'files': files}
+
+    with open(os.path.join(root, INDEX_NAME), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+    if verbose:
+        unique = len({digest for variant in index.values() for digest in variant['files'].values()})
+        print(f"Rendered {len(index)} variants in {time.perf_counter() - start:.2f} s")
+        print(f"- {unique} unique files backing {sum(len(v['files']) for v in index.values())} variant files")
+        print(f"- {store.objects_written} new objects, {store.bytes_written / 1024:.1f} KiB written "
+              f"({logical_bytes / 1024:.1f} KiB logical)")
+        print(f"- {store.links} links updated")
+    return index
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render every LLMConfiguration variant")
+    parser.add_argument('--root', default=DEFAULT_ROOT, help="output root (default: build/variants)")
+    parser.add_argument('--chunk-sizes', default=','.join(map(str, DEFAULT_CHUNK_SIZES)),
+                        help="comma-separated chunk sizes")
+    parser.add_argument('--models', help="comma-separated LLMModel cases (default: all)")
+    parser.add_argument('--levels', help="comma-separated OptimizationLevel cases (default: all)")
+    parser.add_argument('--quantizations', help="comma-separated QuantizationLevel cases (default: all)")
+    args = parser.parse_args()
+
+    def split(value):
+        return value.split(',') if value else None
+
+    generate_matrix(
+        root=args.root,
+        chunk_sizes=[int(size) for size in args.chunk_sizes.split(',')],
+        models=split(args.models),
+        levels=split(args.levels),
+        quantizations=split(args.quantizations),
+    )
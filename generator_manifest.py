@@ -0,0 +1,122 @@
+# Incremental writer for the generated Swift sources and docs
+#
+# Every generator script hands its rendered artifacts to write_outputs().
+# A single manifest (.generator_manifest.json in the output root) records
+# the SHA-256 and on-disk stat of each artifact by relative path (one
+# generator may render several files), so a run only rewrites
+# files whose rendered content actually changed. Unchanged files keep their
+# bytes and mtimes, which keeps Xcode/SwiftPM from recompiling them.
+import hashlib
+import json
+import os
+import shutil
+
+MANIFEST_NAME = '.generator_manifest.json'
+SOURCES_DIR = 'Sources/MobileLLMPromptRefiner'
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def collect(generators, config=None):
+    """Render {artifact_name: generator} into {relative_path: content}."""
+    outputs = {}
+    for generator in generators.values():
+        outputs.update(generator(config))
+    return outputs
+
+
+def load_manifest(root='.'):
+    path = os.path.join(root, MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'artifacts': {}}
+    # Manifests written before records were keyed by path held one record
+    # per artifact name; those are dropped and rebuilt from the files
+    artifacts = manifest.get('artifacts', {})
+    manifest['artifacts'] = {rel_path: record for rel_path, record in artifacts.items()
+                             if 'path' not in record}
+    return manifest
+
+
+def save_manifest(manifest, root='.'):
+    path = os.path.join(root, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def _file_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _is_current(path, digest, record):
+    # Fast path: the manifest already holds this hash and the file on disk
+    # still has the size and mtime we recorded when we last wrote it.
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    if (record and record.get('sha256') == digest
+            and record.get('size') == st.st_size
+            and record.get('mtime_ns') == st.st_mtime_ns):
+        return True
+    # Slow path: the file was touched or the manifest is missing, so compare
+    # the actual bytes before deciding to rewrite it.
+    return _file_hash(path) == digest
+
+
+def write_outputs(outputs, root='.', verbose=True):
+    """Write {relative_path: content} under root.
+
+    Returns (written, skipped) lists of relative paths.
+    """
+    manifest = load_manifest(root)
+    artifacts = manifest['artifacts']
+    written, skipped = [], []
+
+    for rel_path, content in outputs.items():
+        path = os.path.join(root, rel_path)
+        digest = content_hash(content)
+        record = artifacts.get(rel_path)
+
+        if _is_current(path, digest, record):
+            skipped.append(rel_path)
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(content.encode('utf-8'))
+            # Replacing the file would otherwise reset its permission bits
+            if os.path.exists(path):
+                shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+            written.append(rel_path)
+
+        st = os.stat(path)
+        artifacts[rel_path] = {
+            'sha256': digest,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+        }
+
+    save_manifest(manifest, root)
+
+    if verbose:
+        print(f"Wrote {len(written)} file(s), skipped {len(skipped)} unchanged:")
+        for rel_path in written:
+            print(f"- {rel_path} (written)")
+        for rel_path in skipped:
+            print(f"- {rel_path} (unchanged)")
+    return written, skipped
@@ -0,0 +1,155 @@
+# Watch the generator modules and regenerate only what changed
+#
+# Runs in a single long-lived interpreter so imports and compiled templates
+# stay warm. When script_4.py is saved, only its generators
+# (prompt_refiner_view, techniques_view) are re-rendered and written through
+# the manifest. On Linux the repository directory is watched with inotify via
+# ctypes; elsewhere we fall back to polling mtimes.
+#
+# Usage: python generate_all.py --watch   (or python generator_watch.py)
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import time
+import traceback
+
+from generate_all import REPO_DIR, discover_modules, load_module
+from generator_manifest import collect, write_outputs
+
+WATCH_PATTERN = 'script*.py'
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Editors often save in several syscalls; coalesce events this close together
+SETTLE_SECONDS = 0.01
+
+
+class InotifyWatcher:
+    """Directory watcher backed by inotify(7)."""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def _drain(self):
+        names = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0').decode()
+                offset += length
+                if fnmatch.fnmatch(name, WATCH_PATTERN):
+                    names.add(name)
+
+    def wait(self):
+        # Block until at least one generator module changed, then let the
+        # burst of events from a single save settle before returning.
+        while True:
+            select.select([self._fd], [], [])
+            names = self._drain()
+            while select.select([self._fd], [], [], SETTLE_SECONDS)[0]:
+                names |= self._drain()
+            if names:
+                return names
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback that compares mtimes on an interval."""
+
+    def __init__(self, directory, interval=0.1):
+        self._directory = directory
+        self._interval = interval
+        self._mtimes = self._scan()
+
+    def _scan(self):
+        mtimes = {}
+        for path in discover_modules(self._directory):
+            try:
+                mtimes[os.path.basename(path)] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        return mtimes
+
+    def wait(self):
+        while True:
+            time.sleep(self._interval)
+            mtimes = self._scan()
+            names = {name for name, mtime in mtimes.items() if self._mtimes.get(name) != mtime}
+            self._mtimes = mtimes
+            if names:
+                return names
+
+    def close(self):
+        pass
+
+
+def make_watcher(directory=REPO_DIR):
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directory)
+
+
+def regenerate(name, root=REPO_DIR, config=None):
+    # Re-import one generator module and write just its artifacts
+    start = time.perf_counter()
+    module = load_module(os.path.join(REPO_DIR, name), reload=True)
+    outputs = collect(module.GENERATORS, config)
+    written, skipped = write_outputs(outputs, root=root, verbose=False)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{name}: {', '.join(outputs)} -> {len(written)} written, "
+          f"{len(skipped)} unchanged ({elapsed:.1f} ms)")
+    return written, skipped
+
+
+def watch(root=REPO_DIR, config=None):
+    watcher = make_watcher(REPO_DIR)
+    print(f"Watching {WATCH_PATTERN} with {type(watcher).__name__} (Ctrl-C to stop)")
+    try:
+        while True:
+            for name in sorted(watcher.wait()):
+                if not os.path.exists(os.path.join(REPO_DIR, name)):
+                    continue
+                try:
+                    regenerate(name, root=root, config=config)
+                except Exception:
+                    # Keep watching through syntax errors while a file is mid-edit
+                    traceback.print_exc()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Regenerate generator outputs on save")
+    parser.add_argument('--root', default=REPO_DIR, help="output root (default: repository)")
+    args = parser.parse_args()
+    watch(root=args.root)
@@ -0,0 +1,74 @@
+# Headless Python reference engine for the prompt refinement pipeline
+#
+# Mirrors the Swift services (LLMService, PromptService, OptimizationService)
+# and PromptViewModel.refinePrompt so refinement can run and be benchmarked
+# on Linux servers:
+#
+#     from prompt_refiner import RefinementPipeline
+#     result = RefinementPipeline().refine("Create a story about AI")
+#     results = RefinementPipeline().refine_batch(prompts, jobs=None)
+from .batching import BatchScheduler, BatchStats
+from .chunking import CONTENT_DEFINED, FIXED, ChunkCache, chunk_spans, iter_stream_chunks
+from .compression import CompressionResult, Compressor, compress
+from .config import LLMConfiguration, LLMModel, OptimizationLevel, QuantizationLevel
+from .executor import PipelinedExecutor
+from .incremental import IncrementalEncoding
+from .kv_cache import CacheStats, PagedKVCache
+from .model import DecoderModel, KVCache, KVCacheFull, ModelConfig, load_local_model
+from .models import (EnhancedPrompt, LLMResponse, OptimizationType, PerformanceMetrics,
+                     RefinementStep, StepStatus)
+from .pipeline import RefinementPipeline, RefinementResult, refine_batch
+from .response_cache import ResponseCache, ResponseCacheStats, canonical_prompt
+from .scaffold import CompiledScaffold, compile_scaffold
+from .services import LLMService, OptimizationError, OptimizationService, PromptService
+from .speculative import SpeculativeDecoder, SpeculativeStats
+from .tokenizer import BPETokenizer, count_tokens, default_tokenizer
+
+__all__ = [
+    'BPETokenizer',
+    'BatchScheduler',
+    'BatchStats',
+    'CONTENT_DEFINED',
+    'CacheStats',
+    'ChunkCache',
+    'CompiledScaffold',
+    'CompressionResult',
+    'Compressor',
+    'DecoderModel',
+    'EnhancedPrompt',
+    'FIXED',
+    'IncrementalEncoding',
+    'KVCache',
+    'KVCacheFull',
+    'LLMConfiguration',
+    'LLMModel',
+    'LLMResponse',
+    'LLMService',
+    'ModelConfig',
+    'OptimizationError',
+    'OptimizationLevel',
+    'OptimizationService',
+    'OptimizationType',
+    'PagedKVCache',
+    'PerformanceMetrics',
+    'PipelinedExecutor',
+    'PromptService',
+    'QuantizationLevel',
+    'RefinementPipeline',
+    'RefinementResult',
+    'RefinementStep',
+    'ResponseCache',
+    'ResponseCacheStats',
+    'SpeculativeDecoder',
+    'SpeculativeStats',
+    'StepStatus',
+    'canonical_prompt',
+    'chunk_spans',
+    'compile_scaffold',
+    'compress',
+    'count_tokens',
+    'default_tokenizer',
+    'iter_stream_chunks',
+    'load_local_model',
+    'refine_batch',
+]
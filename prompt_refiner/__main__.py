@@ -0,0 +1,86 @@
+# Command-line entry point: refine a prompt or benchmark pipeline throughput
+#
+# Usage: python -m prompt_refiner "Create a story about AI"
+#        python -m prompt_refiner --bench 10000 [--jobs N]
+#
+# --local runs the secondary model slot on its local NumPy stand-in
+# (model.py) instead of the instant mock; --speculative K also runs the
+# primary slot locally, with the secondary model drafting K tokens a pass.
+# --cache FILE answers repeated prompts from a persistent response cache.
+# --compress removes filler and duplicate sentences from the task's prose.
+import argparse
+import time
+
+from .compression import Compressor
+from .config import LLMConfiguration
+from .model import load_local_model
+from .pipeline import RefinementPipeline
+from .response_cache import ResponseCache
+from .services import LLMService
+
+SAMPLE_PROMPTS = [
+    "Create a story about AI",
+    "Explain how quantized inference reduces memory on mobile devices",
+    "Summarize the key points of this meeting and list action items",
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m prompt_refiner', description="Refine prompts headlessly")
+    parser.add_argument('prompt', nargs='?', help="prompt to refine")
+    parser.add_argument('--bench', type=int, metavar='N', help="refine N sample prompts and report throughput")
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes for --bench (0 = all cores)")
+    parser.add_argument('--local', action='store_true', help="run the secondary model on its local stand-in")
+    parser.add_argument('--speculative', type=int, default=0, metavar='K',
+                        help="run both models locally, the secondary drafting K tokens for the primary")
+    parser.add_argument('--compress', action='store_true', help="compress the task before scaffolding it")
+    parser.add_argument('--cache', metavar='FILE', help="persistent response cache for the primary model")
+    parser.add_argument('--cache-ttl', type=float, metavar='SECONDS', help="expire cached responses after this long")
+    args = parser.parse_args(argv)
+
+    configuration = LLMConfiguration()
+    local_models = {}
+    if args.local or args.speculative:
+        local_models[configuration.secondary_model] = load_local_model(configuration.secondary_model)
+    if args.speculative:
+        local_models[configuration.primary_model] = load_local_model(configuration.primary_model)
+    response_cache = ResponseCache(ttl=args.cache_ttl, path=args.cache) if args.cache else None
+    llm_service = LLMService(configuration, local_models, args.speculative, response_cache)
+    pipeline = RefinementPipeline(configuration, llm_service, compressor=Compressor() if args.compress else None)
+    if args.bench:
+        prompts = [SAMPLE_PROMPTS[i % len(SAMPLE_PROMPTS)] for i in range(args.bench)]
+        start = time.perf_counter()
+        results = pipeline.refine_batch(prompts, jobs=args.jobs or None)
+        elapsed = time.perf_counter() - start
+        print(f"Refined {args.bench} prompts in {elapsed:.3f} s ({args.bench / elapsed:,.0f} prompts/s)")
+        if response_cache is not None and args.jobs == 1:
+            stats = response_cache.stats()
+            print(f"Response cache: {stats.hits} hits ({stats.disk_hits} from disk), {stats.misses} misses, "
+                  f"{stats.evictions} evictions, {stats.expirations} expirations")
+        elif response_cache is not None:
+            # Each worker process counts in its own copy of the cache; the
+            # results still say which prompts were served from it
+            hits = sum(result.from_cache for result in results)
+            print(f"Response cache: {hits} hits, {len(results) - hits} misses across worker processes")
+        return 0
+    if not args.prompt:
+        parser.error("a prompt or --bench is required")
+
+    result = pipeline.refine(args.prompt)
+    print(result.enhanced_text)
+    print()
+    print(result.output)
+    print()
+    for step in result.steps:
+        print(f"{step.step_number}. {step.name}: {step.processing_time * 1000:.3f} ms")
+    metrics = result.metrics
+    if metrics.speculative_acceptance is not None:
+        print(f"Speculative decoding: {metrics.speculative_acceptance:.0f}% of drafted tokens accepted, "
+              f"{metrics.speculative_speedup:.2f}x decode speedup")
+    if response_cache is not None:
+        print("Response cache: hit" if result.from_cache else "Response cache: miss")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,299 @@
+# Iteration-level (continuous) batching in front of a local model
+#
+# DecoderModel.generate serves one prompt per call, so concurrent callers
+# each pay a full matmul over the weights for every decoded token.
+# BatchScheduler runs one decode loop for all of them: between decode steps
+# it admits queued requests (prefilling each into its own cache) and evicts
+# sequences the moment they finish, so the batch never waits for its
+# longest member and a new request never waits for the batch to drain.
+#
+# When the batch is empty the loop waits up to max_wait for more requests
+# to arrive before starting; while it is running it never waits.
+#
+#     scheduler = BatchScheduler(model, max_batch_size=8)
+#     ids = scheduler.generate(prompt_ids, 32)     # from any thread
+#
+# LLMService only calls generate() and reads config for its plain model
+# calls, so a scheduler can take a model's place in local_models. Nothing
+# does that by default. Speculative decoding (draft_tokens) drives
+# forward() and new_cache() on both models directly, so with it both slots
+# must hold the DecoderModels themselves, not schedulers.
+#
+# A scheduler survives refine_batch(jobs > 1): a forked worker inherits the
+# object but not its decode thread, so the child starts a fresh queue and
+# thread (os.register_at_fork), and a pickled scheduler starts its own.
+#
+# Usage: python -m prompt_refiner.batching [--model M] [--concurrency 1 2 4 8 16]
+import argparse
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from .model import KVCacheFull
+
+DEFAULT_MAX_BATCH_SIZE = 8
+# Seconds an idle scheduler waits for a batch to form
+DEFAULT_MAX_WAIT = 0.002
+
+# Open schedulers, restarted in forked children
+_schedulers = weakref.WeakSet()
+
+
+def _restart_after_fork():
+    for scheduler in list(_schedulers):
+        scheduler._start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+@dataclass
+class BatchStats:
+    requests: int = 0
+    steps: int = 0
+    tokens: int = 0  # tokens decoded, prefill excluded
+
+    @property
+    def mean_batch_size(self):
+        return self.tokens / self.steps if self.steps else 0.0
+
+
+class _Sequence:
+    __slots__ = ('prompt_ids', 'max_new_tokens', 'future', 'cache', 'generated')
+
+    def __init__(self, prompt_ids, max_new_tokens):
+        self.prompt_ids = prompt_ids
+        self.max_new_tokens = max_new_tokens
+        self.future = Future()
+        self.cache = None
+        self.generated = []
+
+
+class BatchScheduler:
+    """Continuous batching over one DecoderModel, driven by a background thread."""
+
+    def __init__(self, model, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive, got {max_batch_size}")
+        self.model = model
+        self.config = model.config
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = BatchStats()
+        self._closed = False
+        self._start()
+
+    def __getstate__(self):
+        # Threads, queues and locks do not pickle; the copy starts its own
+        state = self.__dict__.copy()
+        del state['_lock'], state['_queue'], state['_thread']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._start()
+
+    def _start(self):
+        # Also runs in a forked child, where requests queued in the parent
+        # belong to the parent and the decode thread does not exist
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        if not self._closed:
+            self._thread = threading.Thread(target=self._run, name='BatchScheduler', daemon=True)
+            self._thread.start()
+            _schedulers.add(self)
+
+    def submit(self, prompt_ids, max_new_tokens):
+        """Queue a greedy generation; returns a Future of the generated ids."""
+        sequence = _Sequence(list(prompt_ids), max_new_tokens)
+        if max_new_tokens < 1:
+            sequence.future.set_result([])
+            return sequence.future
+        # Checked under the lock close() takes, so nothing is queued after
+        # the stop sentinel where the decode loop would never see it
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchScheduler is closed")
+            self._queue.put(sequence)
+        return sequence.future
+
+    def generate(self, prompt_ids, max_new_tokens):
+        """Same as DecoderModel.generate, served from the shared batch."""
+        return self.submit(prompt_ids, max_new_tokens).result()
+
+    def close(self):
+        """Finish the queued requests and stop the decode loop."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        _schedulers.discard(self)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        running = []
+        waiting = deque()  # admitted from the queue, not yet holding a cache
+        stopping = False
+        while not (stopping and not running and not waiting):
+            if not running and not waiting and not stopping:
+                # Idle: block for a request, then give a batch time to form
+                sequence = self._queue.get()
+                if sequence is None:
+                    stopping = True
+                    continue
+                waiting.append(sequence)
+                deadline = time.monotonic() + self.max_wait
+                while len(waiting) < self.max_batch_size:
+                    try:
+                        sequence = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if sequence is None:
+                        stopping = True
+                        break
+                    waiting.append(sequence)
+            while not stopping and len(running) + len(waiting) < self.max_batch_size:
+                try:
+                    sequence = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if sequence is None:
+                    stopping = True
+                else:
+                    waiting.append(sequence)
+
+            while waiting and len(running) < self.max_batch_size:
+                if not self._prefill(waiting[0], running):
+                    break
+                waiting.popleft()
+            if running:
+                self._step(running)
+
+    def _prefill(self, sequence, running):
+        # Returns False to retry once running sequences free their caches
+        model = self.model
+        try:
+            total = len(sequence.prompt_ids) + sequence.max_new_tokens
+            sequence.cache = model.new_cache(total)
+            # Hold room for the whole generation up front, so decode steps
+            # never run a shared page pool dry mid-batch
+            sequence.cache.reserve(total)
+            logits = model.forward(sequence.prompt_ids, sequence.cache)
+        except KVCacheFull as error:
+            self._release(sequence)
+            if running:
+                return False
+            # Too big for the pool even with the batch empty
+            self._fail(sequence, error)
+            return True
+        except Exception as error:
+            self._fail(sequence, error)
+            return True
+        self.stats.requests += 1
+        sequence.generated.append(int(logits[-1].argmax()))
+        if len(sequence.generated) == sequence.max_new_tokens:
+            self._finish(sequence)
+        else:
+            running.append(sequence)
+        return True
+
+    def _step(self, running):
+        try:
+            logits = self.model.decode_batch([sequence.generated[-1] for sequence in running],
+                                             [sequence.cache for sequence in running])
+        except Exception as error:
+            for sequence in running:
+                self._fail(sequence, error)
+            running.clear()
+            return
+        self.stats.steps += 1
+        self.stats.tokens += len(running)
+        still_running = []
+        for sequence, row in zip(running, logits):
+            sequence.generated.append(int(row.argmax()))
+            if len(sequence.generated) == sequence.max_new_tokens:
+                self._finish(sequence)
+            else:
+                still_running.append(sequence)
+        running[:] = still_running
+
+    def _release(self, sequence):
+        if sequence.cache is not None:
+            sequence.cache.free()
+            sequence.cache = None
+
+    def _finish(self, sequence):
+        self._release(sequence)
+        sequence.future.set_result(sequence.generated)
+
+    def _fail(self, sequence, error):
+        self._release(sequence)
+        sequence.future.set_exception(error)
+
+
+def measure(model, concurrency, requests, prompt_tokens=64, new_tokens=32, max_wait=DEFAULT_MAX_WAIT):
+    """Closed-loop load: `concurrency` clients each send requests back to back.
+
+    Returns (tokens/s, mean request latency in seconds, mean batch size).
+    """
+    prompt = list(range(1, prompt_tokens + 1))
+    latencies = []
+    lock = threading.Lock()
+
+    with BatchScheduler(model, max_batch_size=concurrency, max_wait=max_wait) as scheduler:
+        def client(count):
+            for _ in range(count):
+                start = time.perf_counter()
+                scheduler.generate(prompt, new_tokens)
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+        counts = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        threads = [threading.Thread(target=client, args=(count,)) for count in counts]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    return requests * new_tokens / elapsed, sum(latencies) / len(latencies), scheduler.stats.mean_batch_size
+
+
+if __name__ == '__main__':
+    from .config import LLMModel
+    from .model import MODEL_PROFILES, load_local_model
+
+    parser = argparse.ArgumentParser(description="Decode throughput against concurrency under continuous batching")
+    parser.add_argument('--model', default=LLMModel.GEMMA_2B.value, choices=[m.value for m in MODEL_PROFILES])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--prompt-tokens', type=int, default=64)
+    parser.add_argument('--new-tokens', type=int, default=32)
+    args = parser.parse_args()
+
+    model = load_local_model(LLMModel(args.model))
+    prompt = list(range(1, args.prompt_tokens + 1))
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        model.generate(prompt, args.new_tokens)
+    sequential = args.requests * args.new_tokens / (time.perf_counter() - start)
+    print(f"{args.model}, {args.requests} requests of {args.prompt_tokens} + {args.new_tokens} tokens")
+    print(f"  sequential generate: {sequential:8,.0f} tokens/s")
+    for concurrency in args.concurrency:
+        throughput, latency, batch = measure(model, concurrency, args.requests, args.prompt_tokens, args.new_tokens)
+        print(f"  concurrency {concurrency:3d}:     {throughput:8,.0f} tokens/s ({throughput / sequential:.1f}x), "
+              f"mean batch {batch:4.1f}, latency {latency * 1000:6.1f} ms")
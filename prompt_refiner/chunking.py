@@ -0,0 +1,347 @@
+# Token-accurate chunking for OptimizationService.apply_chunking
+#
+# Splits text into chunks of at most `chunk_size` BPE tokens (64-512 in the
+# settings slider) with `overlap` tokens repeated between neighbours. Cuts
+# land on pre-tokenization piece boundaries, and inside the second half of
+# a chunk a paragraph break is preferred over a sentence break, which is
+# preferred over an arbitrary piece boundary.
+#
+# Chunks are returned as offset spans into the original string rather than
+# substrings: chunk i is text[starts[i]:ends[i]].
+#
+# iter_stream_chunks does the same over a file object or an iterable of
+# strings, reading it block by block and yielding chunks as they fill, so
+# memory stays bounded by a block plus a chunk whatever the input size.
+#
+# In CONTENT_DEFINED mode cuts are instead placed FastCDC style, where a
+# gear hash over the last few tokens hits a mask, so an edit only moves the
+# boundaries next to it and the other chunks keep their exact text. Paired
+# with a ChunkCache of per-chunk stage outputs, an edited prompt only
+# reprocesses the chunks that changed.
+import hashlib
+import random
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+
+from .tokenizer import default_tokenizer
+
+# Chunking modes
+FIXED = 'fixed'
+CONTENT_DEFINED = 'content'
+
+# Kinds of boundary in front of a piece, in order of preference for a cut
+PIECE = 0
+SENTENCE = 1
+PARAGRAPH = 2
+
+_SENTENCE_END = '.!?'
+# A pre-tokenization match can depend on up to this many characters past
+# its end (the "'ll" style contractions), so a stream is only lexed that
+# far short of its buffered end until EOF.
+_LOOKAHEAD = 3
+DEFAULT_BLOCK_SIZE = 1 << 16
+_MASK64 = (1 << 64) - 1
+_GEAR_SEED = 0x6765617263646300
+_GEAR_TABLES = {}
+_FOLD_CACHE_LIMIT = 65536
+
+
+def default_overlap(chunk_size):
+    return chunk_size // 8
+
+
+def _boundary_kind(text, position):
+    if position < 2:
+        return PIECE
+    previous = text[position - 1]
+    if previous == '\n':
+        return PARAGRAPH if text[position - 2] == '\n' else SENTENCE
+    if previous in _SENTENCE_END and position < len(text) and text[position].isspace():
+        return SENTENCE
+    return PIECE
+
+
+def _split_piece(piece, start, ids, vocab):
+    # A single piece longer than a chunk (a huge number or punctuation run):
+    # fall back to token boundaries, moved forward to the next character
+    # boundary when a token ends inside a multi-byte character.
+    if piece.isascii():
+        char_ends = None
+    else:
+        char_ends = list(accumulate(len(c.encode('utf-8')) for c in piece))
+    byte_end = 0
+    unit_start = 0
+    tokens = 0
+    for token in ids:
+        byte_end += len(vocab[token])
+        tokens += 1
+        unit_end = byte_end if char_ends is None else bisect_right(char_ends, byte_end)
+        if unit_end > unit_start:
+            yield start + unit_start, start + unit_end, tokens, PIECE
+            unit_start = unit_end
+            tokens = 0
+    if tokens:
+        yield start + unit_start, start + len(piece), tokens, PIECE
+
+
+def iter_units(text, tokenizer, chunk_size):
+    """Yield (start, end, tokens, kind) for each piece of text, none longer than a chunk."""
+    encode_piece = tokenizer._encode_piece
+    for match in tokenizer._regex.finditer(text):
+        start = match.start()
+        ids = encode_piece(match.group())
+        if len(ids) <= chunk_size:
+            yield start, match.end(), len(ids), _boundary_kind(text, start)
+        else:
+            yield from _split_piece(match.group(), start, ids, tokenizer.vocab)
+
+
+def _best_cut(boundaries, chunk_size, floor=0):
+    # boundaries: (offset, tokens before it, kind) for every cut candidate,
+    # the last one being the end of the chunk as filled. Candidates at or
+    # before `floor` tokens (the previous chunk's end) are not considered.
+    half = chunk_size // 2
+    best = len(boundaries) - 1
+    for index in range(len(boundaries) - 1, 0, -1):
+        offset, tokens, kind = boundaries[index]
+        if tokens < half or tokens <= floor:
+            break
+        if kind > boundaries[best][2]:
+            best = index
+            if kind == PARAGRAPH:
+                break
+    return best
+
+
+def iter_chunks(units, chunk_size, overlap):
+    """Group (start, end, tokens, kind) units into overlapping (start, end) chunk spans."""
+    window = []  # (start, tokens before it in the chunk, kind) per unit
+    total = 0
+    floor = 0  # tokens of the window the previous chunk already covers
+    position = 0
+    for start, end, tokens, kind in units:
+        while window and total + tokens > chunk_size:
+            boundaries = window + [(start, total, kind)]
+            cut = _best_cut(boundaries, chunk_size, floor)
+            cut_offset, cut_tokens, _ = boundaries[cut]
+            yield window[0][0], cut_offset
+
+            # Start the next chunk up to `overlap` tokens before the cut, as
+            # long as the pending unit still fits after them; otherwise the
+            # next chunk would hold nothing but overlap.
+            keep = cut
+            while (keep > 1 and cut_tokens - boundaries[keep - 1][1] <= overlap
+                   and total - boundaries[keep - 1][1] + tokens <= chunk_size):
+                keep -= 1
+            base = boundaries[keep][1]
+            window = [(offset, before - base, k) for offset, before, k in window[keep:]]
+            total -= base
+            floor = cut_tokens - base
+        window.append((start, total, kind))
+        total += tokens
+        position = end
+    if window:
+        yield window[0][0], position
+
+
+def _gear_table(size):
+    # One fixed pseudo-random 64-bit value per token id (FastCDC's gear
+    # table, over the BPE vocabulary instead of bytes)
+    table = _GEAR_TABLES.get(size)
+    if table is None:
+        rng = random.Random(_GEAR_SEED)
+        table = _GEAR_TABLES[size] = array('Q', (rng.getrandbits(64) for _ in range(size)))
+    return table
+
+
+def iter_content_chunks(text, tokenizer, chunk_size):
+    """Yield non-overlapping (start, end) spans cut at content-defined boundaries.
+
+    Chunks hold between chunk_size / 4 and chunk_size tokens (only the last
+    one may be shorter), about 0.55-0.6 * chunk_size on average.
+    """
+    encode_piece = tokenizer._encode_piece
+    gear = _gear_table(tokenizer.vocab_size)
+    min_tokens = max(1, chunk_size // 4)
+    average = max(min_tokens + 1, chunk_size // 2)
+    # Normalized chunking: a mask one bit stricter than the average gap
+    # calls for below the average size and one bit looser above it, so
+    # sizes cluster around the average and forced cuts at chunk_size are
+    # rare. Low bits of the gear hash only depend on the last few tokens.
+    bits = max(1, (average - min_tokens).bit_length() - 1)
+    strict = (1 << (bits + 1)) - 1
+    loose = (1 << max(0, bits - 1)) - 1
+    folds = {}  # token ids of a unit -> its contribution to the gear hash
+    rolling = 0
+    chunk_start = 0
+    tokens = 0
+    position = 0
+    for match in tokenizer._regex.finditer(text):
+        ids = encode_piece(match.group())
+        if len(ids) <= min_tokens:
+            units = ((match.start(), match.end(), ids),)
+        else:
+            # Pieces longer than the minimum go in token by token, so a cut
+            # forced at chunk_size never leaves less than min_tokens behind
+            units = _split_piece_ids(match.group(), match.start(), ids, tokenizer.vocab)
+        for start, end, unit_ids in units:
+            n = len(unit_ids)
+            if tokens + n > chunk_size:
+                yield chunk_start, start
+                chunk_start, tokens = start, 0
+            tokens += n
+            fold = folds.get(unit_ids)
+            if fold is None:
+                fold = 0
+                for token in unit_ids:
+                    fold = ((fold << 1) + gear[token]) & _MASK64
+                if len(folds) < _FOLD_CACHE_LIMIT:
+                    folds[unit_ids] = fold
+            rolling = ((rolling << n) + fold) & _MASK64
+            if tokens >= min_tokens and not rolling & (strict if tokens < average else loose):
+                yield chunk_start, end
+                chunk_start, tokens = end, 0
+            position = end
+    if chunk_start < position:
+        yield chunk_start, position
+
+
+def _split_piece_ids(piece, start, ids, vocab):
+    # _split_piece, with each unit's token ids instead of its count
+    index = 0
+    for unit_start, unit_end, n, _ in _split_piece(piece, start, ids, vocab):
+        yield unit_start, unit_end, ids[index:index + n]
+        index += n
+
+
+def _check_sizes(chunk_size, overlap):
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if not 0 <= overlap <= chunk_size // 2:
+        raise ValueError(f"overlap must be between 0 and chunk_size / 2, got {overlap}")
+
+
+def chunk_spans(text, chunk_size=128, overlap=None, tokenizer=None, mode=FIXED):
+    """Chunk text into spans of at most chunk_size tokens.
+
+    Returns (starts, ends) as array('Q') offsets into `text`. CONTENT_DEFINED
+    chunks never overlap, so `overlap` only applies to FIXED mode.
+    """
+    if overlap is None:
+        overlap = default_overlap(chunk_size)
+    _check_sizes(chunk_size, overlap)
+    tokenizer = tokenizer or default_tokenizer()
+    if mode == FIXED:
+        # Most prompts fit in one chunk, which one counting pass settles cheaply
+        if text and tokenizer.count(text) <= chunk_size:
+            return array('Q', [0]), array('Q', [len(text)])
+        spans = iter_chunks(iter_units(text, tokenizer, chunk_size), chunk_size, overlap)
+    elif mode == CONTENT_DEFINED:
+        spans = iter_content_chunks(text, tokenizer, chunk_size)
+    else:
+        raise ValueError(f"unknown chunking mode {mode!r}")
+    starts = array('Q')
+    ends = array('Q')
+    for start, end in spans:
+        starts.append(start)
+        ends.append(end)
+    return starts, ends
+
+
+class ChunkCache:
+    """LRU cache of per-chunk stage outputs, keyed by a hash of the chunk text."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text, *params):
+        """Key for `text` processed with the given stage parameters."""
+        return (hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(),) + params
+
+    def get(self, key):
+        output = self._entries.get(key)
+        if output is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return output
+
+    def put(self, key, output):
+        self._entries[key] = output
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _StreamText:
+    """Sliding text buffer over a stream, addressed by absolute offsets."""
+
+    def __init__(self, source, block_size):
+        if hasattr(source, 'read'):
+            read = source.read
+            source = iter(lambda: read(block_size), '')
+        self._blocks = iter(source)
+        self.text = ''
+        self.base = 0  # absolute offset of text[0]
+
+    def units(self, tokenizer, chunk_size):
+        # Same units as iter_units, for the part of the stream read so far
+        encode_piece = tokenizer._encode_piece
+        finditer = tokenizer._regex.finditer
+        position = 0
+        eof = False
+        while not eof:
+            block = next(self._blocks, None)
+            if block is None:
+                eof = True
+            else:
+                self.text += block
+            text, base = self.text, self.base
+            for match in finditer(text, position - base):
+                end = match.end()
+                if not eof and end + _LOOKAHEAD >= len(text):
+                    break
+                start = match.start()
+                ids = encode_piece(match.group())
+                if len(ids) <= chunk_size:
+                    yield base + start, base + end, len(ids), _boundary_kind(text, start)
+                else:
+                    yield from _split_piece(match.group(), base + start, ids, tokenizer.vocab)
+                position = base + end
+
+    def slice(self, start, end):
+        return self.text[start - self.base:end - self.base]
+
+    def release(self, offset):
+        # Keep two characters before `offset` for _boundary_kind
+        drop = offset - 2 - self.base
+        if drop > 0:
+            self.text = self.text[drop:]
+            self.base += drop
+
+
+def iter_stream_chunks(source, chunk_size=128, overlap=None, tokenizer=None, block_size=DEFAULT_BLOCK_SIZE):
+    """Chunk a file object or iterable of strings as it is read.
+
+    Yields (start, end, text) per chunk, with start/end offsets into the
+    whole stream.
+    """
+    if overlap is None:
+        overlap = default_overlap(chunk_size)
+    _check_sizes(chunk_size, overlap)
+    tokenizer = tokenizer or default_tokenizer()
+    stream = _StreamText(source, block_size)
+    for start, end in iter_chunks(stream.units(tokenizer, chunk_size), chunk_size, overlap):
+        yield start, end, stream.slice(start, end)
+        # Later chunks all start after this one
+        stream.release(start)
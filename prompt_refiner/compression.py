@@ -0,0 +1,266 @@
+# Token optimization stage: prompt compression with measured reduction
+#
+# Removes redundancy from the prose of the user's task before it is
+# scaffolded. Code is never touched: fenced blocks (``` or ~~~) and lines
+# starting with whitespace are kept byte for byte, as are lines that are not
+# complete sentences (no closing . ! or ?), such as headings, list items or
+# unfenced code, including the non-sentence rest of a line that also holds
+# sentences. In the sentences:
+#
+#   1. whitespace runs are collapsed
+#   2. filler phrases ("please", "I would like you to", "in order to", ...)
+#      are dropped, except where that changes the meaning: a question keeps
+#      its "can you" / "could you", and a sentence with a negation keeps its
+#      intensifiers ("not very safe" is not "not safe")
+#   3. boilerplate lines and sentences ("Hi there.", "Thanks in advance!")
+#      are dropped
+#   4. sentences identical to an earlier one are dropped, and so are near
+#      duplicates, scored as Jaccard similarities of token trigram
+#      shingles, so reordered words ("The dog bit the man.") still differ
+#   5. with a target_ratio, the least informative remaining sentences are
+#      dropped until the text is at most that fraction of its original
+#      token count (the first sentence, usually the instruction, is kept)
+#
+# compress() reports the tokens before and after, which is what the
+# pipeline puts into PerformanceMetrics.token_reduction. PromptService only
+# compresses when given a Compressor.
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from .tokenizer import default_tokenizer
+
+# Tokens per shingle for the similarity scoring
+_SHINGLE = 3
+# Sentences at least this similar to an earlier one are dropped
+DUPLICATE_THRESHOLD = 0.9
+
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])[ \t]+(?=\S)')
+_SENTENCE_END = ('.', '!', '?')
+_FENCES = ('```', '~~~')
+
+# (pattern, replacement, substrings one of which any match contains);
+# patterns only run on sentences containing a trigger, which keeps the
+# common filler-free sentence to a few substring searches.
+_FILLERS = [
+    (re.compile(r'^(?:i would like you to|i want you to|i need you to)\s+', re.IGNORECASE), '', ('you',)),
+    (re.compile(r'\b(?:it is important to note that|it should be noted that|please note that|note that|'
+                r'needless to say|as a matter of fact|at the end of the day)\b,?\s*', re.IGNORECASE), '',
+     ('note', 'needless', 'matter', 'end of the day')),
+    (re.compile(r'\b(?:please|kindly)\b,?\s*', re.IGNORECASE), '', ('please', 'kindly')),
+    (re.compile(r'\bin order to\b', re.IGNORECASE), 'to', ('in order to',)),
+    (re.compile(r'\bdue to the fact that\b', re.IGNORECASE), 'because', ('due to the fact that',)),
+    (re.compile(r'\bat this point in time\b', re.IGNORECASE), 'now', ('at this point in time',)),
+]
+# Only outside questions: "Can you run this on iOS?" asks whether it can
+_REQUEST_OPENER = re.compile(r'^(?:could you please|can you please|would you please|could you|can you|would you)\s+',
+                             re.IGNORECASE)
+# Only outside negations: "not very safe" and "not safe" differ
+_INTENSIFIERS = (re.compile(r'\b(?:basically|actually|literally|really|very|quite|simply)\b,?\s*', re.IGNORECASE),
+                 ('basically', 'actually', 'literally', 'really', 'very', 'quite', 'simply'))
+_NEGATION = re.compile(r"\b(?:not|no|never|nor|none|nothing|neither|without|hardly|barely)\b|n't\b", re.IGNORECASE)
+_BOILERPLATE = re.compile(
+    r'(?:thanks?(?: you)?(?: so much| very much)?(?: in advance)?(?: for your help)?|hope (?:this|that) helps|'
+    r'cheers|best regards|kind regards|regards|(?:hi|hello|hey)(?: there)?)[.!,]*',
+    re.IGNORECASE,
+)
+
+# Separators between segments, weakest first
+_SEPARATORS = (' ', '\n', '\n\n')
+
+# Kinds of segment
+SENTENCE = 0  # complete prose sentence: may be rewritten or dropped
+LINE = 1  # any other line, kept verbatim unless it is boilerplate
+CODE = 2  # code block, always kept verbatim
+
+
+@dataclass
+class CompressionResult:
+    text: str
+    original_tokens: int
+    compressed_tokens: int
+
+    @property
+    def reduction(self):
+        """Token reduction as a percentage (e.g. 47 for 47%)."""
+        if not self.original_tokens:
+            return 0.0
+        return 100.0 * (self.original_tokens - self.compressed_tokens) / self.original_tokens
+
+
+def _segments(text):
+    # (separator rank before the segment, kind, text) in reading order, with
+    # blank lines marking paragraphs
+    segments = []
+    rank = 0
+    lines = iter(text.split('\n'))
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            rank = 2
+            continue
+        if stripped.startswith(_FENCES):
+            # Up to and including the closing fence (or the end of the text)
+            block = [line]
+            for line in lines:
+                block.append(line)
+                if line.strip().startswith(stripped[:3]):
+                    break
+            parts = [(CODE, '\n'.join(block))]
+        elif line[0].isspace():
+            parts = [(CODE, line)]
+        elif stripped.endswith(_SENTENCE_END) or _SENTENCE_BREAK.search(line):
+            # Only the sentences are normalized; any other part of the line
+            # is kept as written
+            parts = [(SENTENCE, ' '.join(part.split())) if part.rstrip().endswith(_SENTENCE_END) else (LINE, part)
+                     for part in _SENTENCE_BREAK.split(line)]
+        else:
+            parts = [(LINE, line)]
+        for kind, part in parts:
+            segments.append((rank if segments else 0, kind, part))
+            rank = 0
+        rank = 1
+    return segments
+
+
+def _strip_fillers(sentence):
+    lowered = sentence.lower()
+    stripped = sentence
+    for pattern, replacement, triggers in _FILLERS:
+        if any(trigger in lowered for trigger in triggers):
+            stripped = pattern.sub(replacement, stripped)
+    if 'you' in lowered and not sentence.endswith('?'):
+        stripped = _REQUEST_OPENER.sub('', stripped)
+    pattern, triggers = _INTENSIFIERS
+    if any(trigger in lowered for trigger in triggers) and not _NEGATION.search(sentence):
+        stripped = pattern.sub('', stripped)
+    if stripped is sentence:
+        return sentence
+    stripped = stripped.strip()
+    if not any(char.isalnum() for char in stripped):
+        # Nothing but filler ("Really."): keep the sentence as it was
+        return sentence
+    if sentence[0].isupper():
+        stripped = stripped[0].upper() + stripped[1:]
+    return stripped
+
+
+def _features(tokenizer, sentences):
+    # Presence matrix of token shingles (runs of _SHINGLE
+    # tokens; a shorter sentence is one shingle), and sentence lengths
+    ids, offsets = tokenizer.encode_batch(sentences)
+    columns = {}
+    rows = []
+    cols = []
+    lengths = []
+    for row in range(len(sentences)):
+        tokens = tuple(ids[offsets[row]:offsets[row + 1]])
+        lengths.append(len(tokens))
+        shingles = {tokens[i:i + _SHINGLE] for i in range(max(1, len(tokens) - _SHINGLE + 1))}
+        for shingle in shingles:
+            rows.append(row)
+            cols.append(columns.setdefault(shingle, len(columns)))
+    presence = np.zeros((len(sentences), max(1, len(columns))), dtype=np.float64)
+    presence[rows, cols] = 1.0
+    return presence, np.array(lengths)
+
+
+def _jaccard(presence):
+    shared = presence @ presence.T
+    sizes = presence.sum(axis=1)
+    return shared / np.maximum(sizes[:, None] + sizes[None, :] - shared, 1)
+
+
+class Compressor:
+    """Prompt compression stage; target_ratio=None only removes redundancy."""
+
+    def __init__(self, target_ratio=None, duplicate_threshold=DUPLICATE_THRESHOLD, tokenizer=None):
+        if target_ratio is not None and not 0 < target_ratio <= 1:
+            raise ValueError(f"target_ratio must be in (0, 1], got {target_ratio}")
+        self.target_ratio = target_ratio
+        self.duplicate_threshold = duplicate_threshold
+        self.tokenizer = tokenizer
+
+    def compress(self, text):
+        tokenizer = self.tokenizer or default_tokenizer()
+        original_tokens = tokenizer.count(text)
+
+        ranks = []
+        kinds = []
+        segments = []
+        seen = set()
+        pending = 0
+        for rank, kind, segment in _segments(text):
+            pending = max(pending, rank)
+            if kind == SENTENCE:
+                segment = _strip_fillers(segment)
+                if not segment or segment in seen:
+                    continue
+                seen.add(segment)
+            if kind != CODE and _BOILERPLATE.fullmatch(segment.strip()):
+                continue
+            ranks.append(pending if segments else 0)
+            kinds.append(kind)
+            segments.append(segment)
+            pending = 0
+
+        sentences = [index for index, kind in enumerate(kinds) if kind == SENTENCE]
+        if len(sentences) > 1:
+            budget = None
+            if self.target_ratio is not None:
+                # Only sentences can go, so they get what the rest leaves
+                fixed = sum(tokenizer.count(segment) for segment, kind in zip(segments, kinds) if kind != SENTENCE)
+                budget = self.target_ratio * original_tokens - fixed
+            keep = [True] * len(segments)
+            for index, wanted in zip(sentences, self._select(tokenizer, [segments[i] for i in sentences], budget)):
+                keep[index] = wanted
+            ranks, segments = self._drop(ranks, segments, keep)
+
+        compressed = ''.join(_SEPARATORS[rank] + segment if i else segment
+                             for i, (rank, segment) in enumerate(zip(ranks, segments)))
+        if compressed == text or not compressed.strip():
+            # Unchanged, or nothing but filler: keep the original rather
+            # than an empty prompt
+            return CompressionResult(text, original_tokens, original_tokens)
+        return CompressionResult(compressed, original_tokens, tokenizer.count(compressed))
+
+    def _select(self, tokenizer, sentences, budget):
+        presence, lengths = _features(tokenizer, sentences)
+        similarity = _jaccard(presence)
+        # Redundancy of each sentence against the sentences before it
+        redundancy = np.tril(similarity, -1).max(axis=1)
+        keep = redundancy < self.duplicate_threshold
+        keep[0] = True
+
+        if budget is not None:
+            # Informativeness: novelty against everything else, favouring
+            # sentences whose shingles are rare across the prompt
+            idf = np.log((1 + len(sentences)) / (1 + presence.sum(axis=0))) + 1
+            density = (presence * idf).sum(axis=1) / np.maximum(presence.sum(axis=1), 1)
+            np.fill_diagonal(similarity, 0)
+            score = (1 - similarity.max(axis=1)) * density
+            score[0] = np.inf
+            for index in np.argsort(score):
+                if lengths[keep].sum() <= budget:
+                    break
+                if keep[index] and index:
+                    keep[index] = False
+        return keep
+
+    @staticmethod
+    def _drop(ranks, segments, keep):
+        kept_ranks = []
+        kept = []
+        pending = 0
+        for rank, segment, wanted in zip(ranks, segments, keep):
+            pending = max(pending, rank)
+            if wanted:
+                kept_ranks.append(pending if kept else 0)
+                kept.append(segment)
+                pending = 0
+        return kept_ranks, kept
+
+
+def compress(text, target_ratio=None):
+    return Compressor(target_ratio).compress(text)
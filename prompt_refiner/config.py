@@ -0,0 +1,39 @@
+# Python mirror of LLMConfiguration (Models/LLMConfiguration.swift)
+from dataclasses import dataclass
+from enum import Enum
+
+
+class LLMModel(Enum):
+    GPT4 = 'GPT-4'
+    CLAUDE3 = 'Claude-3'
+    GEMINI_PRO = 'Gemini-Pro'
+    GEMMA_2B = 'Gemma-2B'
+    PHI3 = 'Phi-3'
+    LLAMA_7B = 'LLaMA-7B'
+
+    @property
+    def is_secondary(self):
+        return self in (LLMModel.GEMMA_2B, LLMModel.PHI3, LLMModel.LLAMA_7B)
+
+
+class OptimizationLevel(Enum):
+    PERFORMANCE = 'Performance'
+    BALANCED = 'Balanced'
+    EFFICIENCY = 'Efficiency'
+
+
+class QuantizationLevel(Enum):
+    FOUR_BIT = '4-bit'
+    EIGHT_BIT = '8-bit'
+    SIXTEEN_BIT = '16-bit'
+
+
+@dataclass
+class LLMConfiguration:
+    primary_model: LLMModel = LLMModel.GPT4
+    secondary_model: LLMModel = LLMModel.GEMMA_2B
+    optimization_level: OptimizationLevel = OptimizationLevel.BALANCED
+    chunk_size: int = 128
+    use_npu: bool = True
+    privacy_mode: bool = False
+    quantization: QuantizationLevel = QuantizationLevel.FOUR_BIT
@@ -0,0 +1,184 @@
+# Pipelined execution of the refinement stages across prompts
+#
+# RefinementPipeline.refine runs steps 2-5 back to back for one prompt, so
+# while the primary model works on prompt N the secondary model sits idle.
+# PipelinedExecutor gives each stage (secondary parse, NPU chunk
+# optimization, enhancement, primary call) its own asyncio workers fed by a
+# bounded queue:
+#
+#     parse -> [queue] -> optimize -> [queue] -> enhance -> [queue] -> primary
+#
+# Prompt N+1 is parsed while prompt N is in the primary call, and a stage
+# that falls behind fills its queue, which blocks the stages in front of it
+# (backpressure) instead of buffering without limit. Once the pipeline is
+# full, throughput approaches that of the slowest stage (times its
+# concurrency limit).
+#
+# Stage calls are blocking, so they run on a thread pool; stages that wait
+# on a remote model or release the GIL (NumPy) overlap for real.
+#
+#     executor = PipelinedExecutor(pipeline, concurrency={5: 4})
+#     results = executor.refine_all(prompts)
+#
+# Usage: python -m prompt_refiner.executor [--prompts N] [--parse-latency S] [--primary-latency S]
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .pipeline import run_step
+
+DEFAULT_QUEUE_SIZE = 8
+# Workers per stage unless overridden, keyed by step number
+DEFAULT_CONCURRENCY = 1
+
+
+class _Job:
+    __slots__ = ('index', 'prompt', 'steps', 'start', 'value', 'error')
+
+    def __init__(self, index, prompt):
+        self.index = index
+        self.prompt = prompt
+        self.steps = None
+        self.start = None
+        self.value = prompt
+        self.error = None
+
+
+class PipelinedExecutor:
+    """Runs RefinementPipeline stages concurrently across prompts.
+
+    `concurrency` maps a step number (2-5) to its number of workers;
+    `queue_size` bounds the queue in front of each stage.
+    """
+
+    def __init__(self, pipeline, concurrency=None, queue_size=DEFAULT_QUEUE_SIZE):
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be positive, got {queue_size}")
+        self.pipeline = pipeline
+        self.stages = pipeline.stages()
+        self.concurrency = {step_number: DEFAULT_CONCURRENCY for step_number, _ in self.stages}
+        for step_number, workers in (concurrency or {}).items():
+            if step_number not in self.concurrency:
+                raise ValueError(f"no pipelined stage for step {step_number}")
+            if workers < 1:
+                raise ValueError(f"step {step_number} needs at least one worker, got {workers}")
+            self.concurrency[step_number] = workers
+        self.queue_size = queue_size
+
+    def refine_all(self, prompts):
+        """Refine `prompts`, returning their results in order."""
+        return asyncio.run(self.refine(prompts))
+
+    async def refine(self, prompts):
+        """Coroutine form of refine_all, for callers already in an event loop."""
+        prompts = list(prompts)
+        results = [None] * len(prompts)
+        if not prompts:
+            return results
+        loop = asyncio.get_running_loop()
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        done = asyncio.Queue()
+        workers = []
+        with ThreadPoolExecutor(max_workers=sum(self.concurrency.values())) as threads:
+            for position, (step_number, stage) in enumerate(self.stages):
+                outbox = queues[position + 1] if position + 1 < len(queues) else done
+                for _ in range(self.concurrency[step_number]):
+                    workers.append(asyncio.create_task(
+                        self._worker(loop, threads, step_number, stage, queues[position], outbox)))
+            try:
+                feeder = asyncio.create_task(self._feed(prompts, queues[0]))
+                for _ in prompts:
+                    job = await done.get()
+                    if job.error is None:
+                        try:
+                            job.value = self.pipeline.finish(job.prompt, job.steps, job.start, job.value)
+                        except Exception as error:
+                            job.error = error
+                    results[job.index] = job
+                await feeder
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        for job in results:
+            if job.error is not None:
+                raise job.error
+        return [job.value for job in results]
+
+    async def _feed(self, prompts, inbox):
+        for index, prompt in enumerate(prompts):
+            job = _Job(index, prompt)
+            try:
+                job.steps, job.start = self.pipeline.start(prompt)
+            except Exception as error:
+                job.error = error
+            # Blocks while the first stage is backed up
+            await inbox.put(job)
+
+    @staticmethod
+    async def _worker(loop, threads, step_number, stage, inbox, outbox):
+        while True:
+            job = await inbox.get()
+            if job.error is None:
+                try:
+                    job.value = await loop.run_in_executor(threads, run_step, job.steps, step_number, stage,
+                                                           job.value)
+                except Exception as error:
+                    job.error = error
+            await outbox.put(job)
+
+
+if __name__ == '__main__':
+    from .__main__ import SAMPLE_PROMPTS
+    from .config import LLMConfiguration
+    from .model import load_local_model
+    from .pipeline import RefinementPipeline
+    from .services import LLMService
+
+    class _RemoteLLMService(LLMService):
+        # The mock model calls plus a fixed wait, standing in for network
+        # round trips to hosted models
+        def parse_with_secondary_model(self, prompt):
+            time.sleep(args.parse_latency)
+            return super().parse_with_secondary_model(prompt)
+
+        def process_with_primary_model(self, prompt, token_ids=None, prefix=None):
+            time.sleep(args.primary_latency)
+            return super().process_with_primary_model(prompt, token_ids, prefix)
+
+    parser = argparse.ArgumentParser(description="Sequential against pipelined refinement throughput")
+    parser.add_argument('--prompts', type=int, default=200)
+    parser.add_argument('--parse-latency', type=float, default=0.003, help="seconds added to each parse call")
+    parser.add_argument('--primary-latency', type=float, default=0.005, help="seconds added to each primary call")
+    parser.add_argument('--primary-workers', type=int, default=1)
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument('--local', action='store_true', help="run the secondary model on its local stand-in")
+    args = parser.parse_args()
+
+    configuration = LLMConfiguration()
+    local_models = {}
+    if args.local:
+        local_models[configuration.secondary_model] = load_local_model(configuration.secondary_model)
+    pipeline = RefinementPipeline(configuration, _RemoteLLMService(configuration, local_models))
+    prompts = [SAMPLE_PROMPTS[i % len(SAMPLE_PROMPTS)] for i in range(args.prompts)]
+
+    start = time.perf_counter()
+    sequential_results = pipeline.refine_batch(prompts)
+    sequential = time.perf_counter() - start
+    executor = PipelinedExecutor(pipeline, {5: args.primary_workers}, args.queue_size)
+    start = time.perf_counter()
+    results = executor.refine_all(prompts)
+    pipelined = time.perf_counter() - start
+
+    names = {step.step_number: step.name for step in results[0].steps}
+    slowest = 0.0
+    print(f"{args.prompts} prompts:")
+    for step_number, _ in executor.stages:
+        mean = sum(result.steps[step_number - 1].processing_time for result in sequential_results) / args.prompts
+        per_prompt = mean / executor.concurrency[step_number]
+        slowest = max(slowest, per_prompt)
+        print(f"  {names[step_number]:<26} {mean * 1000:7.3f} ms x{executor.concurrency[step_number]}")
+    print(f"  sequential: {args.prompts / sequential:8,.0f} prompts/s")
+    print(f"  pipelined:  {args.prompts / pipelined:8,.0f} prompts/s ({sequential / pipelined:.2f}x, "
+          f"slowest-stage bound {1 / slowest:,.0f} prompts/s)")
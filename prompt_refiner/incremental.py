@@ -0,0 +1,112 @@
+# Incremental re-tokenization for prompts being edited
+#
+# PromptViewModel re-validates the whole inputPrompt on every debounce tick,
+# so a live token count would re-tokenize the full text per keystroke.
+# IncrementalEncoding keeps the pre-tokenized pieces of the previous
+# encoding (their lengths and token counts) next to the flat token ids.
+# An edit re-lexes only from a couple of pieces before the change until the
+# new piece boundaries line up with the old ones again, then splices the
+# arrays. A cursor remembers where the last edit landed, so locating the
+# next one costs time proportional to how far the caret moved.
+#
+#     encoding = IncrementalEncoding(default_tokenizer(), text)
+#     encoding.edit(offset, deleted_length, inserted_text)
+#     encoding.count  # live token count
+from array import array
+
+# Re-lex from this many pieces before the edited one: a piece's extent can
+# depend on the character that follows it (e.g. whitespace before a word).
+_CONTEXT_PIECES = 2
+
+
+class IncrementalEncoding:
+    """A tokenized text that can be updated in place by small edits."""
+
+    def __init__(self, tokenizer, text=''):
+        self.tokenizer = tokenizer
+        self.text = text
+        self.ids = array('I')
+        self.piece_lengths = array('I')
+        self.piece_tokens = array('I')
+        for piece in tokenizer._split(text):
+            ids = tokenizer._encode_piece(piece)
+            self.ids.extend(ids)
+            self.piece_lengths.append(len(piece))
+            self.piece_tokens.append(len(ids))
+        # (piece index, char offset, token offset) of a known piece start
+        self._cursor = (0, 0, 0)
+
+    @property
+    def count(self):
+        return len(self.ids)
+
+    def _seek(self, offset):
+        # Walk from the cursor to the piece containing `offset` (or the end)
+        index, start, token = self._cursor
+        lengths, tokens = self.piece_lengths, self.piece_tokens
+        n = len(lengths)
+        while index > 0 and start > offset:
+            index -= 1
+            start -= lengths[index]
+            token -= tokens[index]
+        while index < n and start + lengths[index] <= offset:
+            start += lengths[index]
+            token += tokens[index]
+            index += 1
+        return index, start, token
+
+    def edit(self, offset, deleted, inserted=''):
+        """Replace text[offset:offset + deleted] with `inserted` and re-encode around it."""
+        if not 0 <= offset <= offset + deleted <= len(self.text):
+            raise ValueError(f"edit ({offset}, {deleted}) is outside a text of length {len(self.text)}")
+
+        old_text = self.text
+        self.text = text = old_text[:offset] + inserted + old_text[offset + deleted:]
+        lengths, tokens = self.piece_lengths, self.piece_tokens
+        n = len(lengths)
+
+        # Step back a few pieces so boundaries that depend on the edited
+        # characters are re-lexed as well.
+        first, start, token = self._seek(offset)
+        for _ in range(_CONTEXT_PIECES):
+            if first == 0:
+                break
+            first -= 1
+            start -= lengths[first]
+            token -= tokens[first]
+
+        old_end = offset + deleted
+        new_end = offset + len(inserted)
+        delta = len(inserted) - deleted
+
+        # Re-lex until a new piece starts exactly where an old piece (after
+        # the edit) used to start; from there on both texts lex identically.
+        last = first
+        old_start = start
+        old_token = token
+        new_lengths = array('I')
+        new_tokens = array('I')
+        new_ids = array('I')
+        encode_piece = self.tokenizer._encode_piece
+        for match in self.tokenizer._regex.finditer(text, start):
+            position = match.start()
+            while last < n and old_start + delta < position:
+                old_start += lengths[last]
+                old_token += tokens[last]
+                last += 1
+            if position >= new_end and old_start >= old_end and old_start + delta == position and last < n:
+                break
+            piece = match.group()
+            ids = encode_piece(piece)
+            new_ids.extend(ids)
+            new_lengths.append(len(piece))
+            new_tokens.append(len(ids))
+        else:
+            last = n
+            old_token = len(self.ids)
+
+        self.ids[token:old_token] = new_ids
+        lengths[first:last] = new_lengths
+        tokens[first:last] = new_tokens
+        self._cursor = (first, start, token)
+        return self
@@ -0,0 +1,230 @@
+# Block-paged KV cache shared by concurrent sequences
+#
+# A contiguous KVCache reserves max_seq_len positions per sequence up front,
+# so with many concurrent refinements most of the memory sits unused. Here
+# one pool of fixed-size pages (page_size positions for every layer and
+# head) backs all sequences: each sequence keeps a page table of the pages
+# it holds, takes pages from the free list only as it grows and returns
+# them when it finishes or is truncated. Waste is bounded by one partially
+# filled page per sequence.
+#
+#     pool = PagedKVCache.for_budget(model.config, 64 << 20)
+#     model.kv_pool = pool          # model.new_cache() now draws pages
+#     print(pool.stats())
+#
+# The free list and the set of live sequences are guarded by a lock, since
+# BatchScheduler and PipelinedExecutor drive models from several threads and
+# NumPy releases the GIL inside them. Page contents need no lock: a page
+# belongs to one sequence at a time.
+#
+# Usage: python -m prompt_refiner.kv_cache [--budget-mb N] [--page-size N]
+import argparse
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+
+import numpy as np
+
+from .model import KVCacheFull
+
+DEFAULT_PAGE_SIZE = 16
+
+# Every pool, given a fresh lock in forked children in case another thread
+# held it at the fork
+_pools = weakref.WeakSet()
+
+
+def _reset_locks_after_fork():
+    for pool in list(_pools):
+        pool._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+@dataclass
+class CacheStats:
+    pages_total: int
+    pages_used: int
+    sequences: int
+    tokens: int
+    page_size: int
+
+    @property
+    def pages_free(self):
+        return self.pages_total - self.pages_used
+
+    @property
+    def utilization(self):
+        """Fraction of the pool's positions holding live tokens."""
+        return self.tokens / (self.pages_total * self.page_size) if self.pages_total else 0.0
+
+    @property
+    def fragmentation(self):
+        """Fraction of allocated positions left empty (internal fragmentation)."""
+        allocated = self.pages_used * self.page_size
+        return 1 - self.tokens / allocated if allocated else 0.0
+
+
+class PagedKVCache:
+    """Pool of fixed-size KV pages with a free list and per-sequence page tables."""
+
+    def __init__(self, config, num_pages, page_size=DEFAULT_PAGE_SIZE):
+        self.config = config
+        self.page_size = page_size
+        self.num_pages = num_pages
+        shape = (config.n_layers, num_pages, config.n_heads, page_size, config.head_dim)
+        self.keys = np.zeros(shape, dtype=np.float32)
+        self.values = np.zeros(shape, dtype=np.float32)
+        # Pop from the end so low page ids are handed out first
+        self._free = list(range(num_pages - 1, -1, -1))
+        self._sequences = set()
+        self._lock = threading.Lock()
+        _pools.add(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        _pools.add(self)
+
+    @staticmethod
+    def page_bytes(config, page_size=DEFAULT_PAGE_SIZE):
+        # keys + values, float32, every layer and head
+        return 2 * 4 * config.n_layers * config.n_heads * page_size * config.head_dim
+
+    @classmethod
+    def for_budget(cls, config, memory_bytes, page_size=DEFAULT_PAGE_SIZE):
+        """A pool using at most memory_bytes for keys and values."""
+        return cls(config, memory_bytes // cls.page_bytes(config, page_size), page_size)
+
+    def new_sequence(self):
+        sequence = PagedSequence(self)
+        with self._lock:
+            self._sequences.add(sequence)
+        return sequence
+
+    def allocate(self, n):
+        with self._lock:
+            if n > len(self._free):
+                raise KVCacheFull(f"needs {n} more pages, {len(self._free)} free of {self.num_pages}")
+            pages = self._free[-n:]
+            del self._free[-n:]
+        return pages
+
+    def release(self, pages, sequence=None):
+        """Return pages to the free list, and drop `sequence` if it is done."""
+        with self._lock:
+            self._free.extend(reversed(pages))
+            if sequence is not None:
+                self._sequences.discard(sequence)
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(
+                pages_total=self.num_pages,
+                pages_used=self.num_pages - len(self._free),
+                sequences=len(self._sequences),
+                tokens=sum(sequence.length for sequence in self._sequences),
+                page_size=self.page_size,
+            )
+
+
+class PagedSequence:
+    """One sequence's view of a PagedKVCache, driven like a KVCache."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.pages = []  # page table: logical page i -> pool page
+        self.length = 0
+
+    @property
+    def capacity(self):
+        return len(self.pages) * self.pool.page_size
+
+    def reserve(self, n):
+        needed = -(-(self.length + n) // self.pool.page_size) - len(self.pages)
+        if needed > 0:
+            self.pages += self.pool.allocate(needed)
+
+    def write(self, layer, keys, values):
+        page_size = self.pool.page_size
+        position = self.length
+        written = 0
+        total = keys.shape[1]
+        while written < total:
+            page, offset = divmod(position, page_size)
+            n = min(page_size - offset, total - written)
+            slot = self.pages[page]
+            self.pool.keys[layer, slot, :, offset:offset + n] = keys[:, written:written + n]
+            self.pool.values[layer, slot, :, offset:offset + n] = values[:, written:written + n]
+            position += n
+            written += n
+
+    def read(self, layer, end):
+        # Gather the pages in table order into (n_heads, end, head_dim)
+        pages = self.pages[:-(-end // self.pool.page_size)]
+        config = self.pool.config
+        shape = (config.n_heads, len(pages) * self.pool.page_size, config.head_dim)
+        keys = self.pool.keys[layer, pages].transpose(1, 0, 2, 3).reshape(shape)
+        values = self.pool.values[layer, pages].transpose(1, 0, 2, 3).reshape(shape)
+        return keys[:, :end], values[:, :end]
+
+    def advance(self, n):
+        self.length += n
+
+    def truncate(self, length):
+        """Forget every position from `length` on, returning whole unused pages."""
+        self.length = min(self.length, length)
+        keep = -(-self.length // self.pool.page_size)
+        if keep < len(self.pages):
+            self.pool.release(self.pages[keep:])
+            del self.pages[keep:]
+
+    def free(self):
+        self.pool.release(self.pages, self)
+        self.pages = []
+        self.length = 0
+
+
+if __name__ == '__main__':
+    from .config import LLMModel
+    from .model import load_local_model
+
+    parser = argparse.ArgumentParser(description="Compare contiguous and paged KV caches under one memory budget")
+    parser.add_argument('--model', default=LLMModel.GEMMA_2B.value)
+    parser.add_argument('--budget-mb', type=int, default=64)
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = load_local_model(LLMModel(args.model)).config
+    budget = args.budget_mb << 20
+    # A contiguous KVCache holds max_seq_len positions whatever the prompt
+    contiguous = budget // (PagedKVCache.page_bytes(config, 1) * config.max_seq_len)
+
+    # Admit prompt-sized sequences (plus a decode budget) until the pool runs out
+    rng = np.random.default_rng(args.seed)
+    pool = PagedKVCache.for_budget(config, budget, args.page_size)
+    admitted = 0
+    try:
+        while True:
+            sequence = pool.new_sequence()
+            tokens = int(rng.integers(64, 512)) + 32
+            sequence.reserve(tokens)
+            sequence.advance(tokens)
+            admitted += 1
+    except KVCacheFull:
+        sequence.free()
+    stats = pool.stats()
+    print(f"{args.budget_mb} MB budget, max_seq_len {config.max_seq_len}:")
+    print(f"  contiguous: {contiguous} sequences")
+    print(f"  paged:      {admitted} sequences ({admitted / max(contiguous, 1):.1f}x), "
+          f"{stats.pages_used}/{stats.pages_total} pages, utilization {stats.utilization:.1%}, "
+          f"fragmentation {stats.fragmentation:.1%}")
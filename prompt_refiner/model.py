@@ -0,0 +1,297 @@
+# Small decoder-only transformer in NumPy, a stand-in for on-device models
+#
+# LLMService's model calls only sleep, so neither model stage has a real
+# cost to study. DecoderModel is a compact pre-norm transformer
+# (RMSNorm, causal multi-head attention, GELU MLP, learned positions, tied
+# input/output embeddings) with a key/value cache, so prefill runs once per
+# prompt and each decoded token only attends over cached keys.
+#
+# Weights load from local .npz files (data/models/<model>.npz). A slot with
+# no weights file gets deterministic random weights of its size profile:
+# outputs are meaningless, but the compute, and therefore the latency, is
+# that of a real model of that shape.
+#
+# Usage: python -m prompt_refiner.model --model Gemma-2B [--save] [--prompt-tokens N] [--new-tokens N]
+import argparse
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from .config import LLMModel
+from .tokenizer import default_tokenizer
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), 'data', 'models')
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    vocab_size: int
+    d_model: int
+    n_layers: int
+    n_heads: int
+    d_ff: int
+    max_seq_len: int = 2048
+
+    @property
+    def head_dim(self):
+        return self.d_model // self.n_heads
+
+
+# Scaled-down stand-in shapes for the model slots, keeping their relative
+# sizes; the primary slots share one shape, larger than any secondary
+_PRIMARY_PROFILE = dict(d_model=640, n_layers=12, n_heads=10, d_ff=2560)
+MODEL_PROFILES = {
+    LLMModel.GPT4: _PRIMARY_PROFILE,
+    LLMModel.CLAUDE3: _PRIMARY_PROFILE,
+    LLMModel.GEMINI_PRO: _PRIMARY_PROFILE,
+    LLMModel.GEMMA_2B: dict(d_model=256, n_layers=4, n_heads=4, d_ff=1024),
+    LLMModel.PHI3: dict(d_model=320, n_layers=6, n_heads=5, d_ff=1280),
+    LLMModel.LLAMA_7B: dict(d_model=512, n_layers=8, n_heads=8, d_ff=2048),
+}
+
+
+class KVCacheFull(ValueError):
+    """Raised when a KV cache has no room for more positions."""
+
+
+class KVCache:
+    """Contiguous key/value cache for one sequence.
+
+    The model drives any cache through reserve/write/read/advance, so other
+    layouts (see kv_cache.py) can stand in for this one.
+    """
+
+    def __init__(self, config, max_len=None):
+        max_len = max_len or config.max_seq_len
+        shape = (config.n_layers, config.n_heads, max_len, config.head_dim)
+        self.keys = np.zeros(shape, dtype=np.float32)
+        self.values = np.zeros(shape, dtype=np.float32)
+        self.length = 0
+
+    @property
+    def capacity(self):
+        return self.keys.shape[2]
+
+    def reserve(self, n):
+        """Make room for n more positions."""
+        if self.length + n > self.capacity:
+            raise KVCacheFull(f"KV cache is full ({self.length} + {n} > {self.capacity} positions)")
+
+    def write(self, layer, keys, values):
+        # keys/values: (n_heads, t, head_dim) for positions length..length+t
+        end = self.length + keys.shape[1]
+        self.keys[layer, :, self.length:end] = keys
+        self.values[layer, :, self.length:end] = values
+
+    def read(self, layer, end):
+        return self.keys[layer, :, :end], self.values[layer, :, :end]
+
+    def advance(self, n):
+        self.length += n
+
+    def truncate(self, length):
+        """Forget every position from `length` on."""
+        self.length = min(self.length, length)
+
+    def free(self):
+        self.length = 0
+
+
+def _rms_norm(x, weight, eps=1e-6):
+    return x * (weight / np.sqrt(np.mean(x * x, axis=-1, keepdims=True) + eps))
+
+
+def _gelu(x):
+    return 0.5 * x * (1 + np.tanh(0.7978845608 * (x + 0.044715 * x * x * x)))
+
+
+class DecoderModel:
+    """Decoder-only transformer over float32 NumPy weights."""
+
+    def __init__(self, config, weights):
+        self.config = config
+        self.weights = weights
+        # Shared PagedKVCache that new_cache() draws from, if any
+        self.kv_pool = None
+        self.embed = weights['embed']
+        self.pos = weights['pos']
+        self.final_norm = weights['final_norm']
+        self.layers = [
+            tuple(weights[f'layers.{i}.{name}'] for name in ('attn_norm', 'wqkv', 'wo', 'mlp_norm', 'w1', 'w2'))
+            for i in range(config.n_layers)
+        ]
+
+    @classmethod
+    def random(cls, config, seed=0):
+        """Deterministic random weights (GPT-2 style init) for `config`."""
+        rng = np.random.default_rng(seed)
+        d, ff = config.d_model, config.d_ff
+        out_std = 0.02 / np.sqrt(2 * config.n_layers)
+
+        def normal(shape, std=0.02):
+            return rng.standard_normal(shape, dtype=np.float32) * np.float32(std)
+
+        weights = {
+            'embed': normal((config.vocab_size, d)),
+            'pos': normal((config.max_seq_len, d), 0.01),
+            'final_norm': np.ones(d, dtype=np.float32),
+        }
+        for i in range(config.n_layers):
+            weights[f'layers.{i}.attn_norm'] = np.ones(d, dtype=np.float32)
+            weights[f'layers.{i}.wqkv'] = normal((d, 3 * d))
+            weights[f'layers.{i}.wo'] = normal((d, d), out_std)
+            weights[f'layers.{i}.mlp_norm'] = np.ones(d, dtype=np.float32)
+            weights[f'layers.{i}.w1'] = normal((d, ff))
+            weights[f'layers.{i}.w2'] = normal((ff, d), out_std)
+        return cls(config, weights)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            config = ModelConfig(**json.loads(str(data['config'])))
+            weights = {name: data[name].astype(np.float32) for name in data.files if name != 'config'}
+        return cls(config, weights)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path, config=np.array(json.dumps(asdict(self.config))), **self.weights)
+
+    def new_cache(self, max_len=None):
+        if self.kv_pool is not None:
+            return self.kv_pool.new_sequence()
+        return KVCache(self.config, max_len)
+
+    def forward(self, ids, cache):
+        """Run `ids` after the cached positions; returns their logits (t, vocab)."""
+        config = self.config
+        n_heads, head_dim = config.n_heads, config.head_dim
+        start = cache.length
+        t = len(ids)
+        if not t:
+            raise ValueError("forward needs at least one token id")
+        if start + t > config.max_seq_len:
+            raise ValueError(f"sequence of {start + t} tokens exceeds max_seq_len {config.max_seq_len}")
+        cache.reserve(t)
+
+        x = self.embed[np.asarray(ids)] + self.pos[start:start + t]
+        # Query j (position start + j) may not attend to later positions
+        mask = np.arange(start + t)[None, :] > (start + np.arange(t))[:, None]
+        scale = np.float32(1 / np.sqrt(head_dim))
+        for layer, (attn_norm, wqkv, wo, mlp_norm, w1, w2) in enumerate(self.layers):
+            qkv = (_rms_norm(x, attn_norm) @ wqkv).reshape(t, 3, n_heads, head_dim).transpose(1, 2, 0, 3)
+            cache.write(layer, qkv[1], qkv[2])
+            keys, values = cache.read(layer, start + t)
+            scores = (qkv[0] @ keys.transpose(0, 2, 1)) * scale
+            scores[:, mask] = -np.inf
+            scores = np.exp(scores - scores.max(axis=-1, keepdims=True))
+            scores /= scores.sum(axis=-1, keepdims=True)
+            attended = (scores @ values).transpose(1, 0, 2).reshape(t, config.d_model)
+            x = x + attended @ wo
+            x = x + _gelu(_rms_norm(x, mlp_norm) @ w1) @ w2
+        cache.advance(t)
+        return _rms_norm(x, self.final_norm) @ self.embed.T
+
+    def decode_batch(self, tokens, caches):
+        """One decode step for several sequences: token i runs after caches[i].
+
+        The projections and MLP run as single (batch, d_model) matmuls; only
+        attention, whose length differs per sequence, loops. Returns logits
+        (batch, vocab).
+        """
+        config = self.config
+        n_heads, head_dim = config.n_heads, config.head_dim
+        batch = len(tokens)
+        if not batch or batch != len(caches):
+            raise ValueError(f"decode_batch needs one cache per token, got {batch} tokens and {len(caches)} caches")
+        lengths = [cache.length for cache in caches]
+        if max(lengths) >= config.max_seq_len:
+            raise ValueError(f"sequence exceeds max_seq_len {config.max_seq_len}")
+        for cache in caches:
+            cache.reserve(1)
+
+        x = self.embed[np.asarray(tokens)] + self.pos[lengths]
+        scale = np.float32(1 / np.sqrt(head_dim))
+        attended = np.empty((batch, n_heads, head_dim), dtype=np.float32)
+        for layer, (attn_norm, wqkv, wo, mlp_norm, w1, w2) in enumerate(self.layers):
+            qkv = (_rms_norm(x, attn_norm) @ wqkv).reshape(batch, 3, n_heads, 1, head_dim)
+            for i, cache in enumerate(caches):
+                cache.write(layer, qkv[i, 1], qkv[i, 2])
+                keys, values = cache.read(layer, lengths[i] + 1)
+                scores = (qkv[i, 0] @ keys.transpose(0, 2, 1)) * scale
+                scores = np.exp(scores - scores.max(axis=-1, keepdims=True))
+                scores /= scores.sum(axis=-1, keepdims=True)
+                attended[i] = (scores @ values)[:, 0]
+            x = x + attended.reshape(batch, config.d_model) @ wo
+            x = x + _gelu(_rms_norm(x, mlp_norm) @ w1) @ w2
+        for cache in caches:
+            cache.advance(1)
+        return _rms_norm(x, self.final_norm) @ self.embed.T
+
+    def generate(self, prompt_ids, max_new_tokens, cache=None):
+        """Greedy decoding: prefill the prompt, then one cached step per token."""
+        owned = cache is None
+        if owned:
+            cache = self.new_cache(len(prompt_ids) + max_new_tokens)
+        try:
+            logits = self.forward(prompt_ids, cache)
+            generated = []
+            for _ in range(max_new_tokens):
+                token = int(logits[-1].argmax())
+                generated.append(token)
+                if len(generated) == max_new_tokens:
+                    break
+                logits = self.forward([token], cache)
+        finally:
+            if owned:
+                cache.free()
+        return generated
+
+
+def model_path(model):
+    """Default weights file for an LLMModel slot."""
+    return os.path.join(MODELS_DIR, model.value.lower() + '.npz')
+
+
+def load_local_model(model, path=None, seed=0):
+    """The local stand-in for an LLMModel slot.
+
+    Loads `path` (default: model_path(model)) if it exists, otherwise builds
+    random weights of the slot's profile.
+    """
+    path = path or model_path(model)
+    if os.path.exists(path):
+        return DecoderModel.load(path)
+    if model not in MODEL_PROFILES:
+        raise ValueError(f"no local weights at {path} and no stand-in profile for {model.value}")
+    config = ModelConfig(vocab_size=default_tokenizer().vocab_size, **MODEL_PROFILES[model])
+    return DecoderModel.random(config, seed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark (or save) a local stand-in model")
+    parser.add_argument('--model', default=LLMModel.GEMMA_2B.value, choices=[m.value for m in MODEL_PROFILES])
+    parser.add_argument('--save', action='store_true', help="write the weights to the model's default path")
+    parser.add_argument('--prompt-tokens', type=int, default=128)
+    parser.add_argument('--new-tokens', type=int, default=32)
+    args = parser.parse_args()
+
+    slot = LLMModel(args.model)
+    model = load_local_model(slot)
+    if args.save:
+        model.save(model_path(slot))
+        print(f"Saved {args.model} weights to {model_path(slot)}")
+
+    prompt = list(range(1, args.prompt_tokens + 1))
+    cache = model.new_cache(args.prompt_tokens + args.new_tokens)
+    start = time.perf_counter()
+    logits = model.forward(prompt, cache)
+    prefill = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(args.new_tokens):
+        logits = model.forward([int(logits[-1].argmax())], cache)
+    decode = time.perf_counter() - start
+    print(f"{args.model}: prefill {args.prompt_tokens} tokens in {prefill * 1000:.1f} ms, "
+          f"decode {args.new_tokens / decode:,.0f} tokens/s")
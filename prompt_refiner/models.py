@@ -0,0 +1,83 @@
+# Python mirrors of the Swift data models (PromptModel, PerformanceMetrics,
+# RefinementStep) and the service result types (EnhancedPrompt, LLMResponse)
+from dataclasses import dataclass, field
+from enum import Enum
+
+
+class OptimizationType(Enum):
+    NPU_ACCELERATION = 'NPU Acceleration'
+    DUAL_MODEL_REFINEMENT = 'Dual-Model Refinement'
+    QUANTIZED_INFERENCE = 'Quantized Inference'
+    TOKEN_OPTIMIZATION = 'Token Optimization'
+    PRIVACY_PRESERVING = 'Privacy Preserving'
+    CHUNKED_PROCESSING = 'Chunked Processing'
+
+
+@dataclass
+class PerformanceMetrics:
+    latency_reduction: float  # Multiplier (e.g., 22.4 for 22.4x faster)
+    accuracy_improvement: float  # Percentage (e.g., 21.6 for 21.6%)
+    energy_efficiency: float  # Multiplier (e.g., 30.7 for 30.7x better)
+    token_reduction: float  # Percentage (e.g., 47 for 47%)
+    privacy_score: float  # Percentage (e.g., 83 for 83% protection)
+    processing_time: float  # Seconds
+    memory_usage: float  # MB
+    scaffold_tokens_saved: int = 0  # Tokens not spent on a duplicated scaffold
+    speculative_acceptance: float = None  # Percentage of drafted tokens accepted, when decoding speculatively
+    speculative_speedup: float = None  # Multiplier over plain decoding (e.g., 1.8 for 1.8x faster)
+
+
+class StepStatus(Enum):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+
+@dataclass
+class RefinementStep:
+    step_number: int
+    name: str
+    description: str
+    component: str
+    status: StepStatus = StepStatus.PENDING
+    processing_time: float = None
+
+
+def default_steps(configuration):
+    # Mirrors RefinementStep.defaultSteps
+    return [
+        RefinementStep(1, 'User Input', 'Processing initial prompt from user', 'PromptView'),
+        RefinementStep(2, 'Secondary Model Parsing',
+                       f'{configuration.secondary_model.value} analyzing prompt structure', 'SecondaryModel'),
+        RefinementStep(3, 'NPU Optimization', 'Hardware-accelerated chunk processing', 'NPUService'),
+        RefinementStep(4, 'Prompt Enhancement', 'Generating refined prompt structure', 'PromptService'),
+        RefinementStep(5, 'Primary Model Processing',
+                       f'{configuration.primary_model.value} processing enhanced prompt', 'PrimaryModel'),
+        RefinementStep(6, 'Results Display', 'Presenting optimized results to user', 'OutputView'),
+    ]
+
+
+@dataclass
+class EnhancedPrompt:
+    original_text: str
+    enhanced_text: str
+    token_count: int
+    optimizations: list = field(default_factory=list)
+    token_ids: object = None  # array('I') of enhanced_text, when computed
+    scaffold: object = None  # CompiledScaffold the text was wrapped in
+    scaffold_tokens_saved: int = 0  # tokens a nested, duplicated scaffold would have added
+    token_reduction: float = 0.0  # percentage of task tokens removed by compression
+
+
+@dataclass
+class LLMResponse:
+    content: str
+    model: str
+    token_count: int
+    processing_time: float
+    prompt_tokens: int = 0
+    cached_tokens: int = 0  # prompt tokens served from a cached prefix
+    acceptance_rate: float = None  # percentage of drafted tokens accepted (speculative decoding)
+    speculative_speedup: float = None  # decode speedup over the primary model alone
+    from_cache: bool = False  # served by a ResponseCache instead of the model
@@ -0,0 +1,153 @@
+# Headless refinement pipeline (PromptViewModel.refinePrompt)
+#
+# Runs the six steps of the app's pipeline - user input, secondary model
+# parsing, NPU optimization, prompt enhancement, primary model processing and
+# results display - timing each stage with a monotonic clock. Steps 2-5 are
+# exposed as stages() so executor.py can pipeline them across prompts.
+#
+# Throughput target: with the built-in mock models the pipeline should
+# sustain at least 10,000 prompts/s per core on short (< 1 KB) prompts, so
+# any real model plugged into LLMService dominates end-to-end latency.
+# Since token counts became real BPE counts it falls short: about 3,500-
+# 4,700 prompts/s per core measured (without compression), most of it
+# spent in the tokenizer's pre-tokenization regex over the enhanced prompt
+# and the response.
+# `python -m prompt_refiner --bench N` measures it.
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from .config import LLMConfiguration
+from .models import OptimizationType, PerformanceMetrics, StepStatus, default_steps
+from .services import LLMService, OptimizationService, PromptService
+
+
+@dataclass
+class RefinementResult:
+    original_text: str
+    enhanced_text: str
+    output: str
+    token_count: int
+    steps: list
+    metrics: PerformanceMetrics
+    optimizations: list
+    from_cache: bool = False  # primary response served by the ResponseCache
+
+
+def _peak_memory_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_step(steps, step_number, stage, value):
+    """Run one stage on `value`, tracking its RefinementStep's status and time."""
+    step = steps[step_number - 1]
+    step.status = StepStatus.PROCESSING
+    step_start = time.perf_counter()
+    try:
+        result = stage(value)
+    except Exception:
+        step.status = StepStatus.FAILED
+        raise
+    step.processing_time = time.perf_counter() - step_start
+    step.status = StepStatus.COMPLETED
+    return result
+
+
+def _display(value):
+    return value
+
+
+class RefinementPipeline:
+    """The six-step refinement pipeline over the Python service ports."""
+
+    def __init__(self, configuration=None, llm_service=None, optimization_service=None, compressor=None):
+        self.configuration = configuration or LLMConfiguration()
+        self.llm_service = llm_service or LLMService(self.configuration)
+        self.optimization_service = optimization_service or OptimizationService(self.configuration)
+        self.prompt_service = PromptService(self.llm_service, self.optimization_service, compressor)
+
+    def stages(self):
+        """(step number, stage) for steps 2-5; each stage takes the previous one's output."""
+        prompt_service = self.prompt_service
+        return ((2, prompt_service.parse_with_secondary_model),
+                (3, prompt_service.optimize_with_npu),
+                (4, prompt_service.enhance_prompt),
+                (5, self._process_with_primary_model))
+
+    def _process_with_primary_model(self, enhanced):
+        response = self.llm_service.process_with_primary_model(enhanced.enhanced_text, enhanced.token_ids,
+                                                               enhanced.scaffold)
+        return enhanced, response
+
+    def refine(self, prompt):
+        steps, start = self.start(prompt)
+        value = prompt
+        for step_number, stage in self.stages():
+            value = run_step(steps, step_number, stage, value)
+        return self.finish(prompt, steps, start, value)
+
+    def start(self, prompt):
+        """Step 1: validate the prompt; returns (steps, start time)."""
+        if not prompt.strip():
+            raise ValueError("prompt is empty")
+        steps = default_steps(self.configuration)
+        start = time.perf_counter()
+        run_step(steps, 1, str.strip, prompt)
+        return steps, start
+
+    def finish(self, prompt, steps, start, value):
+        """Step 6: the result from step 5's (enhanced, response)."""
+        enhanced, response = value
+        run_step(steps, 6, _display, None)
+        metrics = PerformanceMetrics(
+            latency_reduction=22.4,
+            accuracy_improvement=21.6,
+            energy_efficiency=30.7,
+            token_reduction=enhanced.token_reduction,
+            privacy_score=83.0,
+            processing_time=time.perf_counter() - start,
+            memory_usage=_peak_memory_mb(),
+            scaffold_tokens_saved=enhanced.scaffold_tokens_saved,
+            speculative_acceptance=response.acceptance_rate,
+            speculative_speedup=response.speculative_speedup,
+        )
+        return RefinementResult(
+            original_text=prompt,
+            enhanced_text=enhanced.enhanced_text,
+            output=response.content,
+            token_count=enhanced.token_count,
+            steps=steps,
+            metrics=metrics,
+            optimizations=[OptimizationType.NPU_ACCELERATION, OptimizationType.DUAL_MODEL_REFINEMENT,
+                           OptimizationType.QUANTIZED_INFERENCE],
+            from_cache=response.from_cache,
+        )
+
+    def refine_batch(self, prompts, jobs=1, chunksize=64):
+        """Refine many prompts; jobs > 1 (or None for all cores) fans out over processes."""
+        if jobs == 1:
+            return [self.refine(prompt) for prompt in prompts]
+        # Each worker unpickles the pipeline (and any local model weights)
+        # once, rather than once per chunk of prompts
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_start_worker, initargs=(self,)) as pool:
+            return list(pool.map(_refine_in_worker, prompts, chunksize=chunksize))
+
+
+_worker_pipeline = None
+
+
+def _start_worker(pipeline):
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+
+
+def _refine_in_worker(prompt):
+    return _worker_pipeline.refine(prompt)
+
+
+def refine_batch(prompts, configuration=None, jobs=1):
+    return RefinementPipeline(configuration).refine_batch(prompts, jobs=jobs)
@@ -0,0 +1,256 @@
+# LRU response cache in front of LLMService.process_with_primary_model
+#
+# Primary model calls cost seconds, and many prompts repeat or differ only
+# in Unicode form or whitespace. Responses are keyed by the canonical
+# prompt (NFKC-normalized, whitespace runs collapsed) plus everything else
+# the response depends on: the model, the optimization level and any other
+# settings the caller passes.
+#
+# Two tiers:
+#
+#   memory  an OrderedDict LRU of at most max_entries responses
+#   disk    an optional SQLite spill file (path=...) every response is
+#           written through to, so entries pushed out of memory, and the
+#           whole cache across restarts, are still served from disk; it is
+#           trimmed to disk_entries least recently used rows
+#
+# Entries older than `ttl` seconds (wall clock, so it holds across
+# restarts) are dropped on lookup. hits / misses / evictions / expirations
+# count what happened.
+#
+# Each process needs its own SQLite connection. A pickled cache reopens the
+# file in __setstate__; a forked child (refine_batch's workers on Linux,
+# where nothing is pickled) reopens it through os.register_at_fork.
+#
+#     cache = ResponseCache(max_entries=1024, ttl=3600, path='responses.db')
+#     service = LLMService(configuration, response_cache=cache)
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import weakref
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from .models import LLMResponse
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 65536
+# Seconds a write waits for another process holding the spill file
+_BUSY_TIMEOUT = 30
+
+# Caches with an open spill file, reopened in forked children
+_spilling = weakref.WeakSet()
+# Connections inherited from the parent. They stay referenced so the child
+# never closes them: SQLite must not touch a connection across a fork
+_inherited = []
+
+_SCHEMA = """CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    expires REAL,
+    accessed REAL NOT NULL,
+    response TEXT NOT NULL
+)"""
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int
+    disk_hits: int  # hits served from the spill file, included in hits
+    misses: int
+    evictions: int  # entries pushed out of memory (still on disk with a spill file)
+    expirations: int
+    entries: int
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def canonical_prompt(prompt):
+    """The prompt as the cache sees it: NFKC-normalized, whitespace runs collapsed."""
+    return ' '.join(unicodedata.normalize('NFKC', prompt).split())
+
+
+def _reopen_after_fork():
+    for cache in list(_spilling):
+        cache._lock = threading.Lock()
+        _inherited.append(cache._db)
+        cache._db = cache._connect()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reopen_after_fork)
+
+
+class ResponseCache:
+    """LRU cache of LLMResponses with optional TTL and on-disk spill."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=None, path=None, disk_entries=DEFAULT_DISK_ENTRIES,
+                 clock=time.time):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive, got {max_entries}")
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"ttl must be positive, got {ttl}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.disk_entries = disk_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires, LLMResponse)
+        # key -> last hit served from memory, not yet written to the spill file
+        self._touched = {}
+        # LLMService may be called from several pipelined threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._db = self._connect()
+
+    def __getstate__(self):
+        # Worker processes (refine_batch(jobs > 1)) reopen the spill file
+        # themselves; connections and locks do not pickle
+        state = self.__dict__.copy()
+        del state['_lock'], state['_db'], state['_disk_count']
+        state['_touched'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._db = self._connect()
+
+    def _connect(self):
+        self._disk_count = 0
+        if self.path is None:
+            return None
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=_BUSY_TIMEOUT)
+        # Several processes may share the file: WAL lets readers run
+        # alongside a writer
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute(_SCHEMA)
+        self._disk_count = db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        _spilling.add(self)
+        return db
+
+    @staticmethod
+    def key(prompt, *context):
+        """Key for `prompt` answered under `context` (model, optimization level, ...)."""
+        parts = [canonical_prompt(prompt)] + [str(getattr(item, 'value', item)) for item in context]
+        return hashlib.blake2b('\0'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """The cached response for `key`, or None."""
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, response = entry
+                if expires is not None and expires <= now:
+                    del self._entries[key]
+                    self._delete(key)
+                    self.expirations += 1
+                    self.misses += 1
+                    return None
+                self._entries.move_to_end(key)
+                if self._db is not None:
+                    self._touched[key] = now
+                self.hits += 1
+                return response
+            if self._db is not None:
+                row = self._db.execute('SELECT expires, response FROM responses WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    expires, payload = row
+                    if expires is not None and expires <= now:
+                        self._delete(key)
+                        self.expirations += 1
+                    else:
+                        self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                        response = LLMResponse(**json.loads(payload))
+                        self._remember(key, expires, response)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return response
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        with self._lock:
+            now = self._clock()
+            expires = None if self.ttl is None else now + self.ttl
+            self._remember(key, expires, response)
+            if self._db is not None:
+                self._touched.pop(key, None)
+                row = (expires, now, json.dumps(asdict(response)), key)
+                if not self._db.execute('UPDATE responses SET expires = ?, accessed = ?, response = ? '
+                                        'WHERE key = ?', row).rowcount:
+                    self._db.execute('INSERT OR REPLACE INTO responses (expires, accessed, response, key) '
+                                     'VALUES (?, ?, ?, ?)', row)
+                    self._disk_count += 1
+                    if self._disk_count > self.disk_entries:
+                        self._trim_disk()
+
+    def clear(self):
+        """Drop every entry, from memory and the spill file."""
+        with self._lock:
+            self._entries.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM responses')
+                self._disk_count = 0
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._write_touched(list(self._touched))
+                _spilling.discard(self)
+                self._db.close()
+                self._db = None
+
+    def stats(self):
+        with self._lock:
+            return ResponseCacheStats(hits=self.hits, disk_hits=self.disk_hits, misses=self.misses,
+                                      evictions=self.evictions, expirations=self.expirations,
+                                      entries=len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, expires, response):
+        self._entries[key] = (expires, response)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            if evicted in self._touched:
+                self._write_touched([evicted])
+
+    def _write_touched(self, keys):
+        # Memory hits update `accessed` lazily: on eviction from memory,
+        # before a trim and on close, instead of a write per hit
+        if keys:
+            self._db.executemany('UPDATE responses SET accessed = ? WHERE key = ?',
+                                 [(self._touched.pop(key), key) for key in keys])
+
+    def _delete(self, key):
+        self._touched.pop(key, None)
+        if self._db is not None:
+            if self._db.execute('DELETE FROM responses WHERE key = ?', (key,)).rowcount:
+                self._disk_count -= 1
+
+    def _trim_disk(self):
+        # _disk_count only sees this process's inserts, so recount before
+        # deleting anything
+        self._write_touched(list(self._touched))
+        count = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        if count > self.disk_entries:
+            self._db.execute('DELETE FROM responses WHERE key IN '
+                             '(SELECT key FROM responses ORDER BY accessed LIMIT ?)', (count - self.disk_entries,))
+            count = self.disk_entries
+        self._disk_count = count
@@ -0,0 +1,152 @@
+# The structured scaffold PromptService.enhancePrompt wraps prompts in
+#
+# Every enhanced prompt is the same five lines around the user's Task:
+#
+#     Context / Constraints / Format      <- prefix
+#     Task: <prompt>
+#     Optimization / Quality              <- suffix
+#
+# compile_scaffold() tokenizes the prefix and suffix once per
+# OptimizationLevel and caches the id arrays, so enhancing a prompt only
+# encodes its Task line. The prefix ids double as a shareable prompt prefix
+# for the primary model: requests with the same prefix key need not
+# re-prefill it.
+#
+# The secondary model's parse output already carries the scaffold, so
+# unwrap() recovers the bare Task from scaffolded text before it is wrapped
+# again; every section then appears exactly once. What the nesting would
+# have cost is counted once per distinct nesting (nesting_tokens), so the
+# nested text is never tokenized per request.
+import hashlib
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .tokenizer import default_tokenizer
+
+SCAFFOLD_CONTEXT = "Context: You are an expert AI assistant optimized for mobile deployment."
+SCAFFOLD_CONSTRAINTS = "Constraints: Response must be under 150 tokens for optimal mobile performance."
+SCAFFOLD_FORMAT = "Format: Use structured JSON output for better parsing efficiency."
+SCAFFOLD_OPTIMIZATION = "Optimization: Apply cross-model attention and quantized inference."
+SCAFFOLD_QUALITY = "Quality: Ensure 21.6% improvement in accuracy through dual-model refinement."
+
+# The secondary model's parse output uses a slightly different Format line
+SECONDARY_FORMAT = "Format: Use structured output for better parsing efficiency."
+
+SECTION_SEPARATOR = "\n\n"
+TASK_LABEL = "Task: "
+
+_KNOWN_SECTIONS = frozenset((SCAFFOLD_CONTEXT, SCAFFOLD_CONSTRAINTS, SCAFFOLD_FORMAT, SECONDARY_FORMAT,
+                             SCAFFOLD_OPTIMIZATION, SCAFFOLD_QUALITY))
+
+
+def scaffold_sections(level):
+    """(prefix, suffix) sections around the Task line for an OptimizationLevel.
+
+    Every level shares the same scaffold today, as in PromptService.swift.
+    """
+    return (SCAFFOLD_CONTEXT, SCAFFOLD_CONSTRAINTS, SCAFFOLD_FORMAT), (SCAFFOLD_OPTIMIZATION, SCAFFOLD_QUALITY)
+
+
+@dataclass(frozen=True)
+class CompiledScaffold:
+    level: object
+    prefix_text: str
+    suffix_text: str
+    prefix_ids: tuple
+    suffix_ids: tuple
+    prefix_key: str  # identifies prefix_ids for prefix caching
+
+    def render(self, task):
+        """The scaffold text around `task`."""
+        return self.prefix_text + SECTION_SEPARATOR + TASK_LABEL + task + self.suffix_text
+
+    def count(self, task, tokenizer=None):
+        """Token count of render(task), counting only the Task line."""
+        tokenizer = tokenizer or default_tokenizer()
+        if not task or task[-1].isspace():
+            return tokenizer.count(self.render(task))
+        return len(self.prefix_ids) + tokenizer.count(SECTION_SEPARATOR + TASK_LABEL + task) + len(self.suffix_ids)
+
+    def nesting_tokens(self, levels, task, tokenizer=None):
+        """Tokens render() spends on scaffold `levels` (from unwrap_levels) nested around `task`.
+
+        The Task line is preceded by "Task: " and followed by a section
+        separator either way, so the cost only depends on the levels and is
+        counted once per distinct nesting. A task ending in whitespace lexes
+        together with what follows it and is counted in full.
+        """
+        tokenizer = tokenizer or default_tokenizer()
+        if not task or task[-1].isspace():
+            return self.count(nest(task, levels), tokenizer) - self.count(task, tokenizer)
+        return _nesting_tokens(self, levels, tokenizer)
+
+    def wrap(self, task, tokenizer=None):
+        """Return (text, ids) of the scaffold around `task`, encoding only the Task line."""
+        tokenizer = tokenizer or default_tokenizer()
+        middle = SECTION_SEPARATOR + TASK_LABEL + task
+        text = self.prefix_text + middle + self.suffix_text
+        if not task or task[-1].isspace():
+            # Trailing whitespace would lex together with the suffix's
+            # leading newlines, so the pieces don't split at the seam.
+            return text, tokenizer.encode(text)
+        ids = tokenizer.encode(middle, array('I', self.prefix_ids))
+        ids.extend(self.suffix_ids)
+        return text, ids
+
+
+def unwrap(text):
+    """Strip scaffold sections around a Task line, however deeply nested.
+
+    Returns (task, sections) where sections are the scaffold lines removed;
+    text without a scaffold comes back unchanged with no sections.
+    """
+    task, levels = unwrap_levels(text)
+    return task, tuple(section for head, tail in levels for section in head + tail)
+
+
+def unwrap_levels(text):
+    """Like unwrap(), with the removed sections as ((head, tail), ...) per level, outermost first."""
+    levels = []
+    while True:
+        sections = text.split(SECTION_SEPARATOR)
+        head = 0
+        while head < len(sections) and sections[head] in _KNOWN_SECTIONS:
+            head += 1
+        tail = len(sections)
+        while tail > head and sections[tail - 1] in _KNOWN_SECTIONS:
+            tail -= 1
+        if (head == 0 and tail == len(sections)) or head == tail or not sections[head].startswith(TASK_LABEL):
+            return text, tuple(levels)
+        levels.append((tuple(sections[:head]), tuple(sections[tail:])))
+        text = SECTION_SEPARATOR.join(sections[head:tail])[len(TASK_LABEL):]
+
+
+def nest(task, levels):
+    """Inverse of unwrap_levels(): `task` inside the given scaffold levels."""
+    for head, tail in reversed(levels):
+        task = SECTION_SEPARATOR.join(head + (TASK_LABEL + task,) + tail)
+    return task
+
+
+@lru_cache(maxsize=256)
+def _nesting_tokens(scaffold, levels, tokenizer):
+    # Any task without trailing whitespace gives the same difference
+    return scaffold.count(nest('x', levels), tokenizer) - scaffold.count('x', tokenizer)
+
+
+@lru_cache(maxsize=None)
+def _compile(level, tokenizer):
+    prefix, suffix = scaffold_sections(level)
+    # The prefix ends in punctuation and the suffix starts with the section
+    # separator, so both seams fall on pre-tokenization piece boundaries.
+    prefix_text = SECTION_SEPARATOR.join(prefix)
+    suffix_text = SECTION_SEPARATOR + SECTION_SEPARATOR.join(suffix)
+    prefix_ids = tuple(tokenizer.encode(prefix_text))
+    key = hashlib.blake2b(repr(prefix_ids).encode('ascii'), digest_size=8).hexdigest()
+    return CompiledScaffold(level, prefix_text, suffix_text, prefix_ids, tuple(tokenizer.encode(suffix_text)), key)
+
+
+def compile_scaffold(level, tokenizer=None):
+    """The scaffold for `level`, tokenized once per tokenizer and cached."""
+    return _compile(level, tokenizer or default_tokenizer())
@@ -0,0 +1,333 @@
+# Python ports of LLMService, PromptService and OptimizationService
+#
+# Same stages and outputs as the Swift services generated by script_5.py,
+# minus the simulated Task.sleep delays, so the pipeline can run headless on
+# a server and be benchmarked for real.
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+
+from .chunking import FIXED, chunk_spans, iter_stream_chunks
+from .config import LLMConfiguration
+from .models import EnhancedPrompt, LLMResponse, OptimizationType
+from .scaffold import (SCAFFOLD_CONSTRAINTS, SCAFFOLD_CONTEXT, SCAFFOLD_OPTIMIZATION, SCAFFOLD_QUALITY,
+                       SECONDARY_FORMAT, compile_scaffold, unwrap_levels)
+from .speculative import SpeculativeDecoder, SpeculativeStats
+from .tokenizer import count_tokens, default_tokenizer
+
+# Keeps at most this many shared prompt prefixes "prefilled" per LLMService
+_PREFIX_CACHE_SIZE = 32
+# Tokens a local secondary model decodes per parse
+PARSE_TOKENS = 32
+# Tokens a local primary model decodes per response
+RESPONSE_TOKENS = 32
+
+_CREATE_RESPONSE = """{
+  "status": "success",
+  "model": "%(model)s",
+  "optimization_applied": "dual_model_refinement",
+  "performance_boost": "21.6%%",
+  "response": {
+    "content": "Enhanced content generated with improved accuracy and mobile optimization. Structured output with reduced token count and improved semantic coherence.",
+    "metadata": {
+      "tokens_saved": 47,
+      "processing_time_ms": 340,
+      "energy_efficiency": "30.7x improvement",
+      "accuracy_score": 0.94
+    }
+  }
+}"""
+
+_ANALYZE_RESPONSE = """{
+  "analysis_result": {
+    "summary": "Comprehensive analysis delivered with enhanced precision through cross-model attention mechanisms.",
+    "key_points": [
+      "NPU-accelerated processing achieved 22.4x latency reduction",
+      "Quantized inference maintained 98%% accuracy with 4-bit precision",
+      "Dynamic model allocation optimized energy consumption"
+    ],
+    "confidence_score": 0.96,
+    "processing_metrics": {
+      "chunk_size": %(chunk_size)d,
+      "optimization_level": "%(optimization_level)s",
+      "privacy_preserved": %(privacy_mode)s
+    }
+  }
+}"""
+
+_DEFAULT_RESPONSE = """Enhanced Mobile-Optimized Response:
+
+The original prompt has been processed through our advanced refinement pipeline with the following optimizations:
+
+🔧 Technical Enhancements:
+- Cross-model attention mechanisms applied
+- Quantized inference with 4-bit precision
+- Dynamic resource allocation based on %(optimization_level)s mode
+- NPU acceleration: Active (22.4x faster)
+
+📊 Performance Results:
+- Processing time: 340ms (67.8%% improvement)
+- Token efficiency: 47%% reduction
+- Accuracy score: 94.2%% (+21.6%% vs baseline)
+- Energy consumption: 30.7x more efficient
+
+🎯 Optimized Output:
+[Enhanced response tailored for mobile deployment with improved semantic understanding, reduced computational overhead, and maintained quality through federated learning approaches.]"""
+
+
+class OptimizationError(Exception):
+    """Raised by OptimizationService, mirroring OptimizationService.OptimizationError."""
+
+
+class LLMService:
+    """Primary/secondary model calls (LLMService.swift)."""
+
+    def __init__(self, configuration=None, local_models=None, draft_tokens=0, response_cache=None):
+        self.configure(configuration or LLMConfiguration())
+        # prefix key -> prefix token ids already prefilled by the primary model
+        self._prefixes = OrderedDict()
+        self._prefixes_lock = threading.Lock()
+        # LLMModel slot -> local DecoderModel running that slot's compute
+        self.local_models = dict(local_models or {})
+        # With both slots local, the secondary model drafts this many tokens
+        # per primary pass (speculative decoding); 0 decodes plainly
+        self.draft_tokens = draft_tokens
+        self._speculative = None
+        # ResponseCache consulted before the primary model, if any
+        self.response_cache = response_cache
+
+    def __getstate__(self):
+        # RefinementPipeline.refine_batch ships the service to worker
+        # processes; locks do not pickle, and each worker builds its own
+        # speculative decoder
+        state = self.__dict__.copy()
+        del state['_prefixes_lock']
+        state['_speculative'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._prefixes_lock = threading.Lock()
+
+    def configure(self, settings):
+        self.settings = settings
+        self.primary_model = settings.primary_model
+        self.secondary_model = settings.secondary_model
+        self.optimization_level = settings.optimization_level
+        self.use_npu = settings.use_npu
+        self.privacy_mode = settings.privacy_mode
+
+    def process_with_primary_model(self, prompt, token_ids=None, prefix=None):
+        """processWithPrimaryModel: run the enhanced prompt through the primary model.
+
+        `token_ids` are the prompt's ids when already known, and `prefix` a
+        CompiledScaffold whose prefix_ids start the prompt. A prefix seen
+        before is reused instead of prefilled again (cached_tokens).
+
+        With a local model in the primary slot, RESPONSE_TOKENS tokens are
+        decoded through it, speculatively when draft_tokens is set and the
+        secondary slot is local too.
+
+        With a response_cache, a prompt answered before under the same
+        settings is served from the cache (from_cache) without the model.
+        """
+        start = time.perf_counter()
+        cache = self.response_cache
+        if cache is not None:
+            key = cache.key(prompt, self.primary_model, self.optimization_level, self.settings.chunk_size,
+                            self.privacy_mode)
+            cached = cache.get(key)
+            if cached is not None:
+                return replace(cached, processing_time=time.perf_counter() - start, cached_tokens=0,
+                               acceptance_rate=None, speculative_speedup=None, from_cache=True)
+        prompt_tokens = len(token_ids) if token_ids is not None else count_tokens(prompt)
+        cached_tokens = 0
+        if prefix is not None:
+            # Pipelined stages may call in from several threads
+            with self._prefixes_lock:
+                if prefix.prefix_key in self._prefixes:
+                    self._prefixes.move_to_end(prefix.prefix_key)
+                    cached_tokens = len(prefix.prefix_ids)
+                else:
+                    self._prefixes[prefix.prefix_key] = prefix.prefix_ids
+                    if len(self._prefixes) > _PREFIX_CACHE_SIZE:
+                        self._prefixes.popitem(last=False)
+        speculative = self._run_primary(prompt, token_ids)
+        content = self._mock_response(prompt)
+        response = LLMResponse(
+            content=content,
+            model=self.primary_model.value,
+            token_count=count_tokens(content),
+            processing_time=time.perf_counter() - start,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
+            acceptance_rate=None if speculative is None else 100.0 * speculative.acceptance_rate,
+            speculative_speedup=None if speculative is None else speculative.speedup,
+        )
+        if cache is not None:
+            cache.put(key, response)
+        return response
+
+    def _run_primary(self, prompt, token_ids):
+        # Returns the SpeculativeStats of this call when it decoded speculatively
+        local_model = self.local_models.get(self.primary_model)
+        if local_model is None:
+            return None
+        if token_ids is None:
+            token_ids = default_tokenizer().encode(prompt)
+        draft = self.local_models.get(self.secondary_model) if self.draft_tokens else None
+        ids = token_ids[:local_model.config.max_seq_len - RESPONSE_TOKENS - self.draft_tokens]
+        if draft is None:
+            local_model.generate(ids, RESPONSE_TOKENS)
+            return None
+        decoder = self._speculative
+        if decoder is None or decoder.target is not local_model or decoder.draft is not draft:
+            decoder = self._speculative = SpeculativeDecoder(local_model, draft, self.draft_tokens)
+        # Per call: pipelined primary workers share the decoder
+        stats = SpeculativeStats()
+        decoder.generate(ids, RESPONSE_TOKENS, stats)
+        return stats
+
+    def parse_with_secondary_model(self, prompt):
+        """parseWithSecondaryModel: restructure the raw prompt with the secondary model.
+
+        With a local model plugged into the secondary slot, the prompt is
+        prefilled and PARSE_TOKENS tokens decoded through it. A stand-in with
+        random weights only supplies the compute, so the structured template
+        is still what gets returned.
+        """
+        local_model = self.local_models.get(self.secondary_model)
+        if local_model is not None:
+            ids = default_tokenizer().encode(prompt)
+            limit = local_model.config.max_seq_len - PARSE_TOKENS
+            local_model.generate(ids[:limit], PARSE_TOKENS)
+        return "\n\n".join([
+            SCAFFOLD_CONTEXT,
+            SCAFFOLD_CONSTRAINTS,
+            SECONDARY_FORMAT,
+            f"Task: {prompt}",
+            SCAFFOLD_OPTIMIZATION,
+            SCAFFOLD_QUALITY,
+        ])
+
+    def _mock_response(self, prompt):
+        prompt_lower = prompt.lower()
+        values = {
+            'model': self.primary_model.value,
+            'chunk_size': self.settings.chunk_size,
+            'optimization_level': self.optimization_level.name.lower(),
+            'privacy_mode': 'true' if self.privacy_mode else 'false',
+        }
+        if any(word in prompt_lower for word in ('write', 'create', 'generate')):
+            return _CREATE_RESPONSE % values
+        if any(word in prompt_lower for word in ('analyze', 'explain', 'describe')):
+            return _ANALYZE_RESPONSE % values
+        return _DEFAULT_RESPONSE % values
+
+
+class OptimizationService:
+    """NPU chunking and quantization stage (OptimizationService.swift).
+
+    `chunking` picks the chunk boundaries (FIXED or CONTENT_DEFINED); with a
+    ChunkCache, chunks seen before skip the per-chunk stage.
+    """
+
+    def __init__(self, settings=None, chunking=FIXED, cache=None):
+        self.settings = settings
+        self.chunking = chunking
+        self.cache = cache
+
+    def configure(self, settings):
+        self.settings = settings
+
+    def process_with_npu(self, prompt):
+        """processWithNPU: run the parsed prompt through the NPU stage chunk by chunk."""
+        if self.settings is None:
+            raise OptimizationError("OptimizationService is not configured")
+        starts, ends = self.apply_chunking(prompt, self.settings.chunk_size)
+        chunks = ((start, end, prompt[start:end]) for start, end in zip(starts, ends))
+        return ''.join(self._process_chunks(chunks))
+
+    def process_stream_with_npu(self, source):
+        """Streaming processWithNPU over a file object or iterable of strings.
+
+        Yields the processed text chunk by chunk while the source is still
+        being read; joined, the parts equal process_with_npu on the whole text.
+        """
+        if self.settings is None:
+            raise OptimizationError("OptimizationService is not configured")
+        return self._process_chunks(iter_stream_chunks(source, self.settings.chunk_size))
+
+    def _process_chunks(self, chunks):
+        # Overlapping tokens are context for the model; each character of the
+        # input is emitted once, by the first chunk that covers it.
+        done = 0
+        for start, end, text in chunks:
+            yield self._process_chunk(text[max(start, done) - start:])
+            done = end
+
+    def _process_chunk(self, text):
+        level = self.settings.quantization
+        if self.cache is None:
+            return self.apply_quantization(text, level)
+        key = self.cache.key(text, level.value)
+        output = self.cache.get(key)
+        if output is None:
+            output = self.apply_quantization(text, level)
+            self.cache.put(key, output)
+        return output
+
+    def apply_chunking(self, prompt, chunk_size, overlap=None):
+        """applyChunking: token-bounded chunk spans of the prompt, as (starts, ends) offsets."""
+        return chunk_spans(prompt, chunk_size, overlap, mode=self.chunking)
+
+    def apply_quantization(self, prompt, level):
+        return prompt
+
+
+class PromptService:
+    """Parsing, optimization and enhancement facade (PromptService.swift)."""
+
+    def __init__(self, llm_service, optimization_service, compressor=None):
+        self.llm_service = llm_service
+        self.optimization_service = optimization_service
+        # Compression rewrites the task, so it only runs when asked for
+        self.compressor = compressor
+
+    def parse_with_secondary_model(self, prompt):
+        return self.llm_service.parse_with_secondary_model(prompt)
+
+    def optimize_with_npu(self, prompt):
+        return self.optimization_service.process_with_npu(prompt)
+
+    def enhance_prompt(self, prompt):
+        """enhancePrompt: wrap the task in the structured scaffold.
+
+        With a compressor, the task is compressed first. Scaffold sections
+        already present (from parse_with_secondary_model) are not nested
+        inside the Task line again; the tokens that nesting would have cost
+        are reported as scaffold_tokens_saved.
+        """
+        scaffold = compile_scaffold(self.llm_service.optimization_level)
+        task, levels = unwrap_levels(prompt)
+        if self.compressor is None:
+            text, token_reduction = task, 0.0
+        else:
+            compressed = self.compressor.compress(task)
+            text, token_reduction = compressed.text, compressed.reduction
+        enhanced_text, token_ids = scaffold.wrap(text)
+        tokens_saved = scaffold.nesting_tokens(levels, task) if levels else 0
+        return EnhancedPrompt(
+            original_text=prompt,
+            enhanced_text=enhanced_text,
+            token_count=len(token_ids),
+            optimizations=[OptimizationType.DUAL_MODEL_REFINEMENT, OptimizationType.TOKEN_OPTIMIZATION],
+            token_ids=token_ids,
+            scaffold=scaffold,
+            scaffold_tokens_saved=tokens_saved,
+            token_reduction=token_reduction,
+        )
+
+    def count_tokens(self, text):
+        return count_tokens(text)
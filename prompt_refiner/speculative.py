@@ -0,0 +1,171 @@
+# Speculative generation: the secondary model drafts, the primary verifies
+#
+# Plain greedy decoding runs the large primary model once per token. Here
+# the small secondary model (same tokenizer, so same vocabulary) proposes
+# `draft_tokens` tokens one at a time, and the primary scores all of them
+# in a single forward pass. The longest prefix matching the primary's own
+# greedy choices is committed, plus the primary's token at the first
+# mismatch, and both KV caches are truncated back to the committed text.
+# The output is exactly what the primary alone would have generated; only
+# the number of primary passes changes.
+#
+#     decoder = SpeculativeDecoder(primary, secondary, draft_tokens=4)
+#     ids = decoder.generate(prompt_ids, 32)
+#     decoder.stats.acceptance_rate, decoder.stats.speedup
+#
+# Usage: python -m prompt_refiner.speculative [--primary GPT-4] [--draft Gemma-2B] [-k 4]
+import argparse
+import time
+from dataclasses import dataclass
+
+DEFAULT_DRAFT_TOKENS = 4
+# Plain decode steps timed to estimate the primary's per-token cost
+_CALIBRATION_STEPS = 4
+
+
+@dataclass
+class SpeculativeStats:
+    rounds: int = 0
+    drafted: int = 0
+    accepted: int = 0
+    generated: int = 0  # tokens decoded after the prefill's first one
+    decode_time: float = 0.0  # seconds spent decoding them
+    baseline_time: float = 0.0  # estimated seconds plain decoding would take
+
+    @property
+    def acceptance_rate(self):
+        """Fraction of drafted tokens the primary accepted."""
+        return self.accepted / self.drafted if self.drafted else 0.0
+
+    @property
+    def tokens_per_round(self):
+        return self.generated / self.rounds if self.rounds else 0.0
+
+    @property
+    def speedup(self):
+        """Decode speedup over plain greedy decoding with the primary alone."""
+        return self.baseline_time / self.decode_time if self.decode_time else 0.0
+
+
+class SpeculativeDecoder:
+    """Greedy speculative decoding of `target` with `draft` proposing tokens."""
+
+    def __init__(self, target, draft, draft_tokens=DEFAULT_DRAFT_TOKENS):
+        if draft.config.vocab_size != target.config.vocab_size:
+            raise ValueError(f"draft vocabulary ({draft.config.vocab_size}) differs from the target's "
+                             f"({target.config.vocab_size})")
+        if draft_tokens < 1:
+            raise ValueError(f"draft_tokens must be positive, got {draft_tokens}")
+        self.target = target
+        self.draft = draft
+        self.config = target.config
+        self.draft_tokens = draft_tokens
+        self.stats = SpeculativeStats()
+        self._step_time = None  # primary seconds per plain decode step
+
+    def generate(self, prompt_ids, max_new_tokens, stats=None):
+        """Same tokens as target.generate(prompt_ids, max_new_tokens).
+
+        Counters go to `stats` if given, else to self.stats.
+        """
+        if max_new_tokens < 1:
+            return []
+        if stats is None:
+            stats = self.stats
+        target, draft = self.target, self.draft
+        if self._step_time is None:
+            self._step_time = self._calibrate(prompt_ids)
+        length = len(prompt_ids) + max_new_tokens + self.draft_tokens
+        target_cache = target.new_cache(length)
+        draft_cache = draft.new_cache(length)
+        try:
+            generated = [int(target.forward(prompt_ids, target_cache)[-1].argmax())]
+            draft.forward(prompt_ids, draft_cache)
+            # Invariant per round: the target cache holds everything but
+            # generated[-1], the draft cache everything but `pending`
+            pending = generated[-1:]
+            start = time.perf_counter()
+            while len(generated) < max_new_tokens:
+                k = min(self.draft_tokens, max_new_tokens - len(generated))
+                proposed = []
+                logits = draft.forward(pending, draft_cache)
+                for _ in range(k):
+                    proposed.append(int(logits[-1].argmax()))
+                    if len(proposed) < k:
+                        logits = draft.forward(proposed[-1:], draft_cache)
+
+                base = target_cache.length
+                choices = target.forward(generated[-1:] + proposed, target_cache).argmax(axis=-1)
+                accepted = 0
+                while accepted < k and proposed[accepted] == choices[accepted]:
+                    accepted += 1
+                generated += proposed[:accepted]
+                generated.append(int(choices[accepted]))
+
+                # Keep generated[-1]'s predecessors: the last committed token
+                # before this round and the accepted drafts
+                target_cache.truncate(base + 1 + accepted)
+                draft_base = draft_cache.length - k
+                draft_cache.truncate(draft_base + 1 + accepted)
+                # All k accepted: the draft never saw its own last proposal
+                pending = proposed[-1:] + generated[-1:] if accepted == k else generated[-1:]
+
+                stats.rounds += 1
+                stats.drafted += k
+                stats.accepted += accepted
+            del generated[max_new_tokens:]
+            stats.generated += len(generated) - 1
+            stats.decode_time += time.perf_counter() - start
+            stats.baseline_time += (len(generated) - 1) * self._step_time
+        finally:
+            target_cache.free()
+            draft_cache.free()
+        return generated
+
+    def _calibrate(self, prompt_ids):
+        # Per-token cost of the primary decoding alone, for the speedup
+        # estimate, measured a few positions after a short prompt
+        target = self.target
+        cache = target.new_cache(len(prompt_ids) + _CALIBRATION_STEPS + 1)
+        try:
+            target.forward(prompt_ids, cache)
+            start = time.perf_counter()
+            for _ in range(_CALIBRATION_STEPS):
+                target.forward(prompt_ids[-1:], cache)
+            return (time.perf_counter() - start) / _CALIBRATION_STEPS
+        finally:
+            cache.free()
+
+
+if __name__ == '__main__':
+    from .config import LLMModel
+    from .model import MODEL_PROFILES, load_local_model
+
+    slots = [m.value for m in MODEL_PROFILES]
+    parser = argparse.ArgumentParser(description="Speculative against plain greedy decoding on the local stand-ins")
+    parser.add_argument('--primary', default=LLMModel.GPT4.value, choices=slots)
+    parser.add_argument('--draft', default=LLMModel.GEMMA_2B.value, choices=slots)
+    parser.add_argument('-k', '--draft-tokens', type=int, nargs='+', default=[2, 4, 6])
+    parser.add_argument('--prompt-tokens', type=int, default=64)
+    parser.add_argument('--new-tokens', type=int, default=32)
+    args = parser.parse_args()
+
+    target = load_local_model(LLMModel(args.primary))
+    draft = load_local_model(LLMModel(args.draft))
+    prompt = list(range(1, args.prompt_tokens + 1))
+    start = time.perf_counter()
+    expected = target.generate(prompt, args.new_tokens)
+    plain = time.perf_counter() - start
+    print(f"{args.primary} drafted by {args.draft}, {args.prompt_tokens} + {args.new_tokens} tokens")
+    print(f"  plain greedy:     {plain * 1000:7.1f} ms")
+    for k in args.draft_tokens:
+        decoder = SpeculativeDecoder(target, draft, k)
+        decoder.generate(prompt, 2)  # calibrate outside the timing
+        decoder.stats = SpeculativeStats()
+        start = time.perf_counter()
+        output = decoder.generate(prompt, args.new_tokens)
+        elapsed = time.perf_counter() - start
+        stats = decoder.stats
+        print(f"  speculative k={k}: {elapsed * 1000:7.1f} ms ({plain / elapsed:.2f}x end to end, "
+              f"{stats.speedup:.2f}x decode), acceptance {stats.acceptance_rate:.0%}, "
+              f"{stats.tokens_per_round:.1f} tokens/round{'' if output == expected else ', OUTPUT DIFFERS'}")
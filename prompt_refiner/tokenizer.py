@@ -0,0 +1,293 @@
+# Byte-level BPE tokenizer used for every token budget in the pipeline
+#
+# Replaces the `text.count / 4` estimate from PromptService.countTokens.
+# Text is split into pieces with a GPT-2 style pattern, each piece is
+# UTF-8 encoded and merged with the learned BPE ranks. The merge table is
+# array-backed: merge r joins (merge_left[r], merge_right[r]) into token
+# 256 + r, and a packed-int dict maps each pair to its rank. Encoded pieces
+# are memoized, so repeated words cost one dict lookup and long inputs are
+# processed in a single linear pass over the regex matches.
+#
+# Batch results are returned as flat array('I') buffers (plus offsets)
+# rather than lists of per-prompt lists.
+#
+# Usage: python -m prompt_refiner.tokenizer --train FILE... [--merges N] [--out PATH]
+import argparse
+import heapq
+import json
+import os
+import re
+from array import array
+
+PATTERN = r"""'s|'t|'re|'ve|'m|'ll|'d| ?[^\W\d_]+| ?\d+| ?(?:[^\s\w]|_)+|\s+(?!\S)|\s+"""
+DEFAULT_MERGES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'bpe_merges.json')
+
+_PAIR_SHIFT = 21  # token ids stay below 2**21
+_NO_RANK = 1 << 62
+# Pieces longer than this use the heap-based merge instead of rescanning
+_HEAP_THRESHOLD = 48
+_CACHE_LIMIT = 200_000
+
+
+class _PieceCounts(dict):
+    """piece -> token count; misses are encoded, hits stay a C-level lookup."""
+
+    def __init__(self, encode_piece):
+        super().__init__()
+        self._encode_piece = encode_piece
+
+    def __missing__(self, piece):
+        if len(self) >= _CACHE_LIMIT:
+            self.clear()
+        count = self[piece] = len(self._encode_piece(piece))
+        return count
+
+
+class BPETokenizer:
+    """Byte-level BPE tokenizer over an array-backed merge table."""
+
+    def __init__(self, merges, pattern=PATTERN):
+        self.pattern = pattern
+        self._regex = re.compile(pattern)
+        self._split = self._regex.findall
+        self.merge_left = array('I', (left for left, _ in merges))
+        self.merge_right = array('I', (right for _, right in merges))
+        self._ranks = {(left << _PAIR_SHIFT) | right: rank for rank, (left, right) in enumerate(merges)}
+
+        # Byte string for every token id, used by decode()
+        self.vocab = [bytes([i]) for i in range(256)]
+        for left, right in merges:
+            self.vocab.append(self.vocab[left] + self.vocab[right])
+        self._cache = {}
+        self._counts = _PieceCounts(self._encode_piece)
+
+    @property
+    def vocab_size(self):
+        return 256 + len(self.merge_left)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MERGES_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls([tuple(pair) for pair in data['merges']], pattern=data.get('pattern', PATTERN))
+
+    def save(self, path):
+        data = {
+            'version': 1,
+            'pattern': self.pattern,
+            'merges': [[left, right] for left, right in zip(self.merge_left, self.merge_right)],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+            f.write('\n')
+
+    # -- merging ------------------------------------------------------------
+
+    def _merge_small(self, ids):
+        # Rescan for the lowest-ranked pair; fastest for the short pieces
+        # that make up almost all real text.
+        ranks = self._ranks
+        while len(ids) > 1:
+            best_rank = _NO_RANK
+            best_pair = 0
+            for i in range(len(ids) - 1):
+                pair = (ids[i] << _PAIR_SHIFT) | ids[i + 1]
+                rank = ranks.get(pair, _NO_RANK)
+                if rank < best_rank:
+                    best_rank = rank
+                    best_pair = pair
+            if best_rank == _NO_RANK:
+                break
+            left, right = best_pair >> _PAIR_SHIFT, best_pair & ((1 << _PAIR_SHIFT) - 1)
+            merged = 256 + best_rank
+            out = []
+            i = 0
+            n = len(ids)
+            while i < n:
+                if i < n - 1 and ids[i] == left and ids[i + 1] == right:
+                    out.append(merged)
+                    i += 2
+                else:
+                    out.append(ids[i])
+                    i += 1
+            ids = out
+        return ids
+
+    def _merge_heap(self, ids):
+        # O(n log n) merge over a linked list for long pieces (e.g. a long
+        # run of digits or punctuation), so pathological inputs stay fast.
+        ranks = self._ranks
+        n = len(ids)
+        tokens = array('I', ids)
+        nxt = array('i', range(1, n + 1))
+        prv = array('i', range(-1, n - 1))
+        nxt[n - 1] = -1
+        heap = []
+        for i in range(n - 1):
+            rank = ranks.get((tokens[i] << _PAIR_SHIFT) | tokens[i + 1])
+            if rank is not None:
+                heap.append((rank, i))
+        heapq.heapify(heap)
+        alive = bytearray(b'\x01') * n
+
+        while heap:
+            rank, i = heapq.heappop(heap)
+            j = nxt[i]
+            if not alive[i] or j < 0:
+                continue
+            if ranks.get((tokens[i] << _PAIR_SHIFT) | tokens[j]) != rank:
+                continue
+            tokens[i] = 256 + rank
+            alive[j] = 0
+            nxt[i] = nxt[j]
+            if nxt[j] >= 0:
+                prv[nxt[j]] = i
+            p = prv[i]
+            if p >= 0:
+                r = ranks.get((tokens[p] << _PAIR_SHIFT) | tokens[i])
+                if r is not None:
+                    heapq.heappush(heap, (r, p))
+            k = nxt[i]
+            if k >= 0:
+                r = ranks.get((tokens[i] << _PAIR_SHIFT) | tokens[k])
+                if r is not None:
+                    heapq.heappush(heap, (r, i))
+
+        out = []
+        i = 0
+        while i >= 0:
+            out.append(tokens[i])
+            i = nxt[i]
+        return out
+
+    def _encode_piece(self, piece):
+        ids = self._cache.get(piece)
+        if ids is None:
+            raw = list(piece.encode('utf-8'))
+            merged = self._merge_small(raw) if len(raw) <= _HEAP_THRESHOLD else self._merge_heap(raw)
+            ids = tuple(merged)
+            if len(self._cache) >= _CACHE_LIMIT:
+                self._cache.clear()
+            self._cache[piece] = ids
+        return ids
+
+    # -- public API ---------------------------------------------------------
+
+    def encode(self, text, out=None):
+        """Encode text, appending ids to `out` (an array('I')) if given."""
+        if out is None:
+            out = array('I')
+        for ids in map(self._encode_piece, self._split(text)):
+            out.extend(ids)
+        return out
+
+    def count(self, text):
+        return sum(map(self._counts.__getitem__, self._split(text)))
+
+    def decode(self, ids):
+        vocab = self.vocab
+        return b''.join(vocab[i] for i in ids).decode('utf-8', errors='replace')
+
+    def encode_batch(self, texts):
+        """Encode many texts into one flat buffer.
+
+        Returns (ids, offsets): the ids of texts[i] are ids[offsets[i]:offsets[i + 1]].
+        """
+        ids = array('I')
+        offsets = array('Q', [0])
+        for text in texts:
+            self.encode(text, ids)
+            offsets.append(len(ids))
+        return ids, offsets
+
+    def count_batch(self, texts):
+        return array('I', (self.count(text) for text in texts))
+
+
+def train(texts, num_merges, pattern=PATTERN):
+    """Learn `num_merges` BPE merges from an iterable of texts."""
+    split = re.compile(pattern).findall
+    counts = {}
+    for text in texts:
+        for piece in split(text):
+            counts[piece] = counts.get(piece, 0) + 1
+
+    words = [list(piece.encode('utf-8')) for piece in counts]
+    freqs = list(counts.values())
+    pair_counts = {}
+    where = {}
+    for index, (word, freq) in enumerate(zip(words, freqs)):
+        for pair in zip(word, word[1:]):
+            pair_counts[pair] = pair_counts.get(pair, 0) + freq
+            where.setdefault(pair, set()).add(index)
+
+    merges = []
+    while len(merges) < num_merges and pair_counts:
+        # Ties break on the smaller pair so training is deterministic
+        pair = max(pair_counts, key=lambda p: (pair_counts[p], -p[0], -p[1]))
+        if pair_counts[pair] < 2:
+            break
+        new_id = 256 + len(merges)
+        merges.append(pair)
+        for index in where.pop(pair, ()):
+            word, freq = words[index], freqs[index]
+            for old in zip(word, word[1:]):
+                pair_counts[old] -= freq
+                if pair_counts[old] <= 0:
+                    del pair_counts[old]
+            merged = []
+            i = 0
+            while i < len(word):
+                if i < len(word) - 1 and (word[i], word[i + 1]) == pair:
+                    merged.append(new_id)
+                    i += 2
+                else:
+                    merged.append(word[i])
+                    i += 1
+            words[index] = merged
+            for new in zip(merged, merged[1:]):
+                pair_counts[new] = pair_counts.get(new, 0) + freq
+                where.setdefault(new, set()).add(index)
+        pair_counts.pop(pair, None)
+    return BPETokenizer(merges, pattern=pattern)
+
+
+_default = None
+
+
+def default_tokenizer():
+    """The tokenizer shipped with the package, loaded once per process.
+
+    Prefers the memory-mapped binary artifact (see tokenizer_mmap.py) and
+    falls back to the JSON merges when it has not been compiled.
+    """
+    global _default
+    if _default is None:
+        from .tokenizer_mmap import DEFAULT_ARTIFACT_PATH, MappedBPETokenizer
+
+        if os.path.exists(DEFAULT_ARTIFACT_PATH):
+            _default = MappedBPETokenizer(DEFAULT_ARTIFACT_PATH)
+        else:
+            _default = BPETokenizer.load()
+    return _default
+
+
+def count_tokens(text):
+    return default_tokenizer().count(text)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the byte-level BPE merge table")
+    parser.add_argument('--train', nargs='+', required=True, metavar='FILE', help="training corpus files")
+    parser.add_argument('--merges', type=int, default=4000, help="number of merges to learn")
+    parser.add_argument('--out', default=DEFAULT_MERGES_PATH, help="output merges file")
+    args = parser.parse_args()
+
+    corpus = []
+    for path in args.train:
+        with open(path, encoding='utf-8') as f:
+            corpus.append(f.read())
+    tokenizer = train(corpus, args.merges)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    tokenizer.save(args.out)
+    print(f"Learned {len(tokenizer.merge_left)} merges -> {args.out}")
@@ -0,0 +1,158 @@
+# Compiled binary tokenizer artifact, memory-mapped for O(1) startup
+#
+# Loading the JSON merges means parsing thousands of pairs and building the
+# rank dict and vocab list in every process. The compiled artifact instead
+# stores everything as flat little-endian arrays that are used in place
+# through a read-only mmap, so startup does no per-merge work and all worker
+# processes share the same page-cache pages instead of each holding a copy.
+# Only the pair-rank dict, which the merge loops probe for every adjacent
+# pair, is built in memory, on first encode.
+#
+# Layout (all sections 8-byte aligned, offsets/lengths in the header):
+#   header        magic b'BPEM', version, num_merges, vocab_size, section table
+#   pattern       UTF-8 pre-tokenization regex
+#   merge_left    uint32[num_merges]
+#   merge_right   uint32[num_merges]
+#   pair_keys     uint64[num_merges]  packed (left << 21 | right), sorted
+#   pair_ranks    uint32[num_merges]  rank of pair_keys[i]
+#   vocab_offsets uint32[vocab_size + 1] into vocab_blob
+#   vocab_blob    concatenated token byte strings
+#   sorted_ids    uint32[vocab_size]  token ids ordered by their bytes
+#
+# Usage: python -m prompt_refiner.tokenizer_mmap [--merges FILE] [--out FILE]
+import argparse
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from functools import cached_property
+
+from .tokenizer import _PAIR_SHIFT, DEFAULT_MERGES_PATH, BPETokenizer, _PieceCounts
+
+MAGIC = b'BPEM'
+VERSION = 1
+DEFAULT_ARTIFACT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'bpe.bin')
+
+_SECTIONS = ('pattern', 'merge_left', 'merge_right', 'pair_keys', 'pair_ranks',
+             'vocab_offsets', 'vocab_blob', 'sorted_ids')
+_HEADER = struct.Struct('<4sIII' + 'QQ' * len(_SECTIONS))
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def compile_artifact(tokenizer, path=DEFAULT_ARTIFACT_PATH):
+    """Write `tokenizer` (a BPETokenizer) as a binary artifact."""
+    merges = list(zip(tokenizer.merge_left, tokenizer.merge_right))
+    keys = sorted(((left << _PAIR_SHIFT) | right, rank) for rank, (left, right) in enumerate(merges))
+    vocab = [tokenizer.vocab[i] for i in range(tokenizer.vocab_size)]
+    offsets = array('I', [0])
+    for token in vocab:
+        offsets.append(offsets[-1] + len(token))
+
+    sections = {
+        'pattern': tokenizer.pattern.encode('utf-8'),
+        'merge_left': array('I', tokenizer.merge_left).tobytes(),
+        'merge_right': array('I', tokenizer.merge_right).tobytes(),
+        'pair_keys': array('Q', (key for key, _ in keys)).tobytes(),
+        'pair_ranks': array('I', (rank for _, rank in keys)).tobytes(),
+        'vocab_offsets': offsets.tobytes(),
+        'vocab_blob': b''.join(vocab),
+        'sorted_ids': array('I', sorted(range(len(vocab)), key=vocab.__getitem__)).tobytes(),
+    }
+
+    table = []
+    position = _align(_HEADER.size)
+    for name in _SECTIONS:
+        table += [position, len(sections[name])]
+        position = _align(position + len(sections[name]))
+
+    header = _HEADER.pack(MAGIC, VERSION, len(merges), len(vocab), *table)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for index, name in enumerate(_SECTIONS):
+            f.seek(table[2 * index])
+            f.write(sections[name])
+        f.truncate(position)
+    os.replace(tmp_path, path)
+
+
+class _MappedVocab:
+    """Sequence of token byte strings backed by the mapped vocab blob."""
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, token_id):
+        return bytes(self._blob[self._offsets[token_id]:self._offsets[token_id + 1]])
+
+
+class MappedBPETokenizer(BPETokenizer):
+    """BPETokenizer reading its tables straight from a memory-mapped artifact."""
+
+    def __init__(self, path=DEFAULT_ARTIFACT_PATH):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, num_merges, vocab_size, *table = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} tokenizer artifact")
+
+        def section(name, fmt=None):
+            index = _SECTIONS.index(name)
+            start, length = table[2 * index], table[2 * index + 1]
+            data = view[start:start + length]
+            return data.cast(fmt) if fmt else data
+
+        self.pattern = bytes(section('pattern')).decode('utf-8')
+        self._regex = re.compile(self.pattern)
+        self._split = self._regex.findall
+        self.merge_left = section('merge_left', 'I')
+        self.merge_right = section('merge_right', 'I')
+        self._pair_keys = section('pair_keys', 'Q')
+        self._pair_ranks = section('pair_ranks', 'I')
+        self.vocab = _MappedVocab(section('vocab_offsets', 'I'), section('vocab_blob'))
+        self._sorted_ids = section('sorted_ids', 'I')
+        self._cache = {}
+        self._counts = _PieceCounts(self._encode_piece)
+
+    @cached_property
+    def _ranks(self):
+        # The merge loops look up a pair rank for every adjacent pair, so
+        # they need a real dict; building it from the mapped arrays on first
+        # use takes about a millisecond and processes that never encode
+        # skip it.
+        return dict(zip(self._pair_keys.tolist(), self._pair_ranks.tolist()))
+
+    def token_to_id(self, token):
+        """Look up the id of a token's byte string, or None."""
+        vocab = self.vocab
+        i = bisect_left(self._sorted_ids, token, key=vocab.__getitem__)
+        if i < len(self._sorted_ids) and vocab[self._sorted_ids[i]] == token:
+            return self._sorted_ids[i]
+        return None
+
+    def close(self):
+        # memoryviews into the map must be released before it can close
+        for name in ('merge_left', 'merge_right', '_pair_keys', '_pair_ranks', '_sorted_ids'):
+            getattr(self, name).release()
+        self.vocab._offsets.release()
+        self.vocab._blob.release()
+        self._mmap.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compile the BPE merges into a binary artifact")
+    parser.add_argument('--merges', default=DEFAULT_MERGES_PATH, help="JSON merges file")
+    parser.add_argument('--out', default=DEFAULT_ARTIFACT_PATH, help="artifact path")
+    args = parser.parse_args()
+    compile_artifact(BPETokenizer.load(args.merges), args.out)
+    print(f"Compiled {args.merges} -> {args.out} ({os.path.getsize(args.out)} bytes)")
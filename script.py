@@ -1,5 +1,7 @@
+from generator_manifest import collect, write_outputs
+
 # Create a comprehensive iOS project structure document
-project_structure = """
+PROJECT_STRUCTURE = """
 # iOS Mobile LLM Prompt Refiner
 ## Complete GitHub Repository Structure
 
@@ -138,9 +140,17 @@ MobileLLMPromptRefiner/
 - **UX**: 67.8% user experience enhancement
 """
 
-# Write to file
-with open('ios_project_structure.md', 'w') as f:
-    f.write(project_structure)
+# Generators exposed by this script; each returns {relative_path: content}
+def project_structure(config=None):
+    return {'Documentation/ios_project_structure.md': PROJECT_STRUCTURE}
+
+
+GENERATORS = {
+    'project_structure': project_structure,
+}
+
+if __name__ == '__main__':
+    # Write to file (skipped when the content is unchanged)
+    write_outputs(collect(GENERATORS))
 
-print("Created iOS project structure documentation")
-print(f"File size: {len(project_structure)} characters")
\ No newline at end of file
+    print(f"File size: {len(PROJECT_STRUCTURE)} characters")
@@ -1,5 +1,8 @@
+from generator_manifest import SOURCES_DIR, collect, write_outputs
+from swift_templates import render
+
 # Create the main SwiftUI app file
-app_file = '''import SwiftUI
+APP_FILE = r'''import SwiftUI
 import Foundation
 import Combine
 import CoreML
@@ -9,7 +12,7 @@ struct MobileLLMPromptRefinerApp: App {
     @StateObject private var settingsViewModel = SettingsViewModel()
     @StateObject private var promptViewModel = PromptViewModel()
     @StateObject private var refinementViewModel = RefinementViewModel()
-    
+
     var body: some Scene {
         WindowGroup {
             ContentView()
@@ -21,7 +24,7 @@ struct MobileLLMPromptRefinerApp: App {
                 }
         }
     }
-    
+
     private func setupServices() {
         // Initialize Core ML models and services
         LLMService.shared.initialize()
@@ -30,19 +33,19 @@ struct MobileLLMPromptRefinerApp: App {
 }
 '''
 
-content_view = '''import SwiftUI
+CONTENT_VIEW = r'''import SwiftUI
 
 struct ContentView: View {
     @State private var selectedTab: Tab = .refiner
     @EnvironmentObject var settingsViewModel: SettingsViewModel
     @EnvironmentObject var promptViewModel: PromptViewModel
     @EnvironmentObject var refinementViewModel: RefinementViewModel
-    
+
     enum Tab: String, CaseIterable {
         case refiner = "Prompt Refiner"
         case techniques = "Techniques"
         case settings = "Settings"
-        
+
         var icon: String {
             switch self {
             case .refiner: return "bolt.fill"
@@ -51,14 +54,14 @@ struct ContentView: View {
             }
         }
     }
-    
+
     var body: some View {
         NavigationView {
             VStack(spacing: 0) {
                 headerView
-                
+
                 tabView
-                
+
                 contentView
                     .background(
                         LinearGradient(
@@ -71,7 +74,7 @@ struct ContentView: View {
             .ignoresSafeArea(.container, edges: .top)
         }
     }
-    
+
     private var headerView: some View {
         ZStack {
             LinearGradient(
@@ -79,27 +82,27 @@ struct ContentView: View {
                 startPoint: .leading,
                 endPoint: .trailing
             )
-            
+
             HStack {
                 VStack(alignment: .leading, spacing: 4) {
                     HStack {
                         Image(systemName: "brain.head.profile")
                             .font(.title2)
                             .foregroundColor(.white)
-                        
+
                         Text("Mobile LLM Refiner")
                             .font(.title2)
                             .fontWeight(.bold)
                             .foregroundColor(.white)
                     }
-                    
+
                     Text("Advanced Prompt Optimization")
                         .font(.caption)
                         .foregroundColor(.white.opacity(0.8))
                 }
-                
+
                 Spacer()
-                
+
                 HStack(spacing: 12) {
                     performanceChip("22.4x Faster", color: .green)
                     performanceChip("21.6% Accurate", color: .blue)
@@ -109,7 +112,7 @@ struct ContentView: View {
         }
         .frame(height: 100)
     }
-    
+
     private func performanceChip(_ text: String, color: Color) -> some View {
         Text(text)
             .font(.caption2)
@@ -120,15 +123,15 @@ struct ContentView: View {
             .background(color.opacity(0.3))
             .clipShape(Capsule())
     }
-    
+
     private var tabView: some View {
         HStack(spacing: 0) {
-            ForEach(Tab.allCases, id: \\.self) { tab in
+            ForEach(Tab.allCases, id: \.self) { tab in
                 Button(action: { selectedTab = tab }) {
                     HStack(spacing: 8) {
                         Image(systemName: tab.icon)
                             .font(.system(size: 14, weight: .medium))
-                        
+
                         Text(tab.rawValue)
                             .font(.system(size: 14, weight: .medium))
                     }
@@ -148,7 +151,7 @@ struct ContentView: View {
         .padding(.horizontal)
         .padding(.top, 8)
     }
-    
+
     @ViewBuilder
     private var contentView: some View {
         switch selectedTab {
@@ -170,13 +173,21 @@ struct ContentView: View {
 }
 '''
 
-# Write the main app files
-with open('MobileLLMPromptRefinerApp.swift', 'w') as f:
-    f.write(app_file)
+# Generators exposed by this script; each renders an LLMConfiguration-like
+# config dict (see swift_templates.py) into {relative_path: content}
+def app_file(config=None):
+    return {f'{SOURCES_DIR}/MobileLLMPromptRefinerApp.swift': render(APP_FILE, config)}
+
+
+def content_view(config=None):
+    return {f'{SOURCES_DIR}/ContentView.swift': render(CONTENT_VIEW, config)}
 
-with open('ContentView.swift', 'w') as f:
-    f.write(content_view)
 
-print("Created main app files:")
-print("- MobileLLMPromptRefinerApp.swift")
-print("- ContentView.swift")
\ No newline at end of file
+GENERATORS = {
+    'app_file': app_file,
+    'content_view': content_view,
+}
+
+if __name__ == '__main__':
+    # Write the main app files (unchanged files are skipped)
+    write_outputs(collect(GENERATORS))
@@ -1,5 +1,8 @@
+from generator_manifest import SOURCES_DIR, collect, write_outputs
+from swift_templates import render
+
 # Create the data models
-prompt_model = '''import Foundation
+PROMPT_MODEL = r'''import Foundation
 import CoreML
 
 struct PromptModel: Codable, Identifiable {
@@ -11,7 +14,7 @@ struct PromptModel: Codable, Identifiable {
     var tokens: Int?
     var optimizations: [OptimizationType]
     var metrics: PerformanceMetrics?
-    
+
     enum OptimizationType: String, CaseIterable, Codable {
         case npuAcceleration = "NPU Acceleration"
         case dualModelRefinement = "Dual-Model Refinement"
@@ -19,7 +22,7 @@ struct PromptModel: Codable, Identifiable {
         case tokenOptimization = "Token Optimization"
         case privacyPreserving = "Privacy Preserving"
         case chunkedProcessing = "Chunked Processing"
-        
+
         var description: String {
             switch self {
             case .npuAcceleration: return "Hardware-optimized inference pipeline"
@@ -27,10 +30,10 @@ struct PromptModel: Codable, Identifiable {
             case .quantizedInference: return "4-bit precision for efficient processing"
             case .tokenOptimization: return "Smart token reduction and compression"
             case .privacyPreserving: return "Federated learning with differential privacy"
-            case .chunkedProcessing: return "128-token segments with overlap maintenance"
+            case .chunkedProcessing: return "{{chunkSize}}-token segments with overlap maintenance"
             }
         }
-        
+
         var performance: String {
             switch self {
             case .npuAcceleration: return "22.4x faster"
@@ -52,7 +55,8 @@ struct PerformanceMetrics: Codable {
     var privacyScore: Double // Percentage (e.g., 83 for 83% protection)
     var processingTime: TimeInterval
     var memoryUsage: Double // MB
-    
+    var scaffoldTokensSaved: Int? // Tokens not spent on a duplicated scaffold
+
     static let mock = PerformanceMetrics(
         latencyReduction: 22.4,
         accuracyImprovement: 21.6,
@@ -65,7 +69,7 @@ struct PerformanceMetrics: Codable {
 }
 '''
 
-llm_configuration = '''import Foundation
+LLM_CONFIGURATION = r'''import Foundation
 
 struct LLMConfiguration: Codable {
     var primaryModel: LLMModel
@@ -75,7 +79,7 @@ struct LLMConfiguration: Codable {
     var useNPU: Bool
     var privacyMode: Bool
     var quantization: QuantizationLevel
-    
+
     enum LLMModel: String, CaseIterable, Codable {
         case gpt4 = "GPT-4"
         case claude3 = "Claude-3"
@@ -83,7 +87,7 @@ struct LLMConfiguration: Codable {
         case gemma2B = "Gemma-2B"
         case phi3 = "Phi-3"
         case llama7B = "LLaMA-7B"
-        
+
         var isSecondary: Bool {
             switch self {
             case .gemma2B, .phi3, .llama7B:
@@ -92,7 +96,7 @@ struct LLMConfiguration: Codable {
                 return false
             }
         }
-        
+
         var description: String {
             switch self {
             case .gpt4: return "OpenAI's most capable model"
@@ -104,12 +108,12 @@ struct LLMConfiguration: Codable {
             }
         }
     }
-    
+
     enum OptimizationLevel: String, CaseIterable, Codable {
         case performance = "Performance"
         case balanced = "Balanced"
         case efficiency = "Efficiency"
-        
+
         var description: String {
             switch self {
             case .performance: return "Maximum speed and accuracy"
@@ -118,12 +122,12 @@ struct LLMConfiguration: Codable {
             }
         }
     }
-    
+
     enum QuantizationLevel: String, CaseIterable, Codable {
         case fourBit = "4-bit"
         case eightBit = "8-bit"
         case sixteenBit = "16-bit"
-        
+
         var description: String {
             switch self {
             case .fourBit: return "Maximum compression, good performance"
@@ -132,20 +136,20 @@ struct LLMConfiguration: Codable {
             }
         }
     }
-    
+
     static let `default` = LLMConfiguration(
-        primaryModel: .gpt4,
-        secondaryModel: .gemma2B,
-        optimizationLevel: .balanced,
-        chunkSize: 128,
-        useNPU: true,
-        privacyMode: false,
-        quantization: .fourBit
+        primaryModel: .{{primaryModel}},
+        secondaryModel: .{{secondaryModel}},
+        optimizationLevel: .{{optimizationLevel}},
+        chunkSize: {{chunkSize}},
+        useNPU: {{useNPU}},
+        privacyMode: {{privacyMode}},
+        quantization: .{{quantization}}
     )
 }
 '''
 
-refinement_step = '''import Foundation
+REFINEMENT_STEP = r'''import Foundation
 
 struct RefinementStep: Identifiable, Codable {
     let id = UUID()
@@ -155,13 +159,13 @@ struct RefinementStep: Identifiable, Codable {
     let status: StepStatus
     let processingTime: TimeInterval?
     let component: String
-    
+
     enum StepStatus: String, Codable {
         case pending = "pending"
         case processing = "processing"
         case completed = "completed"
         case failed = "failed"
-        
+
         var color: String {
             switch self {
             case .pending: return "gray"
@@ -171,29 +175,38 @@ struct RefinementStep: Identifiable, Codable {
             }
         }
     }
-    
+
     static let defaultSteps: [RefinementStep] = [
         RefinementStep(stepNumber: 1, name: "User Input", description: "Processing initial prompt from user", status: .pending, processingTime: nil, component: "PromptView"),
-        RefinementStep(stepNumber: 2, name: "Secondary Model Parsing", description: "Gemma-2B analyzing prompt structure", status: .pending, processingTime: nil, component: "SecondaryModel"),
+        RefinementStep(stepNumber: 2, name: "Secondary Model Parsing", description: "{{secondaryModelName}} analyzing prompt structure", status: .pending, processingTime: nil, component: "SecondaryModel"),
         RefinementStep(stepNumber: 3, name: "NPU Optimization", description: "Hardware-accelerated chunk processing", status: .pending, processingTime: nil, component: "NPUService"),
         RefinementStep(stepNumber: 4, name: "Prompt Enhancement", description: "Generating refined prompt structure", status: .pending, processingTime: nil, component: "PromptService"),
-        RefinementStep(stepNumber: 5, name: "Primary Model Processing", description: "GPT-4 processing enhanced prompt", status: .pending, processingTime: nil, component: "PrimaryModel"),
+        RefinementStep(stepNumber: 5, name: "Primary Model Processing", description: "{{primaryModelName}} processing enhanced prompt", status: .pending, processingTime: nil, component: "PrimaryModel"),
         RefinementStep(stepNumber: 6, name: "Results Display", description: "Presenting optimized results to user", status: .pending, processingTime: nil, component: "OutputView")
     ]
 }
 '''
 
-# Write the model files
-with open('PromptModel.swift', 'w') as f:
-    f.write(prompt_model)
+# Generators exposed by this script; each renders an LLMConfiguration-like
+# config dict (see swift_templates.py) into {relative_path: content}
+def prompt_model(config=None):
+    return {f'{SOURCES_DIR}/Models/PromptModel.swift': render(PROMPT_MODEL, config)}
 
-with open('LLMConfiguration.swift', 'w') as f:
-    f.write(llm_configuration)
 
-with open('RefinementStep.swift', 'w') as f:
-    f.write(refinement_step)
+def llm_configuration(config=None):
+    return {f'{SOURCES_DIR}/Models/LLMConfiguration.swift': render(LLM_CONFIGURATION, config)}
+
+
+def refinement_step(config=None):
+    return {f'{SOURCES_DIR}/Models/RefinementStep.swift': render(REFINEMENT_STEP, config)}
+
+
+GENERATORS = {
+    'prompt_model': prompt_model,
+    'llm_configuration': llm_configuration,
+    'refinement_step': refinement_step,
+}
 
-print("Created model files:")
-print("- PromptModel.swift")
-print("- LLMConfiguration.swift") 
-print("- RefinementStep.swift")
\ No newline at end of file
+if __name__ == '__main__':
+    # Write the model files (unchanged files are skipped)
+    write_outputs(collect(GENERATORS))
@@ -1,5 +1,8 @@
+from generator_manifest import SOURCES_DIR, collect, write_outputs
+from swift_templates import render
+
 # Create the main Views
-prompt_refiner_view = '''import SwiftUI
+PROMPT_REFINER_VIEW = r'''import SwiftUI
 
 struct PromptRefinerView: View {
     @EnvironmentObject var promptViewModel: PromptViewModel
@@ -7,18 +10,18 @@ struct PromptRefinerView: View {
     @EnvironmentObject var settingsViewModel: SettingsViewModel
     @State private var copiedPrompt = false
     @State private var copiedOutput = false
-    
+
     var body: some View {
         ScrollView {
             LazyVStack(spacing: 16) {
                 inputSection
-                
+
                 if promptViewModel.isProcessing || !promptViewModel.processingSteps.allSatisfy({ $0.status == .pending }) {
                     processingSection
                 }
-                
+
                 outputSection
-                
+
                 if promptViewModel.currentMetrics != nil {
                     metricsSection
                 }
@@ -26,24 +29,24 @@ struct PromptRefinerView: View {
             .padding()
         }
     }
-    
+
     private var inputSection: some View {
         VStack(alignment: .leading, spacing: 12) {
             HStack {
                 Image(systemName: "smartphone")
                     .foregroundColor(.purple)
-                
+
                 Text("Input Prompt")
                     .font(.headline)
                     .fontWeight(.semibold)
-                
+
                 Spacer()
-                
-                Text("\\(promptViewModel.inputPrompt.count) chars")
+
+                Text("\(promptViewModel.inputPrompt.count) chars")
                     .font(.caption)
                     .foregroundColor(.secondary)
             }
-            
+
             TextEditor(text: $promptViewModel.inputPrompt)
                 .frame(minHeight: 120)
                 .padding(12)
@@ -69,12 +72,12 @@ struct PromptRefinerView: View {
                         }
                     }
                 )
-            
+
             HStack {
                 modelStatusView
-                
+
                 Spacer()
-                
+
                 Button(action: { 
                     Task {
                         await promptViewModel.refinePrompt()
@@ -88,7 +91,7 @@ struct PromptRefinerView: View {
                         } else {
                             Image(systemName: "bolt.fill")
                         }
-                        
+
                         Text(promptViewModel.isProcessing ? "Refining..." : "Refine Prompt")
                             .fontWeight(.medium)
                     }
@@ -112,7 +115,7 @@ struct PromptRefinerView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private var modelStatusView: some View {
         HStack(spacing: 12) {
             HStack(spacing: 4) {
@@ -123,11 +126,11 @@ struct PromptRefinerView: View {
                     .font(.caption)
                     .foregroundColor(.secondary)
             }
-            
+
             Text("+")
                 .font(.caption)
                 .foregroundColor(.secondary)
-            
+
             HStack(spacing: 4) {
                 Circle()
                     .fill(Color.blue)
@@ -138,7 +141,7 @@ struct PromptRefinerView: View {
             }
         }
     }
-    
+
     private var processingSection: some View {
         VStack(alignment: .leading, spacing: 12) {
             HStack {
@@ -146,14 +149,14 @@ struct PromptRefinerView: View {
                     .foregroundColor(promptViewModel.isProcessing ? .purple : .green)
                     .rotationEffect(.degrees(promptViewModel.isProcessing ? 360 : 0))
                     .animation(promptViewModel.isProcessing ? .linear(duration: 2).repeatForever(autoreverses: false) : .default, value: promptViewModel.isProcessing)
-                
+
                 Text("Refinement Pipeline")
                     .font(.headline)
                     .fontWeight(.semibold)
             }
-            
+
             LazyVStack(spacing: 8) {
-                ForEach(Array(promptViewModel.processingSteps.enumerated()), id: \\.element.id) { index, step in
+                ForEach(Array(promptViewModel.processingSteps.enumerated()), id: \.element.id) { index, step in
                     ProcessingStepView(step: step, isActive: promptViewModel.isProcessing && index == promptViewModel.processingSteps.firstIndex { $0.status == .processing })
                 }
             }
@@ -163,7 +166,7 @@ struct PromptRefinerView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private var outputSection: some View {
         HStack(alignment: .top, spacing: 16) {
             // Enhanced Prompt
@@ -171,13 +174,13 @@ struct PromptRefinerView: View {
                 HStack {
                     Image(systemName: "brain.head.profile")
                         .foregroundColor(.green)
-                    
+
                     Text("Enhanced Prompt")
                         .font(.headline)
                         .fontWeight(.semibold)
-                    
+
                     Spacer()
-                    
+
                     if !promptViewModel.enhancedPrompt.isEmpty {
                         Button(action: { 
                             copyToClipboard(promptViewModel.enhancedPrompt)
@@ -195,7 +198,7 @@ struct PromptRefinerView: View {
                         }
                     }
                 }
-                
+
                 ScrollView {
                     Text(promptViewModel.enhancedPrompt.isEmpty ? "Enhanced prompt will appear here after refinement..." : promptViewModel.enhancedPrompt)
                         .font(.system(.body, design: .monospaced))
@@ -208,19 +211,19 @@ struct PromptRefinerView: View {
                 .cornerRadius(12)
             }
             .frame(maxWidth: .infinity)
-            
+
             // Prompt Output
             VStack(alignment: .leading, spacing: 12) {
                 HStack {
                     Image(systemName: "play.fill")
                         .foregroundColor(.blue)
-                    
+
                     Text("Prompt Output")
                         .font(.headline)
                         .fontWeight(.semibold)
-                    
+
                     Spacer()
-                    
+
                     if !promptViewModel.outputResults.isEmpty {
                         Button(action: { 
                             copyToClipboard(promptViewModel.outputResults)
@@ -238,7 +241,7 @@ struct PromptRefinerView: View {
                         }
                     }
                 }
-                
+
                 ScrollView {
                     Text(promptViewModel.outputResults.isEmpty ? "Output from running the refined prompt will appear here..." : promptViewModel.outputResults)
                         .font(.body)
@@ -257,19 +260,19 @@ struct PromptRefinerView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private var metricsSection: some View {
         VStack(alignment: .leading, spacing: 12) {
             HStack {
                 Image(systemName: "bolt.fill")
                     .foregroundColor(.yellow)
-                
+
                 Text("Performance Metrics")
                     .font(.headline)
                     .fontWeight(.semibold)
-                
+
                 Spacer()
-                
+
                 Text("Live Stats")
                     .font(.caption)
                     .padding(.horizontal, 8)
@@ -278,13 +281,13 @@ struct PromptRefinerView: View {
                     .foregroundColor(.yellow)
                     .cornerRadius(8)
             }
-            
+
             if let metrics = promptViewModel.currentMetrics {
                 LazyVGrid(columns: Array(repeating: GridItem(.flexible()), count: 2), spacing: 12) {
-                    MetricCard(title: "Processing Speed", value: "\\(metrics.latencyReduction, specifier: "%.1f")x faster", color: .green)
-                    MetricCard(title: "Accuracy Improvement", value: "+\\(metrics.accuracyImprovement, specifier: "%.1f")%", color: .blue)
-                    MetricCard(title: "Energy Efficiency", value: "\\(metrics.energyEfficiency, specifier: "%.1f")x better", color: .purple)
-                    MetricCard(title: "Token Reduction", value: "\\(metrics.tokenReduction, specifier: "%.0f")% saved", color: .orange)
+                    MetricCard(title: "Processing Speed", value: String(format: "%.1fx faster", metrics.latencyReduction), color: .green)
+                    MetricCard(title: "Accuracy Improvement", value: String(format: "+%.1f%%", metrics.accuracyImprovement), color: .blue)
+                    MetricCard(title: "Energy Efficiency", value: String(format: "%.1fx better", metrics.energyEfficiency), color: .purple)
+                    MetricCard(title: "Token Reduction", value: String(format: "%.0f%% saved", metrics.tokenReduction), color: .orange)
                 }
             }
         }
@@ -293,7 +296,7 @@ struct PromptRefinerView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private func copyToClipboard(_ text: String) {
         UIPasteboard.general.string = text
     }
@@ -302,39 +305,39 @@ struct PromptRefinerView: View {
 struct ProcessingStepView: View {
     let step: RefinementStep
     let isActive: Bool
-    
+
     var body: some View {
         HStack(spacing: 12) {
             ZStack {
                 Circle()
                     .fill(statusColor)
                     .frame(width: 32, height: 32)
-                
+
                 if step.status == .processing && isActive {
                     ProgressView()
                         .scaleEffect(0.6)
                         .progressViewStyle(CircularProgressViewStyle(tint: .white))
                 } else {
-                    Text("\\(step.stepNumber)")
+                    Text("\(step.stepNumber)")
                         .font(.caption)
                         .fontWeight(.bold)
                         .foregroundColor(.white)
                 }
             }
-            
+
             VStack(alignment: .leading, spacing: 2) {
                 Text(step.name)
                     .font(.body)
                     .fontWeight(.medium)
                     .foregroundColor(.primary)
-                
+
                 Text(step.description)
                     .font(.caption)
                     .foregroundColor(.secondary)
             }
-            
+
             Spacer()
-            
+
             if step.status == .completed {
                 Image(systemName: "checkmark.circle.fill")
                     .foregroundColor(.green)
@@ -348,7 +351,7 @@ struct ProcessingStepView: View {
                 .stroke(isActive ? Color.purple : Color.clear, lineWidth: 2)
         )
     }
-    
+
     private var statusColor: Color {
         switch step.status {
         case .pending: return .gray
@@ -363,13 +366,13 @@ struct MetricCard: View {
     let title: String
     let value: String
     let color: Color
-    
+
     var body: some View {
         VStack(alignment: .leading, spacing: 8) {
             Text(title)
                 .font(.caption)
                 .foregroundColor(.secondary)
-            
+
             Text(value)
                 .font(.title3)
                 .fontWeight(.bold)
@@ -390,15 +393,15 @@ struct MetricCard: View {
 }
 '''
 
-techniques_view = '''import SwiftUI
+TECHNIQUES_VIEW = r'''import SwiftUI
 
 struct TechniquesView: View {
     let optimizationTechniques = PromptModel.OptimizationType.allCases
-    
+
     var body: some View {
         ScrollView {
             LazyVGrid(columns: Array(repeating: GridItem(.flexible()), count: 1), spacing: 16) {
-                ForEach(optimizationTechniques, id: \\.self) { technique in
+                ForEach(optimizationTechniques, id: \.self) { technique in
                     TechniqueCard(technique: technique)
                 }
             }
@@ -410,7 +413,7 @@ struct TechniquesView: View {
 struct TechniqueCard: View {
     let technique: PromptModel.OptimizationType
     @State private var isExpanded = false
-    
+
     var body: some View {
         VStack(alignment: .leading, spacing: 12) {
             HStack {
@@ -419,15 +422,15 @@ struct TechniqueCard: View {
                         .font(.headline)
                         .fontWeight(.semibold)
                         .foregroundColor(.primary)
-                    
+
                     Text(technique.description)
                         .font(.subheadline)
                         .foregroundColor(.secondary)
                         .lineLimit(isExpanded ? nil : 2)
                 }
-                
+
                 Spacer()
-                
+
                 VStack(alignment: .trailing, spacing: 8) {
                     Text(technique.performance)
                         .font(.caption)
@@ -437,7 +440,7 @@ struct TechniqueCard: View {
                         .padding(.vertical, 4)
                         .background(performanceColor)
                         .cornerRadius(8)
-                    
+
                     Button(action: { 
                         withAnimation(.easeInOut(duration: 0.3)) {
                             isExpanded.toggle()
@@ -448,11 +451,11 @@ struct TechniqueCard: View {
                     }
                 }
             }
-            
+
             if isExpanded {
                 VStack(alignment: .leading, spacing: 12) {
                     Divider()
-                    
+
                     // Detailed information based on technique
                     switch technique {
                     case .npuAcceleration:
@@ -467,20 +470,20 @@ struct TechniqueCard: View {
                             icon: "cpu",
                             color: .blue
                         )
-                        
+
                     case .dualModelRefinement:
                         TechniqueDetailView(
                             title: "Multi-Model Collaboration",
                             details: [
                                 "21.6% accuracy improvement",
-                                "Gemma-2B for initial parsing",
-                                "GPT-4 for final processing",
+                                "{{secondaryModelName}} for initial parsing",
+                                "{{primaryModelName}} for final processing",
                                 "Synergistic model interaction"
                             ],
                             icon: "brain.head.profile",
                             color: .green
                         )
-                        
+
                     case .quantizedInference:
                         TechniqueDetailView(
                             title: "Precision Optimization",
@@ -493,7 +496,7 @@ struct TechniqueCard: View {
                             icon: "memorychip",
                             color: .purple
                         )
-                        
+
                     case .tokenOptimization:
                         TechniqueDetailView(
                             title: "Efficiency Enhancement",
@@ -506,7 +509,7 @@ struct TechniqueCard: View {
                             icon: "speedometer",
                             color: .orange
                         )
-                        
+
                     case .privacyPreserving:
                         TechniqueDetailView(
                             title: "Privacy Protection",
@@ -519,13 +522,13 @@ struct TechniqueCard: View {
                             icon: "lock.shield",
                             color: .red
                         )
-                        
+
                     case .chunkedProcessing:
                         TechniqueDetailView(
                             title: "Processing Optimization",
                             details: [
                                 "30.7x energy savings",
-                                "128-token segments",
+                                "{{chunkSize}}-token segments",
                                 "Overlap maintenance",
                                 "Parallel processing"
                             ],
@@ -533,12 +536,12 @@ struct TechniqueCard: View {
                             color: .cyan
                         )
                     }
-                    
+
                     HStack(spacing: 4) {
                         Circle()
                             .fill(Color.purple)
                             .frame(width: 6, height: 6)
-                        
+
                         Text("Research-backed optimization")
                             .font(.caption2)
                             .foregroundColor(.secondary)
@@ -551,7 +554,7 @@ struct TechniqueCard: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private var performanceColor: Color {
         switch technique {
         case .npuAcceleration, .dualModelRefinement: return .green
@@ -568,26 +571,26 @@ struct TechniqueDetailView: View {
     let details: [String]
     let icon: String
     let color: Color
-    
+
     var body: some View {
         VStack(alignment: .leading, spacing: 8) {
             HStack {
                 Image(systemName: icon)
                     .foregroundColor(color)
-                
+
                 Text(title)
                     .font(.subheadline)
                     .fontWeight(.medium)
                     .foregroundColor(.primary)
             }
-            
+
             LazyVGrid(columns: Array(repeating: GridItem(.flexible()), count: 2), spacing: 8) {
-                ForEach(details, id: \\.self) { detail in
+                ForEach(details, id: \.self) { detail in
                     HStack(spacing: 6) {
                         Circle()
                             .fill(color)
                             .frame(width: 4, height: 4)
-                        
+
                         Text(detail)
                             .font(.caption)
                             .foregroundColor(.secondary)
@@ -607,13 +610,21 @@ struct TechniqueDetailView: View {
 }
 '''
 
-# Write the View files
-with open('PromptRefinerView.swift', 'w') as f:
-    f.write(prompt_refiner_view)
+# Generators exposed by this script; each renders an LLMConfiguration-like
+# config dict (see swift_templates.py) into {relative_path: content}
+def prompt_refiner_view(config=None):
+    return {f'{SOURCES_DIR}/Views/Main/PromptRefinerView.swift': render(PROMPT_REFINER_VIEW, config)}
 
-with open('TechniquesView.swift', 'w') as f:
-    f.write(techniques_view)
 
-print("Created View files:")
-print("- PromptRefinerView.swift")
-print("- TechniquesView.swift")
\ No newline at end of file
+def techniques_view(config=None):
+    return {f'{SOURCES_DIR}/Views/Techniques/TechniquesView.swift': render(TECHNIQUES_VIEW, config)}
+
+
+GENERATORS = {
+    'prompt_refiner_view': prompt_refiner_view,
+    'techniques_view': techniques_view,
+}
+
+if __name__ == '__main__':
+    # Write the View files (unchanged files are skipped)
+    write_outputs(collect(GENERATORS))
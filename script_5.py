@@ -1,9 +1,12 @@
+from generator_manifest import SOURCES_DIR, collect, write_outputs
+from swift_templates import render
+
 # Create the SettingsView and LLMService
-settings_view = '''import SwiftUI
+SETTINGS_VIEW = r'''import SwiftUI
 
 struct SettingsView: View {
     @EnvironmentObject var settingsViewModel: SettingsViewModel
-    
+
     var body: some View {
         ScrollView {
             LazyVStack(spacing: 16) {
@@ -16,19 +19,19 @@ struct SettingsView: View {
             .padding()
         }
     }
-    
+
     private var modelConfigurationSection: some View {
         VStack(alignment: .leading, spacing: 12) {
             sectionHeader("Model Configuration", icon: "cpu")
-            
+
             VStack(alignment: .leading, spacing: 16) {
                 VStack(alignment: .leading, spacing: 8) {
                     Text("Primary Model")
                         .font(.subheadline)
                         .foregroundColor(.secondary)
-                    
+
                     Picker("Primary Model", selection: $settingsViewModel.settings.primaryModel) {
-                        ForEach(LLMConfiguration.LLMModel.allCases.filter { !$0.isSecondary }, id: \\.self) { model in
+                        ForEach(LLMConfiguration.LLMModel.allCases.filter { !$0.isSecondary }, id: \.self) { model in
                             Text(model.rawValue).tag(model)
                         }
                     }
@@ -38,14 +41,14 @@ struct SettingsView: View {
                     .background(Color(.systemGray6))
                     .cornerRadius(8)
                 }
-                
+
                 VStack(alignment: .leading, spacing: 8) {
                     Text("Secondary Model")
                         .font(.subheadline)
                         .foregroundColor(.secondary)
-                    
+
                     Picker("Secondary Model", selection: $settingsViewModel.settings.secondaryModel) {
-                        ForEach(LLMConfiguration.LLMModel.allCases.filter { $0.isSecondary }, id: \\.self) { model in
+                        ForEach(LLMConfiguration.LLMModel.allCases.filter { $0.isSecondary }, id: \.self) { model in
                             Text(model.rawValue).tag(model)
                         }
                     }
@@ -62,39 +65,39 @@ struct SettingsView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private var optimizationSection: some View {
         VStack(alignment: .leading, spacing: 12) {
             sectionHeader("Optimization Settings", icon: "bolt.fill")
-            
+
             VStack(alignment: .leading, spacing: 16) {
                 VStack(alignment: .leading, spacing: 8) {
                     Text("Optimization Level")
                         .font(.subheadline)
                         .foregroundColor(.secondary)
-                    
+
                     Picker("Optimization Level", selection: $settingsViewModel.settings.optimizationLevel) {
-                        ForEach(LLMConfiguration.OptimizationLevel.allCases, id: \\.self) { level in
+                        ForEach(LLMConfiguration.OptimizationLevel.allCases, id: \.self) { level in
                             Text(level.rawValue).tag(level)
                         }
                     }
                     .pickerStyle(SegmentedPickerStyle())
                     .padding(.vertical, 8)
                 }
-                
+
                 VStack(alignment: .leading, spacing: 8) {
                     HStack {
                         Text("Chunk Size")
                             .font(.subheadline)
                             .foregroundColor(.secondary)
-                        
+
                         Spacer()
-                        
-                        Text("\\(settingsViewModel.settings.chunkSize) tokens")
+
+                        Text("\(settingsViewModel.settings.chunkSize) tokens")
                             .font(.caption)
                             .foregroundColor(.secondary)
                     }
-                    
+
                     Slider(value: Binding(
                         get: { Double(settingsViewModel.settings.chunkSize) },
                         set: { settingsViewModel.settings.chunkSize = Int($0) }
@@ -107,11 +110,11 @@ struct SettingsView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private var hardwareSection: some View {
         VStack(alignment: .leading, spacing: 12) {
             sectionHeader("Hardware Options", icon: "cpu")
-            
+
             VStack(alignment: .leading, spacing: 16) {
                 toggleSetting(
                     title: "NPU Acceleration",
@@ -119,14 +122,14 @@ struct SettingsView: View {
                     isOn: $settingsViewModel.settings.useNPU,
                     action: { settingsViewModel.toggleNPUAcceleration() }
                 )
-                
+
                 VStack(alignment: .leading, spacing: 8) {
                     Text("Quantization")
                         .font(.subheadline)
                         .foregroundColor(.secondary)
-                    
+
                     Picker("Quantization", selection: $settingsViewModel.settings.quantization) {
-                        ForEach(LLMConfiguration.QuantizationLevel.allCases, id: \\.self) { level in
+                        ForEach(LLMConfiguration.QuantizationLevel.allCases, id: \.self) { level in
                             Text(level.rawValue).tag(level)
                         }
                     }
@@ -143,11 +146,11 @@ struct SettingsView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private var privacySection: some View {
         VStack(alignment: .leading, spacing: 12) {
             sectionHeader("Privacy & Security", icon: "lock.shield")
-            
+
             VStack(alignment: .leading, spacing: 16) {
                 toggleSetting(
                     title: "Privacy Mode",
@@ -155,7 +158,7 @@ struct SettingsView: View {
                     isOn: $settingsViewModel.settings.privacyMode,
                     action: { settingsViewModel.togglePrivacyMode() }
                 )
-                
+
                 Button(action: { settingsViewModel.exportConfiguration() }) {
                     HStack {
                         if settingsViewModel.isExporting {
@@ -165,7 +168,7 @@ struct SettingsView: View {
                         } else {
                             Image(systemName: "square.and.arrow.down")
                         }
-                        
+
                         Text(settingsViewModel.isExporting ? "Exporting..." : "Export Configuration")
                             .fontWeight(.medium)
                     }
@@ -176,7 +179,7 @@ struct SettingsView: View {
                     .cornerRadius(8)
                 }
                 .disabled(settingsViewModel.isExporting)
-                
+
                 Button(action: { settingsViewModel.resetToDefaults() }) {
                     HStack {
                         Image(systemName: "arrow.counterclockwise")
@@ -196,32 +199,32 @@ struct SettingsView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private var readmeSection: some View {
         VStack(alignment: .leading, spacing: 12) {
             HStack {
                 Image(systemName: "book")
                     .foregroundColor(.purple)
-                
+
                 Text("Documentation")
                     .font(.headline)
                     .fontWeight(.semibold)
-                
+
                 Spacer()
-                
+
                 Button(action: { withAnimation { settingsViewModel.showReadme.toggle() } }) {
                     HStack(spacing: 4) {
                         Text(settingsViewModel.showReadme ? "Hide README" : "Show README")
                             .font(.caption)
                             .foregroundColor(.purple)
-                        
+
                         Image(systemName: settingsViewModel.showReadme ? "chevron.up" : "chevron.down")
                             .font(.caption)
                             .foregroundColor(.purple)
                     }
                 }
             }
-            
+
             if settingsViewModel.showReadme {
                 ScrollView {
                     Text(settingsViewModel.readme)
@@ -238,32 +241,32 @@ struct SettingsView: View {
         .cornerRadius(16)
         .shadow(color: Color.black.opacity(0.1), radius: 5, x: 0, y: 2)
     }
-    
+
     private func sectionHeader(_ title: String, icon: String) -> some View {
         HStack {
             Image(systemName: icon)
                 .foregroundColor(.purple)
-            
+
             Text(title)
                 .font(.headline)
                 .fontWeight(.semibold)
         }
     }
-    
+
     private func toggleSetting(title: String, description: String, isOn: Binding<Bool>, action: @escaping () -> Void) -> some View {
         HStack {
             VStack(alignment: .leading, spacing: 2) {
                 Text(title)
                     .font(.body)
                     .foregroundColor(.primary)
-                
+
                 Text(description)
                     .font(.caption)
                     .foregroundColor(.secondary)
             }
-            
+
             Spacer()
-            
+
             Toggle("", isOn: isOn)
                 .labelsHidden()
                 .toggleStyle(SwitchToggleStyle(tint: .purple))
@@ -278,85 +281,81 @@ struct SettingsView: View {
 }
 '''
 
-llm_service = '''import Foundation
+LLM_SERVICE = r'''import Foundation
 import Combine
 import CoreML
 
 class LLMService {
     static let shared = LLMService()
-    
-    private var primaryModel: LLMConfiguration.LLMModel = .gpt4
-    private var secondaryModel: LLMConfiguration.LLMModel = .gemma2B
-    private var optimizationLevel: LLMConfiguration.OptimizationLevel = .balanced
-    private var useNPU: Bool = true
-    private var privacyMode: Bool = false
-    
+
+    private var primaryModel: LLMConfiguration.LLMModel = .{{primaryModel}}
+    private var secondaryModel: LLMConfiguration.LLMModel = .{{secondaryModel}}
+    private var optimizationLevel: LLMConfiguration.OptimizationLevel = .{{optimizationLevel}}
+    private var useNPU: Bool = {{useNPU}}
+    private var privacyMode: Bool = {{privacyMode}}
+
     private init() {}
-    
+
     func initialize() {
         // Load and initialize CoreML models
         print("LLMService: Initializing models...")
-        
+
         // In a real app, we would load the Core ML models here
         // and set up any required processing pipelines
     }
-    
+
     func configure(with settings: LLMConfiguration) {
         primaryModel = settings.primaryModel
         secondaryModel = settings.secondaryModel
         optimizationLevel = settings.optimizationLevel
         useNPU = settings.useNPU
         privacyMode = settings.privacyMode
-        
-        print("LLMService: Configured with settings - primary: \\(primaryModel.rawValue), secondary: \\(secondaryModel.rawValue), NPU: \\(useNPU)")
+
+        print("LLMService: Configured with settings - primary: \(primaryModel.rawValue), secondary: \(secondaryModel.rawValue), NPU: \(useNPU)")
     }
-    
-    // Process prompt with primary model (e.g. GPT-4)
+
+    // Process prompt with primary model (e.g. {{primaryModelName}})
     func processWithPrimaryModel(_ prompt: String) async throws -> LLMResponse {
-        // Simulate processing delay
-        try await Task.sleep(nanoseconds: 500_000_000) // 0.5 seconds
-        
+        {{primaryModelDelayCode}}
         // In a real app, this would call the actual LLM API or use Core ML
         let response = generateMockResponse(for: prompt, using: primaryModel)
-        
-        return response
+
+        {{primaryModelReturn}}
     }
-    
-    // Parse initial prompt with secondary model (e.g. Gemma-2B)
+
+    // Parse initial prompt with secondary model (e.g. {{secondaryModelName}})
     func parseWithSecondaryModel(_ prompt: String) async throws -> String {
-        // Simulate processing delay
-        try await Task.sleep(nanoseconds: 300_000_000) // 0.3 seconds
-        
+        {{secondaryModelDelayCode}}
         // In a real app, this would use the on-device model
         // Process prompt structure and return structured version
         let enhancedPrompt = """
         Context: You are an expert AI assistant optimized for mobile deployment.
-        
+
         Constraints: Response must be under 150 tokens for optimal mobile performance.
-        
+
         Format: Use structured output for better parsing efficiency.
-        
-        Task: \\(prompt)
-        
+
+        Task: \(prompt)
+
         Optimization: Apply cross-model attention and quantized inference.
-        
+
         Quality: Ensure 21.6% improvement in accuracy through dual-model refinement.
         """
-        
+
         return enhancedPrompt
     }
-    
+
     private func generateMockResponse(for prompt: String, using model: LLMConfiguration.LLMModel) -> LLMResponse {
         let promptLower = prompt.lowercased()
-        
+
         // Generate different types of responses based on prompt content
         let content: String
-        
+
         if promptLower.contains("write") || promptLower.contains("create") || promptLower.contains("generate") {
             content = """
             {
               "status": "success",
-              "model": "\\(model.rawValue)",
+              "model": "\(model.rawValue)",
               "optimization_applied": "dual_model_refinement",
               "performance_boost": "21.6%",
               "response": {
@@ -382,9 +381,9 @@ class LLMService {
                 ],
                 "confidence_score": 0.96,
                 "processing_metrics": {
-                  "chunk_size": 128,
-                  "optimization_level": "balanced",
-                  "privacy_preserved": false
+                  "chunk_size": {{chunkSize}},
+                  "optimization_level": "{{optimizationLevel}}",
+                  "privacy_preserved": {{privacyMode}}
                 }
               }
             }
@@ -392,26 +391,26 @@ class LLMService {
         } else {
             content = """
             Enhanced Mobile-Optimized Response:
-            
+
             The original prompt has been processed through our advanced refinement pipeline with the following optimizations:
-            
+
             🔧 Technical Enhancements:
             - Cross-model attention mechanisms applied
             - Quantized inference with 4-bit precision
-            - Dynamic resource allocation based on balanced mode
+            - Dynamic resource allocation based on {{optimizationLevel}} mode
             - NPU acceleration: Active (22.4x faster)
-            
+
             📊 Performance Results:
             - Processing time: 340ms (67.8% improvement)
             - Token efficiency: 47% reduction
             - Accuracy score: 94.2% (+21.6% vs baseline)
             - Energy consumption: 30.7x more efficient
-            
+
             🎯 Optimized Output:
             [Enhanced response tailored for mobile deployment with improved semantic understanding, reduced computational overhead, and maintained quality through federated learning approaches.]
             """
         }
-        
+
         return LLMResponse(
             content: content,
             model: model.rawValue,
@@ -429,49 +428,91 @@ struct LLMResponse {
 }
 '''
 
-prompt_service = '''import Foundation
+PROMPT_SERVICE = r'''import Foundation
 import Combine
 
 class PromptService {
     static let shared = PromptService()
-    
+
     private let llmService = LLMService.shared
     private let optimizationService = OptimizationService.shared
-    
+
     private init() {}
-    
+
     func parseWithSecondaryModel(_ prompt: String) async throws -> String {
         return try await llmService.parseWithSecondaryModel(prompt)
     }
-    
+
     func optimizeWithNPU(_ prompt: String) async throws -> String {
         // Apply optimization techniques here
         return try await optimizationService.processWithNPU(prompt)
     }
-    
+
     func enhancePrompt(_ prompt: String) async throws -> EnhancedPrompt {
         // In a real app, this would apply more sophisticated prompt engineering
-        
+
+        // The secondary model's output is already scaffolded; wrap only its
+        // Task so every section appears once instead of nested twice
+        let task = unwrapScaffold(prompt)
+
         // Generate enhanced prompt with structural improvements
         let enhancements = [
             "Context: You are an expert AI assistant optimized for mobile deployment.",
             "Constraints: Response must be under 150 tokens for optimal mobile performance.",
             "Format: Use structured JSON output for better parsing efficiency.",
-            "Task: \\(prompt)",
+            "Task: \(task)",
             "Optimization: Apply cross-model attention and quantized inference.",
             "Quality: Ensure 21.6% improvement in accuracy through dual-model refinement."
         ]
-        
-        let enhancedText = enhancements.joined(separator: "\\n\\n")
-        
+
+        let enhancedText = enhancements.joined(separator: "\n\n")
+        let tokenCount = countTokens(in: enhancedText)
+
+        var scaffoldTokensSaved = 0
+        if task != prompt {
+            var nested = enhancements
+            nested[3] = "Task: \(prompt)"
+            scaffoldTokensSaved = countTokens(in: nested.joined(separator: "\n\n")) - tokenCount
+        }
+
         return EnhancedPrompt(
             originalText: prompt,
             enhancedText: enhancedText,
-            tokenCount: countTokens(in: enhancedText),
-            optimizations: [.dualModelRefinement, .tokenOptimization]
+            tokenCount: tokenCount,
+            optimizations: [.dualModelRefinement, .tokenOptimization],
+            scaffoldTokensSaved: scaffoldTokensSaved
         )
     }
-    
+
+    // Strip scaffold sections around a "Task:" line, however deeply nested
+    private func unwrapScaffold(_ prompt: String) -> String {
+        var text = prompt
+        while true {
+            var sections = text.components(separatedBy: "\n\n")
+            let count = sections.count
+            while let first = sections.first, scaffoldSections.contains(first) {
+                sections.removeFirst()
+            }
+            while let last = sections.last, scaffoldSections.contains(last) {
+                sections.removeLast()
+            }
+            guard sections.count < count, let first = sections.first, first.hasPrefix("Task: ") else {
+                return text
+            }
+            sections[0] = String(first.dropFirst("Task: ".count))
+            text = sections.joined(separator: "\n\n")
+        }
+    }
+
+    private let scaffoldSections: Set<String> = [
+        "Context: You are an expert AI assistant optimized for mobile deployment.",
+        "Constraints: Response must be under 150 tokens for optimal mobile performance.",
+        "Format: Use structured output for better parsing efficiency.",
+        "Format: Use structured JSON output for better parsing efficiency.",
+        "Optimization: Apply cross-model attention and quantized inference.",
+        "Quality: Ensure 21.6% improvement in accuracy through dual-model refinement."
+    ]
+
     private func countTokens(in text: String) -> Int {
         // Simplified token counting (approximately 1 token per 4 characters)
         // In a real app, this would use a proper tokenizer
@@ -484,54 +525,47 @@ struct EnhancedPrompt {
     let enhancedText: String
     let tokenCount: Int
     let optimizations: [PromptModel.OptimizationType]
+    var scaffoldTokensSaved: Int = 0
 }
 '''
 
-optimization_service = '''import Foundation
+OPTIMIZATION_SERVICE = r'''import Foundation
 import Combine
 
 class OptimizationService {
     static let shared = OptimizationService()
-    
+
     private var settings: LLMConfiguration?
-    
+
     private init() {}
-    
+
     func configure(settings: LLMConfiguration) {
         self.settings = settings
-        print("OptimizationService: Configured with settings - NPU: \\(settings.useNPU), chunkSize: \\(settings.chunkSize), quantization: \\(settings.quantization.rawValue)")
+        print("OptimizationService: Configured with settings - NPU: \(settings.useNPU), chunkSize: \(settings.chunkSize), quantization: \(settings.quantization.rawValue)")
     }
-    
+
     func processWithNPU(_ prompt: String) async throws -> String {
         guard let settings = settings else {
             throw OptimizationError.notConfigured
         }
-        
-        // Simulate NPU processing
-        if settings.useNPU {
-            // NPU-accelerated processing
-            try await Task.sleep(nanoseconds: 50_000_000) // 0.05 seconds (fast)
-        } else {
-            // Regular CPU processing
-            try await Task.sleep(nanoseconds: 200_000_000) // 0.2 seconds (slower)
-        }
-        
+
+        {{npuDelayCode}}
         // Apply chunking based on settings
         return applyChunking(to: prompt, chunkSize: settings.chunkSize)
     }
-    
+
     private func applyChunking(to prompt: String, chunkSize: Int) -> String {
         // Simulate chunking process
         // In a real app, this would break the prompt into semantic chunks
         return prompt
     }
-    
+
     func applyQuantization(_ prompt: String, level: LLMConfiguration.QuantizationLevel) -> String {
         // Simulate quantization process
         // In a real app, this would apply actual quantization
         return prompt
     }
-    
+
     enum OptimizationError: Error {
         case notConfigured
         case processingFailed
@@ -539,21 +573,72 @@ class OptimizationService {
 }
 '''
 
-# Write the files
-with open('SettingsView.swift', 'w') as f:
-    f.write(settings_view)
+# Profile-dependent parts of the services (see swift_templates.PROFILES):
+# the app simulates model latency with Task.sleep, the benchmark build does
+# only the real work and reports its time from the monotonic clock
+SERVICE_FRAGMENTS = {
+    'primaryModelDelayCode': {
+        'app': """// Simulate processing delay
+try await Task.sleep(nanoseconds: {{primaryModelDelayNs}}) // {{primaryModelDelay}} seconds
+""",
+        'benchmark': """let start = ProcessInfo.processInfo.systemUptime
+""",
+    },
+    'primaryModelReturn': {
+        'app': "return response",
+        'benchmark': """return LLMResponse(
+    content: response.content,
+    model: response.model,
+    tokenCount: response.tokenCount,
+    processingTime: ProcessInfo.processInfo.systemUptime - start
+)""",
+    },
+    'secondaryModelDelayCode': {
+        'app': """// Simulate processing delay
+try await Task.sleep(nanoseconds: {{secondaryModelDelayNs}}) // {{secondaryModelDelay}} seconds
+""",
+        'benchmark': "",
+    },
+    'npuDelayCode': {
+        'app': """// Simulate NPU processing
+if settings.useNPU {
+    // NPU-accelerated processing
+    try await Task.sleep(nanoseconds: {{npuDelayNs}}) // {{npuDelay}} seconds (fast)
+} else {
+    // Regular CPU processing
+    try await Task.sleep(nanoseconds: {{cpuDelayNs}}) // {{cpuDelay}} seconds (slower)
+}
+""",
+        'benchmark': "",
+    },
+}
+
+
+# Generators exposed by this script; each renders an LLMConfiguration-like
+# config dict (see swift_templates.py) into {relative_path: content}
+def settings_view(config=None):
+    return {f'{SOURCES_DIR}/Views/Settings/SettingsView.swift': render(SETTINGS_VIEW, config)}
 
-with open('LLMService.swift', 'w') as f:
-    f.write(llm_service)
 
-with open('PromptService.swift', 'w') as f:
-    f.write(prompt_service)
+def llm_service(config=None):
+    return {f'{SOURCES_DIR}/Services/LLMService.swift': render(LLM_SERVICE, config, SERVICE_FRAGMENTS)}
 
-with open('OptimizationService.swift', 'w') as f:
-    f.write(optimization_service)
 
-print("Created additional files:")
-print("- SettingsView.swift")
-print("- LLMService.swift")
-print("- PromptService.swift")
-print("- OptimizationService.swift")
\ No newline at end of file
+def prompt_service(config=None):
+    return {f'{SOURCES_DIR}/Services/PromptService.swift': render(PROMPT_SERVICE, config)}
+
+
+def optimization_service(config=None):
+    return {f'{SOURCES_DIR}/Services/OptimizationService.swift': render(OPTIMIZATION_SERVICE, config, SERVICE_FRAGMENTS)}
+
+
+GENERATORS = {
+    'settings_view': settings_view,
+    'llm_service': llm_service,
+    'prompt_service': prompt_service,
+    'optimization_service': optimization_service,
+}
+
+if __name__ == '__main__':
+    # Write the files (unchanged files are skipped)
+    write_outputs(collect(GENERATORS))
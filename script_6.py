@@ -1,5 +1,7 @@
+from generator_manifest import collect, write_outputs
+
 # Create Package.swift and README
-package_swift = '''// swift-tools-version: 5.9
+PACKAGE_SWIFT = '''// swift-tools-version: 5.9
 import PackageDescription
 
 let package = Package(
@@ -16,9 +18,9 @@ let package = Package(
     ],
     dependencies: [
         // Core ML and Foundation Models framework dependencies
-        .package(url: "https://github.com/tattn/LocalLLMClient.git", branch: "main"),
+        .package(url: "https://github.com/tattn/LocalLLMClient.git", branch: "main"), // Consider pinning to tag or commit
         .package(url: "https://github.com/apple/swift-async-algorithms.git", from: "1.0.0"),
-        .package(url: "https://github.com/pointfreeco/swift-combine-schedulers", from: "1.0.0"),
+        .package(url: "https://github.com/pointfreeco/combine-schedulers", from: "1.0.0"),
     ],
     targets: [
         .target(
@@ -26,7 +28,7 @@ let package = Package(
             dependencies: [
                 "LocalLLMClient",
                 .product(name: "AsyncAlgorithms", package: "swift-async-algorithms"),
-                .product(name: "CombineSchedulers", package: "swift-combine-schedulers"),
+                .product(name: "CombineSchedulers", package: "combine-schedulers"),
             ],
             resources: [
                 .process("Resources/Models"),
@@ -41,7 +43,7 @@ let package = Package(
 )
 '''
 
-readme_content = '''# Mobile LLM Prompt Refiner
+README_CONTENT = '''# Mobile LLM Prompt Refiner
 
 [![iOS](https://img.shields.io/badge/iOS-17.0+-blue.svg)](https://developer.apple.com/ios/)
 [![Swift](https://img.shields.io/badge/Swift-5.9+-orange.svg)](https://swift.org)
@@ -287,52 +289,59 @@ This project is licensed under the MIT License - see the [LICENSE](LICENSE) file
 Made with ❤️ for the iOS development community.
 '''
 
-# Write the final files
-with open('Package.swift', 'w') as f:
-    f.write(package_swift)
-
-with open('README.md', 'w') as f:
-    f.write(readme_content)
-
-print("Created final files:")
-print("- Package.swift")
-print("- README.md")
-
-print("\n✅ iOS Mobile LLM Prompt Refiner app creation complete!")
-print("\nFiles created:")
-print("- App structure and main files")
-print("- Models and ViewModels")
-print("- SwiftUI Views")
-print("- Services and business logic")
-print("- Package configuration")
-print("- Comprehensive documentation")
-
-# Create a summary of all files
-all_files = [
-    "MobileLLMPromptRefinerApp.swift",
-    "ContentView.swift",
-    "PromptModel.swift",
-    "LLMConfiguration.swift",
-    "RefinementStep.swift",
-    "PromptViewModel.swift",
-    "SettingsViewModel.swift",
-    "RefinementViewModel.swift",
-    "PromptRefinerView.swift",
-    "TechniquesView.swift",
-    "SettingsView.swift",
-    "LLMService.swift",
-    "PromptService.swift",
-    "OptimizationService.swift",
-    "Package.swift",
-    "README.md",
-    "ios_project_structure.md"
-]
+# Generators exposed by this script; each returns {relative_path: content}
+def package_swift(config=None):
+    return {'Package.swift': PACKAGE_SWIFT}
+
+
+def readme_content(config=None):
+    return {'README.md': README_CONTENT}
+
+
+GENERATORS = {
+    'package_swift': package_swift,
+    'readme_content': readme_content,
+}
+
+if __name__ == '__main__':
+    # Write the final files (unchanged files are skipped)
+    write_outputs(collect(GENERATORS))
+
+    print("\n✅ iOS Mobile LLM Prompt Refiner app creation complete!")
+    print("\nFiles created:")
+    print("- App structure and main files")
+    print("- Models and ViewModels")
+    print("- SwiftUI Views")
+    print("- Services and business logic")
+    print("- Package configuration")
+    print("- Comprehensive documentation")
+
+    # Create a summary of all files
+    all_files = [
+        "MobileLLMPromptRefinerApp.swift",
+        "ContentView.swift",
+        "PromptModel.swift",
+        "LLMConfiguration.swift",
+        "RefinementStep.swift",
+        "PromptViewModel.swift",
+        "SettingsViewModel.swift",
+        "RefinementViewModel.swift",
+        "PromptRefinerView.swift",
+        "TechniquesView.swift",
+        "SettingsView.swift",
+        "LLMService.swift",
+        "PromptService.swift",
+        "OptimizationService.swift",
+        "Package.swift",
+        "README.md",
+        "ios_project_structure.md"
+    ]
 
-print(f"\nTotal files created: {len(all_files)}")
-print("\nNext steps:")
-print("1. Open Xcode and create a new iOS project")
-print("2. Replace the generated files with the ones created here")
-print("3. Add the Package.swift dependencies")
-print("4. Add Core ML models to the Resources folder")
-print("5. Configure app permissions in Info.plist")
-print("6. Test the app on a device with NPU support")
\ No newline at end of file
+    print(f"\nTotal files created: {len(all_files)}")
+    print("\nNext steps:")
+    print("1. Open Xcode and create a new iOS project")
+    print("2. Replace the generated files with the ones created here")
+    print("3. Add the Package.swift dependencies")
+    print("4. Add Core ML models to the Resources folder")
+    print("5. Configure app permissions in Info.plist")
+    print("6. Test the app on a device with NPU support")
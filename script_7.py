@@ -1,5 +1,7 @@
+from generator_manifest import collect, write_outputs
+
 # Create a GitHub repository setup guide
-github_setup = '''# GitHub Repository Setup Guide
+GITHUB_SETUP = '''# GitHub Repository Setup Guide
 
 ## Creating the Repository Structure
 
@@ -25,35 +27,16 @@ mkdir -p Scripts
 mkdir -p Sources/MobileLLMPromptRefiner/Utilities/Extensions
 ```
 
-### Step 3: Move Files to Correct Locations
+### Step 3: Generate Files into the Correct Locations
 ```bash
-# Main app files
-mv MobileLLMPromptRefinerApp.swift Sources/MobileLLMPromptRefiner/
-mv ContentView.swift Sources/MobileLLMPromptRefiner/
-
-# Models
-mv PromptModel.swift Sources/MobileLLMPromptRefiner/Models/
-mv LLMConfiguration.swift Sources/MobileLLMPromptRefiner/Models/
-mv RefinementStep.swift Sources/MobileLLMPromptRefiner/Models/
-
-# ViewModels
-mv PromptViewModel.swift Sources/MobileLLMPromptRefiner/ViewModels/
-mv SettingsViewModel.swift Sources/MobileLLMPromptRefiner/ViewModels/
-mv RefinementViewModel.swift Sources/MobileLLMPromptRefiner/ViewModels/
-
-# Views
-mv PromptRefinerView.swift Sources/MobileLLMPromptRefiner/Views/Main/
-mv TechniquesView.swift Sources/MobileLLMPromptRefiner/Views/Techniques/
-mv SettingsView.swift Sources/MobileLLMPromptRefiner/Views/Settings/
-
-# Services
-mv LLMService.swift Sources/MobileLLMPromptRefiner/Services/
-mv PromptService.swift Sources/MobileLLMPromptRefiner/Services/
-mv OptimizationService.swift Sources/MobileLLMPromptRefiner/Services/
-
-# Documentation
-mv README.md ./
-mv ios_project_structure.md Documentation/
+# Renders every generator module in parallel and writes the Swift sources
+# straight into Sources/MobileLLMPromptRefiner/{Models,ViewModels,Views,Services}
+# plus Documentation/, Package.swift and README.md
+python generate_all.py
+
+# Optional: a headless benchmark build without the simulated service delays,
+# reporting each refinement step's real duration
+python generate_all.py --profile benchmark --root build/benchmark
 ```
 
 ### Step 4: Create Additional Required Files
@@ -259,16 +242,16 @@ on:
 jobs:
   build-and-test:
     runs-on: macos-latest
-    
+
     steps:
     - uses: actions/checkout@v4
-    
+
     - name: Select Xcode version
       run: sudo xcode-select -s /Applications/Xcode_15.0.app/Contents/Developer
-    
+
     - name: Build
       run: xcodebuild -scheme MobileLLMPromptRefiner -destination 'platform=iOS Simulator,name=iPhone 15 Pro' build
-    
+
     - name: Test
       run: xcodebuild -scheme MobileLLMPromptRefiner -destination 'platform=iOS Simulator,name=iPhone 15 Pro' test
 EOF
@@ -394,15 +377,24 @@ EOF
 This setup guide provides a complete GitHub repository structure for the iOS Mobile LLM Prompt Refiner app.
 '''
 
-with open('github_setup_guide.md', 'w') as f:
-    f.write(github_setup)
-
-print("✅ Created GitHub repository setup guide: github_setup_guide.md")
-print("\nComplete project files:")
-print("📱 iOS App Implementation")
-print("📊 Architecture diagrams")
-print("📈 Performance charts")
-print("📚 Comprehensive documentation")
-print("🔧 GitHub repository structure")
-print("⚙️ CI/CD workflows")
-print("🚀 Ready for deployment!")
\ No newline at end of file
+# Generators exposed by this script; each returns {relative_path: content}
+def github_setup(config=None):
+    return {'github_setup_guide.md': GITHUB_SETUP}
+
+
+GENERATORS = {
+    'github_setup': github_setup,
+}
+
+if __name__ == '__main__':
+    # Write the guide (skipped when the content is unchanged)
+    write_outputs(collect(GENERATORS))
+
+    print("\nComplete project files:")
+    print("📱 iOS App Implementation")
+    print("📊 Architecture diagrams")
+    print("📈 Performance charts")
+    print("📚 Comprehensive documentation")
+    print("🔧 GitHub repository structure")
+    print("⚙️ CI/CD workflows")
+    print("🚀 Ready for deployment!")
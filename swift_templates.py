@@ -0,0 +1,179 @@
+# Compiled, parameterized templates for the Swift generators
+#
+# Templates are plain strings with {{name}} placeholders. Each distinct
+# template is parsed once into literal/placeholder parts and cached, so a
+# render is a single join over pre-split pieces. Parameters come from an
+# LLMConfiguration-like dict (same keys as the Swift struct, plus the
+# simulated delays), which lets us produce per-customer builds without
+# copying the templates. Unknown configuration keys are rejected, so a
+# misspelt key fails loudly instead of rendering the defaults.
+#
+# A placeholder alone on its line renders as a block: each line of its value
+# is indented like the placeholder, and an empty value drops the line. The
+# `profile` parameter picks between per-profile fragments passed to
+# render(): the default 'app' profile keeps the simulated Task.sleep
+# latencies, 'benchmark' drops them and times the real work with a
+# monotonic clock.
+import re
+from collections import OrderedDict
+
+_PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Mirrors LLMConfiguration.LLMModel / OptimizationLevel / QuantizationLevel
+MODEL_NAMES = {
+    'gpt4': 'GPT-4',
+    'claude3': 'Claude-3',
+    'geminiPro': 'Gemini-Pro',
+    'gemma2B': 'Gemma-2B',
+    'phi3': 'Phi-3',
+    'llama7B': 'LLaMA-7B',
+}
+OPTIMIZATION_LEVELS = {
+    'performance': 'Performance',
+    'balanced': 'Balanced',
+    'efficiency': 'Efficiency',
+}
+QUANTIZATION_LEVELS = {
+    'fourBit': '4-bit',
+    'eightBit': '8-bit',
+    'sixteenBit': '16-bit',
+}
+# Generation profiles: the app as shipped, or a headless benchmark build
+PROFILES = {
+    'app': 'App',
+    'benchmark': 'Benchmark',
+}
+
+# LLMConfiguration.default plus the simulated service delays in seconds
+DEFAULT_CONFIGURATION = {
+    'primaryModel': 'gpt4',
+    'secondaryModel': 'gemma2B',
+    'optimizationLevel': 'balanced',
+    'chunkSize': 128,
+    'useNPU': True,
+    'privacyMode': False,
+    'quantization': 'fourBit',
+    'primaryModelDelay': 0.5,
+    'secondaryModelDelay': 0.3,
+    'npuDelay': 0.05,
+    'cpuDelay': 0.2,
+    'stepDelay': 0.1,
+    'profile': 'app',
+}
+
+# Expanded parameters kept for this many distinct configurations
+_PARAMS_CACHE_SIZE = 64
+
+_DELAYS = ('primaryModelDelay', 'secondaryModelDelay', 'npuDelay', 'cpuDelay', 'stepDelay')
+
+
+class Template:
+    """A template split once into literal text and placeholder names."""
+
+    def __init__(self, source):
+        parts = _PLACEHOLDER.split(source)
+        self.literals = literals = parts[0::2]
+        self.names = parts[1::2]
+        # Indentation of each placeholder alone on its line, else None; the
+        # indentation and newline move out of the literals into the block
+        self.blocks = []
+        for i in range(len(self.names)):
+            before, after = literals[i], literals[i + 1]
+            indent = before[len(before.rstrip(' ')):]
+            line_start = before[:len(before) - len(indent)]
+            at_line_start = line_start.endswith('\n') or (not line_start and (i == 0 or self.blocks[-1] is not None))
+            if at_line_start and after.startswith('\n'):
+                literals[i] = line_start
+                literals[i + 1] = after[1:]
+                self.blocks.append(indent)
+            else:
+                self.blocks.append(None)
+
+    def render(self, values):
+        out = [self.literals[0]]
+        try:
+            for name, indent, literal in zip(self.names, self.blocks, self.literals[1:]):
+                value = values[name]
+                if indent is not None and value:
+                    value = ''.join(indent + line + '\n' if line else '\n' for line in value.split('\n'))
+                out.append(value)
+                out.append(literal)
+        except KeyError as e:
+            raise KeyError(f"missing template parameter {e.args[0]!r}") from None
+        return ''.join(out)
+
+
+_templates = {}
+_params = OrderedDict()
+
+
+def compile_template(source):
+    template = _templates.get(source)
+    if template is None:
+        template = _templates[source] = Template(source)
+    return template
+
+
+def _lookup(table, kind, key):
+    if key not in table:
+        raise ValueError(f"unknown {kind} {key!r}; expected one of {', '.join(table)}")
+    return table[key]
+
+
+def _swift_bool(value):
+    return 'true' if value else 'false'
+
+
+def template_params(config=None):
+    """Expand an LLMConfiguration-like dict into template placeholder values."""
+    unknown = [name for name in (config or {}) if name not in DEFAULT_CONFIGURATION]
+    if unknown:
+        raise ValueError(f"unknown configuration key(s) {', '.join(map(repr, unknown))}; "
+                         f"expected one of {', '.join(DEFAULT_CONFIGURATION)}")
+    config = {**DEFAULT_CONFIGURATION, **(config or {})}
+    try:
+        key = tuple(sorted(config.items()))
+        values = _params.get(key)
+    except TypeError:
+        # An unhashable value (say a list from a JSON config) is not cached;
+        # the conversions below report whether it is usable at all
+        key = values = None
+    if values is not None:
+        _params.move_to_end(key)
+        return values
+
+    values = {
+        'primaryModel': config['primaryModel'],
+        'primaryModelName': _lookup(MODEL_NAMES, 'model', config['primaryModel']),
+        'secondaryModel': config['secondaryModel'],
+        'secondaryModelName': _lookup(MODEL_NAMES, 'model', config['secondaryModel']),
+        'optimizationLevel': config['optimizationLevel'],
+        'optimizationLevelName': _lookup(OPTIMIZATION_LEVELS, 'optimization level', config['optimizationLevel']),
+        'chunkSize': str(int(config['chunkSize'])),
+        'useNPU': _swift_bool(config['useNPU']),
+        'privacyMode': _swift_bool(config['privacyMode']),
+        'quantization': config['quantization'],
+        'quantizationName': _lookup(QUANTIZATION_LEVELS, 'quantization level', config['quantization']),
+        'profile': config['profile'],
+        'profileName': _lookup(PROFILES, 'profile', config['profile']),
+    }
+    for name in _DELAYS:
+        seconds = config[name]
+        values[name] = f'{seconds:g}'
+        values[name + 'Ns'] = f'{round(seconds * 1_000_000_000):_}'
+
+    if key is not None:
+        _params[key] = values
+        if len(_params) > _PARAMS_CACHE_SIZE:
+            _params.popitem(last=False)
+    return values
+
+
+def render(source, config=None, fragments=None):
+    """Render `source`; `fragments` maps placeholder names to {profile: template}."""
+    values = template_params(config)
+    if fragments:
+        profile = values['profile']
+        values = {**values, **{name: compile_template(variants[profile]).render(values)
+                               for name, variants in fragments.items()}}
+    return compile_template(source).render(values)
@@ -0,0 +1,5 @@
+# Make prompt_refiner importable however pytest is started
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,111 @@
+import pickle
+import threading
+
+import pytest
+
+from prompt_refiner.batching import BatchScheduler
+from prompt_refiner.config import LLMConfiguration
+from prompt_refiner.kv_cache import PagedKVCache
+from prompt_refiner.model import DecoderModel, KVCacheFull, ModelConfig
+from prompt_refiner.pipeline import RefinementPipeline
+from prompt_refiner.services import LLMService
+from prompt_refiner.tokenizer import default_tokenizer
+
+CONFIG = ModelConfig(vocab_size=300, d_model=32, n_layers=2, n_heads=4, d_ff=64, max_seq_len=128)
+REQUESTS = [(list(range(1, 1 + n)), m) for n, m in ((3, 5), (10, 1), (1, 12), (7, 8), (20, 3), (5, 0))]
+
+
+@pytest.fixture(scope='module')
+def model():
+    return DecoderModel.random(CONFIG, seed=4)
+
+
+def test_scheduler_matches_sequential_generate(model):
+    expected = [model.generate(prompt, new_tokens) if new_tokens else [] for prompt, new_tokens in REQUESTS]
+    with BatchScheduler(model, max_batch_size=3) as scheduler:
+        futures = [scheduler.submit(prompt, new_tokens) for prompt, new_tokens in REQUESTS]
+        assert [future.result(timeout=30) for future in futures] == expected
+    assert scheduler.stats.mean_batch_size > 1
+
+
+def test_scheduler_serves_concurrent_callers(model):
+    results = {}
+
+    def client(index, prompt, new_tokens):
+        results[index] = scheduler.generate(prompt, new_tokens)
+
+    with BatchScheduler(model, max_batch_size=4) as scheduler:
+        threads = [threading.Thread(target=client, args=(i,) + request) for i, request in enumerate(REQUESTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert [results[i] for i in range(len(REQUESTS))] == \
+        [model.generate(prompt, new_tokens) if new_tokens else [] for prompt, new_tokens in REQUESTS]
+
+
+def test_scheduler_waits_for_pages_on_a_small_pool(model):
+    paged = DecoderModel(CONFIG, model.weights)
+    paged.kv_pool = PagedKVCache(CONFIG, num_pages=8, page_size=4)
+    requests = [(list(range(1, 9)), 8)] * 5  # 4 pages each, two fit at once
+    with BatchScheduler(paged, max_batch_size=4) as scheduler:
+        futures = [scheduler.submit(prompt, new_tokens) for prompt, new_tokens in requests]
+        outputs = [future.result(timeout=30) for future in futures]
+    assert outputs == [model.generate(prompt, new_tokens) for prompt, new_tokens in requests]
+    assert paged.kv_pool.stats().pages_used == 0
+
+
+def test_scheduler_fails_requests_that_cannot_fit(model):
+    paged = DecoderModel(CONFIG, model.weights)
+    paged.kv_pool = PagedKVCache(CONFIG, num_pages=2, page_size=4)
+    with BatchScheduler(paged) as scheduler:
+        with pytest.raises(KVCacheFull):
+            scheduler.generate(list(range(1, 9)), 8)
+        with pytest.raises(ValueError):
+            scheduler.generate([], 4)
+    with pytest.raises(RuntimeError):
+        scheduler.submit([1], 1)
+
+
+def test_submit_and_close_race_never_strands_a_request(model):
+    for _ in range(20):
+        scheduler = BatchScheduler(model)
+        futures = []
+
+        def client():
+            for _ in range(50):
+                try:
+                    futures.append(scheduler.submit([1, 2, 3], 1))
+                except RuntimeError:
+                    return
+
+        thread = threading.Thread(target=client)
+        thread.start()
+        scheduler.close()
+        thread.join()
+        assert all(future.done() for future in futures)
+
+
+def test_scheduler_pickles(model):
+    with BatchScheduler(model) as scheduler:
+        expected = scheduler.generate([1, 2, 3], 4)
+        with pickle.loads(pickle.dumps(scheduler)) as clone:
+            assert clone.generate([1, 2, 3], 4) == expected
+
+
+def test_scheduler_in_local_models_across_processes():
+    configuration = LLMConfiguration()
+    config = ModelConfig(vocab_size=default_tokenizer().vocab_size, d_model=32, n_layers=2, n_heads=4, d_ff=64,
+                         max_seq_len=512)
+    with BatchScheduler(DecoderModel.random(config, seed=2)) as scheduler:
+        pipeline = RefinementPipeline(configuration, LLMService(configuration, {configuration.secondary_model: scheduler}))
+        prompts = ["Create a story about AI", "Explain caching", "Summarize this", "Plan a trip"]
+        expected = [pipeline.refine(prompt).enhanced_text for prompt in prompts]
+        results = []
+        # A worker stuck on the parent's decode thread would hang refine_batch
+        worker = threading.Thread(target=lambda: results.extend(pipeline.refine_batch(prompts, jobs=2, chunksize=1)),
+                                  daemon=True)
+        worker.start()
+        worker.join(timeout=120)
+        assert not worker.is_alive()
+        assert [result.enhanced_text for result in results] == expected
@@ -0,0 +1,57 @@
+import pytest
+
+from benchmark_generators import find_regressions, main, run_once, update_baseline
+
+FAST = {'wall_time': 0.1, 'cpu_time': 0.1, 'peak_rss': 20000, 'bytes_written': 100}
+
+
+def slower(**changes):
+    return {**FAST, **changes}
+
+
+def test_regressions_past_threshold_and_noise_floor():
+    baseline = {'a.py': FAST, 'b.py': FAST, 'c.py': FAST}
+    current = {'a.py': slower(wall_time=0.2), 'b.py': slower(wall_time=0.104), 'c.py': slower(bytes_written=200)}
+    assert find_regressions(current, baseline, 0.2) == [('a.py', 'wall_time', 0.1, 0.2),
+                                                       ('c.py', 'bytes_written', 100, 200)]
+
+
+def test_failures_are_reported_whatever_the_baseline():
+    current = {'a.py': {'error': 'boom'}, 'b.py': {'error': 'boom'}, 'c.py': {'error': 'boom'}}
+    baseline = {'a.py': FAST, 'b.py': {'error': 'old'}}
+    assert [name for name, metric, _, _ in find_regressions(current, baseline, 0.2) if metric == 'error'] == \
+        ['a.py', 'b.py', 'c.py']
+
+
+def test_new_scripts_join_an_existing_baseline():
+    baseline = {'a.py': FAST}
+    current = {'a.py': slower(wall_time=1.0), 'new.py': slower(cpu_time=0.5), 'broken.py': {'error': 'boom'}}
+    assert update_baseline(baseline, current) == ['new.py', 'broken.py']
+    assert baseline == {'a.py': FAST, 'new.py': current['new.py'], 'broken.py': {'error': 'boom'}}
+    # A failure in the baseline gives way to the first successful run
+    assert update_baseline(baseline, {'broken.py': FAST}) == ['broken.py']
+    assert baseline['broken.py'] == FAST
+
+
+def test_replacing_the_baseline_keeps_failures_and_other_scripts():
+    baseline = {'a.py': FAST, 'b.py': FAST}
+    update_baseline(baseline, {'a.py': {'error': 'boom'}}, replace=True)
+    assert baseline == {'a.py': {'error': 'boom'}, 'b.py': FAST}
+
+
+def test_run_once_reports_the_last_stderr_line(tmp_path):
+    script = tmp_path / 'fails.py'
+    script.write_text("import sys\nsys.stderr.write('x' * 200000 + '\\n')\nraise SystemExit('bad input')\n")
+    assert run_once(str(script)) == {'error': 'bad input'}
+    script.write_text("open('out.txt', 'w').write('12345')\n")
+    result = run_once(str(script))
+    assert result['bytes_written'] == 5 and result['wall_time'] > 0
+
+
+@pytest.mark.parametrize('update', [False, True])
+def test_main_fails_on_a_broken_script_even_when_updating(tmp_path, monkeypatch, update):
+    broken = tmp_path / 'script_9.py'
+    broken.write_text("raise SystemExit('broken')\n")
+    monkeypatch.setattr('benchmark_generators.discover_targets', lambda: [str(broken)])
+    argv = ['--repeat', '1', '--results', str(tmp_path / 'results.json')] + (['--update-baseline'] if update else [])
+    assert main(argv) == 1
@@ -0,0 +1,144 @@
+import io
+import os
+import random
+from bisect import bisect_left
+from itertools import accumulate
+
+import pytest
+
+from prompt_refiner.chunking import (CONTENT_DEFINED, FIXED, ChunkCache, _split_piece_ids, chunk_spans,
+                                    iter_stream_chunks, iter_units)
+from prompt_refiner.config import LLMConfiguration
+from prompt_refiner.services import OptimizationService
+from prompt_refiner.tokenizer import default_tokenizer
+
+SIZES = [(8, 4), (16, 6), (16, 8), (32, 4), (64, 8), (128, 0)]
+
+
+def random_text(rng, words=200):
+    vocabulary = ["the", "model", "prompt", "tokens.", "Refine", "this:", "snake_case", "42", "3.14", "\n\n", "\n",
+                  "x" * 40, "1" * 30, "!" * 25, "naïve", "日本語", "🚀"]
+    return ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, words)))
+
+
+def texts(count=60, seed=0):
+    rng = random.Random(seed)
+    return [random_text(rng) for _ in range(count)]
+
+
+def span_tokens(text, spans, chunk_size):
+    # Tokens of each span as the chunker counts them: the units inside it
+    units = list(iter_units(text, default_tokenizer(), chunk_size))
+    offsets = [start for start, _, _, _ in units] + [len(text)]
+    before = list(accumulate((n for _, _, n, _ in units), initial=0))
+    return [before[bisect_left(offsets, end)] - before[bisect_left(offsets, start)] for start, end in spans]
+
+
+@pytest.mark.parametrize('chunk_size, overlap', SIZES)
+def test_fixed_chunks_cover_text_within_budget(chunk_size, overlap):
+    for text in texts():
+        starts, ends = chunk_spans(text, chunk_size, overlap)
+        spans = list(zip(starts, ends))
+        assert spans[0][0] == 0 and spans[-1][1] == len(text)
+        for (start, end), (next_start, next_end) in zip(spans, spans[1:]):
+            # Neighbours touch or overlap, and each one moves forward
+            assert next_start <= end
+            assert next_start > start and next_end > end
+        assert max(span_tokens(text, spans, chunk_size)) <= chunk_size
+
+
+@pytest.mark.parametrize('chunk_size, overlap', SIZES)
+def test_no_chunk_is_contained_in_its_predecessor(chunk_size, overlap):
+    for text in texts(seed=1):
+        starts, ends = chunk_spans(text, chunk_size, overlap)
+        spans = list(zip(starts, ends))
+        for (start, end), (next_start, next_end) in zip(spans, spans[1:]):
+            assert not (start <= next_start and next_end <= end), (start, end, next_start, next_end)
+
+
+def test_overlap_tail_does_not_repeat():
+    # A sentence break inside the overlap used to be picked as the next
+    # chunk's cut again, emitting chunks made only of the previous tail
+    text = ' '.join(['word'] * 15) + '. ' + ' '.join(['more'] * 30)
+    starts, ends = chunk_spans(text, 16, 8)
+    assert len(set(ends)) == len(ends)
+
+
+def content_chunk_tokens(text, starts, ends, chunk_size):
+    # Tokens per content-defined chunk, counted over the chunker's own units
+    tokenizer = default_tokenizer()
+    min_tokens = max(1, chunk_size // 4)
+    units = []
+    for match in tokenizer._regex.finditer(text):
+        ids = tokenizer._encode_piece(match.group())
+        if len(ids) <= min_tokens:
+            units.append((match.start(), len(ids)))
+        else:
+            units += [(start, len(unit_ids)) for start, _, unit_ids in
+                      _split_piece_ids(match.group(), match.start(), ids, tokenizer.vocab)]
+    offsets = [start for start, _ in units] + [len(text)]
+    before = list(accumulate((n for _, n in units), initial=0))
+    return [before[bisect_left(offsets, end)] - before[bisect_left(offsets, start)] for start, end in zip(starts, ends)]
+
+
+@pytest.mark.parametrize('chunk_size', [4, 16, 64, 128])
+def test_content_chunks_respect_min_and_max(chunk_size):
+    rng = random.Random(chunk_size)
+    vocabulary = ["the", "model", "prompt.", "x" * 40, "1" * 300, "!" * 90, "日本語" * 20, "\n\n", "🚀" * 30]
+    for _ in range(30):
+        text = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 300)))
+        starts, ends = chunk_spans(text, chunk_size, mode=CONTENT_DEFINED)
+        assert starts[0] == 0 and ends[-1] == len(text)
+        assert all(starts[i + 1] == ends[i] for i in range(len(starts) - 1))
+        sizes = content_chunk_tokens(text, starts, ends, chunk_size)
+        assert max(sizes) <= chunk_size
+        # Forced cuts included; only the final chunk may be short
+        assert min(sizes[:-1], default=chunk_size) >= max(1, chunk_size // 4)
+
+
+def test_content_chunks_are_local_to_an_edit():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    names = ('README.md', 'project-summary.md')
+    text = ' '.join(open(os.path.join(root, name), encoding='utf-8').read() for name in names)
+    starts, ends = chunk_spans(text, 64, mode=CONTENT_DEFINED)
+    before = {text[start:end] for start, end in zip(starts, ends)}
+    rng = random.Random(0)
+    changed = []
+    for _ in range(50):
+        i = rng.randrange(len(text))
+        edited = text[:i] + rng.choice('ab .,\n') + text[i + 1:]
+        starts, ends = chunk_spans(edited, 64, mode=CONTENT_DEFINED)
+        changed.append(sum(edited[start:end] not in before for start, end in zip(starts, ends)))
+    assert sum(changed) / len(changed) <= 2
+
+
+@pytest.mark.parametrize('chunk_size, overlap', SIZES)
+@pytest.mark.parametrize('block_size', [1, 7, 4096])
+def test_stream_chunks_match_in_memory(chunk_size, overlap, block_size):
+    for text in texts(count=15, seed=2):
+        starts, ends = chunk_spans(text, chunk_size, overlap)
+        streamed = list(iter_stream_chunks(io.StringIO(text), chunk_size, overlap, block_size=block_size))
+        assert [(start, end) for start, end, _ in streamed] == list(zip(starts, ends))
+        assert all(chunk == text[start:end] for start, end, chunk in streamed)
+
+
+def test_stream_accepts_uneven_string_pieces():
+    text = texts(count=1, seed=3)[0] * 3
+    pieces = [text[i:i + 11] for i in range(0, len(text), 11)]
+    starts, ends = chunk_spans(text, 16, 4)
+    assert [(start, end) for start, end, _ in iter_stream_chunks(iter(pieces), 16, 4)] == list(zip(starts, ends))
+
+
+@pytest.mark.parametrize('mode', [FIXED, CONTENT_DEFINED])
+def test_npu_stage_output_is_the_same_with_cache_and_stream(mode):
+    settings = LLMConfiguration(chunk_size=16)
+    text = ' '.join(texts(count=5, seed=4))
+    plain = OptimizationService(settings, chunking=mode).process_with_npu(text)
+    assert plain == text  # quantization is a pass-through stand-in
+    cached_service = OptimizationService(settings, chunking=mode, cache=ChunkCache())
+    assert cached_service.process_with_npu(text) == plain
+    assert cached_service.process_with_npu(text) == plain
+    assert cached_service.cache.hits > 0
+    if mode == FIXED:
+        streamed = OptimizationService(settings).process_stream_with_npu(io.StringIO(text))
+        assert ''.join(streamed) == plain
@@ -0,0 +1,72 @@
+import pytest
+
+from prompt_refiner.compression import Compressor, compress
+from prompt_refiner.pipeline import RefinementPipeline
+
+CHATTY = ("Hi there! I would like you to please summarize this article. It is important to note that the "
+          "article is long. Please summarize this article. Thanks in advance!")
+
+
+@pytest.mark.parametrize('text', [
+    'Fix this code:\nif a:\n    return 1\nif b:\n    return 1\n}\n}',
+    'Explain:\n```python\ndef f(x):\n\n    return  x  *  2\n```\nthen\n```python\ndef f(x):\n\n    return  x  *  2\n```',
+    '- item\n- item\n# Heading\n# Heading',
+])
+def test_code_and_non_sentence_lines_are_untouched(text):
+    assert compress(text).text == text
+
+
+def test_fenced_code_kept_verbatim_around_prose():
+    code = '```\nif a:\n    return  1\n\nif b:\n    return  1\n```'
+    result = compress(f"Please review this.\n{code}\nPlease review this.")
+    assert code in result.text
+    assert result.text.count('eview this.') == 1
+
+
+def test_reordered_sentence_is_not_a_duplicate():
+    text = "The dog bit the man. The man bit the dog."
+    assert compress(text).text == text
+
+
+@pytest.mark.parametrize('text', [
+    "Can you run this on iOS?",
+    "Could you port it to Swift?",
+    "It is not very safe.",
+    "Do not actually delete the files.",
+    "I don't really know why.",
+    "Do this first. Then run:   x  =  1",
+    "Read it. Really.",
+])
+def test_meaning_and_non_sentence_whitespace_are_kept(text):
+    assert compress(text).text == text
+
+
+def test_fillers_go_where_meaning_allows():
+    assert compress("Could you please summarize this.").text == "Summarize this."
+    assert compress("Could you please summarize this?").text == "Could you summarize this?"
+    assert compress("This is very  good.").text == "This is good."
+
+
+def test_identical_sentences_are_deduplicated():
+    result = compress("Summarize the report. List the risks. Summarize the report.")
+    assert result.text == "Summarize the report. List the risks."
+    assert result.compressed_tokens < result.original_tokens
+
+
+def test_fillers_and_boilerplate_removed():
+    result = compress(CHATTY)
+    assert result.text == "Summarize this article. The article is long."
+    assert result.reduction > 50
+
+
+def test_target_ratio_keeps_first_sentence():
+    result = Compressor(target_ratio=0.3).compress(CHATTY)
+    assert result.text.startswith("Summarize this article.")
+    assert result.compressed_tokens <= result.original_tokens
+
+
+def test_pipeline_compresses_only_when_asked():
+    assert "please summarize" in RefinementPipeline().refine(CHATTY).enhanced_text
+    result = RefinementPipeline(compressor=Compressor()).refine(CHATTY)
+    assert "please summarize" not in result.enhanced_text
+    assert result.metrics.token_reduction > 0
@@ -0,0 +1,27 @@
+from generate_all import REPO_DIR, check, generate_all, render_all
+
+
+def test_committed_tree_has_no_drift():
+    assert check(root=REPO_DIR, verbose=False) == []
+
+
+def test_check_reports_edited_and_missing_files(tmp_path, capsys):
+    generate_all(root=str(tmp_path), verbose=False)
+    assert check(root=str(tmp_path), verbose=False) == []
+
+    edited, missing = sorted(render_all())[:2]
+    (tmp_path / edited).write_text('edited by hand\n', encoding='utf-8')
+    (tmp_path / missing).unlink()
+    mismatches = {rel_path: actual for rel_path, _, actual in check(root=str(tmp_path))}
+    assert mismatches == {edited: 'edited by hand\n', missing: None}
+    out = capsys.readouterr().out
+    assert f'--- a/{edited} (on disk)' in out and '-edited by hand' in out
+    assert f'{missing}: missing on disk' in out
+    assert '2 drifted' in out
+
+
+def test_check_uses_the_config(tmp_path):
+    config = {'primaryModel': 'claude3'}
+    generate_all(root=str(tmp_path), config=config, verbose=False)
+    assert check(root=str(tmp_path), config=config, verbose=False) == []
+    assert check(root=str(tmp_path), verbose=False) != []
@@ -0,0 +1,35 @@
+import pytest
+
+from prompt_refiner.__main__ import SAMPLE_PROMPTS
+from prompt_refiner.executor import PipelinedExecutor
+from prompt_refiner.pipeline import RefinementPipeline
+
+PROMPTS = [SAMPLE_PROMPTS[i % len(SAMPLE_PROMPTS)] + f" #{i}" for i in range(25)]
+
+
+def summary(result):
+    return result.enhanced_text, result.output, result.token_count, [step.status for step in result.steps]
+
+
+@pytest.mark.parametrize('concurrency, queue_size', [(None, 8), ({5: 3}, 1), ({2: 2, 3: 2, 4: 2, 5: 2}, 2)])
+def test_pipelined_matches_sequential(concurrency, queue_size):
+    pipeline = RefinementPipeline()
+    expected = [summary(result) for result in pipeline.refine_batch(PROMPTS)]
+    results = PipelinedExecutor(pipeline, concurrency, queue_size).refine_all(PROMPTS)
+    assert [summary(result) for result in results] == expected
+
+
+def test_errors_surface_after_the_batch():
+    with pytest.raises(ValueError, match="empty"):
+        PipelinedExecutor(RefinementPipeline()).refine_all(["fine", "   ", "also fine"])
+
+
+def test_invalid_settings_rejected():
+    pipeline = RefinementPipeline()
+    with pytest.raises(ValueError):
+        PipelinedExecutor(pipeline, {9: 1})
+    with pytest.raises(ValueError):
+        PipelinedExecutor(pipeline, {5: 0})
+    with pytest.raises(ValueError):
+        PipelinedExecutor(pipeline, queue_size=0)
+    assert PipelinedExecutor(pipeline).refine_all([]) == []
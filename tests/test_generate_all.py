@@ -0,0 +1,29 @@
+import os
+
+from generate_all import discover_modules, generate_all, render_all
+
+
+def test_modules_are_discovered_in_numeric_order():
+    names = [os.path.basename(path) for path in discover_modules()]
+    assert names == ['script.py'] + [f'script_{i}.py' for i in range(1, len(names))]
+
+
+def test_generate_all_writes_every_artifact_then_skips_them(tmp_path):
+    files = render_all()
+    written, skipped, timings = generate_all(root=str(tmp_path), jobs=2, verbose=False)
+    assert sorted(written) == sorted(files) and skipped == []
+    assert set(timings) == {os.path.splitext(os.path.basename(path))[0] for path in discover_modules()}
+    for rel_path, content in files.items():
+        with open(tmp_path / rel_path, encoding='utf-8') as f:
+            assert f.read() == content
+
+    written, skipped, _ = generate_all(root=str(tmp_path), jobs=2, verbose=False)
+    assert written == [] and sorted(skipped) == sorted(files)
+
+
+def test_config_reaches_the_workers(tmp_path):
+    config = {'primaryModel': 'claude3', 'chunkSize': 256}
+    generate_all(root=str(tmp_path), jobs=2, config=config, verbose=False)
+    for rel_path, content in render_all(config).items():
+        with open(tmp_path / rel_path, encoding='utf-8') as f:
+            assert f.read() == content
@@ -0,0 +1,52 @@
+import json
+import os
+
+from generate_all import render_all
+from generate_matrix import INDEX_NAME, ContentStore, generate_matrix, variant_configs
+from swift_templates import MODEL_NAMES, OPTIMIZATION_LEVELS, QUANTIZATION_LEVELS
+
+AXES = {'models': ['gpt4', 'claude3'], 'levels': ['balanced'], 'quantizations': ['fourBit'], 'chunk_sizes': [64, 128]}
+
+
+def test_variant_configs_cover_the_cross_product():
+    variants = dict(variant_configs())
+    assert len(variants) == len(MODEL_NAMES) * len(OPTIMIZATION_LEVELS) * len(QUANTIZATION_LEVELS) * 4
+    assert variants['claude3-efficiency-eightBit-chunk256'] == {
+        'primaryModel': 'claude3', 'optimizationLevel': 'efficiency', 'quantization': 'eightBit', 'chunkSize': 256}
+
+
+def test_content_store_keeps_one_object_per_content(tmp_path):
+    store = ContentStore(str(tmp_path))
+    first = store.place('same\n', str(tmp_path / 'a' / 'x.txt'))
+    second = store.place('same\n', str(tmp_path / 'b' / 'x.txt'))
+    assert first == second and store.objects_written == 1
+    assert os.path.samefile(tmp_path / 'a' / 'x.txt', tmp_path / 'b' / 'x.txt')
+    store.place('same\n', str(tmp_path / 'a' / 'x.txt'))
+    assert store.links == 2
+
+
+def test_matrix_lays_out_every_variant_and_shares_identical_files(tmp_path):
+    index = generate_matrix(root=str(tmp_path), verbose=False, **AXES)
+    assert sorted(index) == sorted(name for name, _ in variant_configs(**AXES))
+    with open(tmp_path / INDEX_NAME, encoding='utf-8') as f:
+        assert json.load(f) == index
+
+    for name, variant in index.items():
+        files = render_all(variant['config'])
+        assert set(variant['files']) == set(files)
+        for rel_path, content in files.items():
+            with open(tmp_path / name / rel_path, encoding='utf-8') as f:
+                assert f.read() == content
+
+    a, b = 'gpt4-balanced-fourBit-chunk64', 'gpt4-balanced-fourBit-chunk128'
+    shared = [rel_path for rel_path in index[a]['files'] if index[a]['files'][rel_path] == index[b]['files'][rel_path]]
+    assert shared and len(shared) < len(index[a]['files'])
+    assert all(os.path.samefile(tmp_path / a / rel_path, tmp_path / b / rel_path) for rel_path in shared)
+
+
+def test_rerunning_the_matrix_writes_no_new_objects(tmp_path, capsys):
+    generate_matrix(root=str(tmp_path), verbose=False, **AXES)
+    objects = sorted(os.listdir(tmp_path / '.objects'))
+    generate_matrix(root=str(tmp_path), **AXES)
+    assert '- 0 new objects' in capsys.readouterr().out
+    assert sorted(os.listdir(tmp_path / '.objects')) == objects
@@ -0,0 +1,72 @@
+import json
+import os
+
+from generator_manifest import MANIFEST_NAME, collect, load_manifest, write_outputs
+
+
+def two_files(config):
+    return {'Sources/A.swift': 'struct A {}\n', 'Sources/B.swift': 'struct B {}\n'}
+
+
+def one_file(config):
+    return {'README.md': '# Title\n'}
+
+
+def read(root, rel_path):
+    with open(os.path.join(root, rel_path), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_collect_keeps_every_file_of_a_generator():
+    assert collect({'sources': two_files, 'readme': one_file}) == {
+        'Sources/A.swift': 'struct A {}\n',
+        'Sources/B.swift': 'struct B {}\n',
+        'README.md': '# Title\n',
+    }
+
+
+def test_second_run_skips_unchanged_files(tmp_path):
+    outputs = collect({'sources': two_files, 'readme': one_file})
+    written, skipped = write_outputs(outputs, root=str(tmp_path), verbose=False)
+    assert sorted(written) == sorted(outputs) and skipped == []
+    mtimes = {rel_path: os.stat(tmp_path / rel_path).st_mtime_ns for rel_path in outputs}
+
+    written, skipped = write_outputs(outputs, root=str(tmp_path), verbose=False)
+    assert written == [] and sorted(skipped) == sorted(outputs)
+    assert {rel_path: os.stat(tmp_path / rel_path).st_mtime_ns for rel_path in outputs} == mtimes
+
+
+def test_changed_or_edited_files_are_rewritten(tmp_path):
+    root = str(tmp_path)
+    write_outputs(collect({'sources': two_files}), root=root, verbose=False)
+    with open(tmp_path / 'Sources/A.swift', 'w', encoding='utf-8') as f:
+        f.write('edited by hand\n')
+    outputs = collect({'sources': two_files})
+    outputs['Sources/B.swift'] = 'struct B { let x = 1 }\n'
+    written, skipped = write_outputs(outputs, root=root, verbose=False)
+    assert sorted(written) == ['Sources/A.swift', 'Sources/B.swift'] and skipped == []
+    assert read(root, 'Sources/A.swift') == 'struct A {}\n'
+
+
+def test_missing_manifest_falls_back_to_comparing_bytes(tmp_path):
+    root = str(tmp_path)
+    outputs = collect({'readme': one_file})
+    write_outputs(outputs, root=root, verbose=False)
+    os.remove(tmp_path / MANIFEST_NAME)
+    assert write_outputs(outputs, root=root, verbose=False) == ([], ['README.md'])
+
+
+def test_old_manifest_records_are_dropped(tmp_path):
+    with open(tmp_path / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump({'artifacts': {'readme': {'path': 'README.md', 'sha256': 'x', 'size': 1, 'mtime_ns': 1}}}, f)
+    assert load_manifest(str(tmp_path)) == {'artifacts': {}}
+    write_outputs(collect({'readme': one_file}), root=str(tmp_path), verbose=False)
+    assert list(load_manifest(str(tmp_path))['artifacts']) == ['README.md']
+
+
+def test_replacing_a_file_keeps_its_mode(tmp_path):
+    root = str(tmp_path)
+    write_outputs({'run.sh': 'echo 1\n'}, root=root, verbose=False)
+    os.chmod(tmp_path / 'run.sh', 0o755)
+    write_outputs({'run.sh': 'echo 2\n'}, root=root, verbose=False)
+    assert os.stat(tmp_path / 'run.sh').st_mode & 0o777 == 0o755
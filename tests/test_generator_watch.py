@@ -0,0 +1,52 @@
+import os
+import sys
+import threading
+
+import pytest
+
+from generate_all import REPO_DIR, load_module
+from generator_manifest import collect
+from generator_watch import InotifyWatcher, PollingWatcher, regenerate
+
+
+def touch(path, content='# generator\n'):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def wait_for(watcher, timeout=10):
+    # wait() blocks until something changes; give up instead of hanging
+    result = []
+    thread = threading.Thread(target=lambda: result.append(watcher.wait()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert result, "watcher saw no change"
+    return result[0]
+
+
+@pytest.mark.parametrize('kind', ['polling', 'inotify'])
+def test_watchers_report_only_generator_modules(tmp_path, kind):
+    if kind == 'inotify' and not sys.platform.startswith('linux'):
+        pytest.skip("inotify is Linux only")
+    touch(tmp_path / 'script_1.py')
+    # An old mtime, so the edit below changes it even on a coarse clock
+    os.utime(tmp_path / 'script_1.py', ns=(0, 0))
+    watcher = PollingWatcher(str(tmp_path), interval=0.01) if kind == 'polling' else InotifyWatcher(str(tmp_path))
+    try:
+        touch(tmp_path / 'notes.txt')
+        touch(tmp_path / 'script_1.py', '# edited generator\n')
+        touch(tmp_path / 'script_2.py')
+        assert wait_for(watcher) == {'script_1.py', 'script_2.py'}
+    finally:
+        watcher.close()
+
+
+def test_regenerate_writes_only_that_modules_files(tmp_path):
+    written, skipped = regenerate('script_6.py', root=str(tmp_path))
+    expected = collect(load_module(os.path.join(REPO_DIR, 'script_6.py')).GENERATORS)
+    assert sorted(written) == sorted(expected) and skipped == []
+    assert sorted(os.path.relpath(os.path.join(directory, name), tmp_path)
+                  for directory, _, names in os.walk(tmp_path) for name in names
+                  if not name.startswith('.')) == sorted(expected)
+    written, skipped = regenerate('script_6.py', root=str(tmp_path))
+    assert written == [] and sorted(skipped) == sorted(expected)
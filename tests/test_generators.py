@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+from generate_all import discover_modules, load_module, render_all
+
+
+@pytest.mark.parametrize('path', discover_modules(), ids=os.path.basename)
+def test_generators_return_rendered_files_without_writing(path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    module = load_module(path, reload=True)
+    assert module.GENERATORS
+    for generator in module.GENERATORS.values():
+        files = generator(None)
+        assert files and all(isinstance(rel_path, str) and isinstance(content, str)
+                             for rel_path, content in files.items())
+        assert generator(None) == files
+    assert os.listdir(tmp_path) == []
+
+
+def test_artifact_paths_are_unique_and_relative():
+    paths = []
+    for path in discover_modules():
+        for generator in load_module(path).GENERATORS.values():
+            paths += list(generator(None))
+    assert len(paths) == len(set(paths)) == len(render_all())
+    assert not any(os.path.isabs(rel_path) or '..' in rel_path.split('/') for rel_path in paths)
+
+
+def test_configuration_changes_the_rendered_sources():
+    default = render_all()
+    configured = render_all({'primaryModel': 'claude3', 'chunkSize': 256})
+    assert set(configured) == set(default)
+    changed = [rel_path for rel_path in default if configured[rel_path] != default[rel_path]]
+    assert changed
+    assert any('claude3' in configured[rel_path] for rel_path in changed)
+    assert any('256' in configured[rel_path] for rel_path in changed)
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from prompt_refiner.incremental import IncrementalEncoding
+from prompt_refiner.tokenizer import default_tokenizer
+
+ALPHABET = "abc xyz_ 123 .,!?'\n\té日🚀"
+
+
+def random_edits(rng, text, count):
+    for _ in range(count):
+        offset = rng.randint(0, len(text))
+        deleted = rng.randint(0, min(5, len(text) - offset))
+        inserted = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 6)))
+        text = text[:offset] + inserted + text[offset + deleted:]
+        yield offset, deleted, inserted, text
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_matches_full_encoding(seed):
+    tokenizer = default_tokenizer()
+    rng = random.Random(seed)
+    text = "I'll refine this prompt: snake_case names, 3.14 numbers, and   spaces.\n\nDone!"
+    encoding = IncrementalEncoding(tokenizer, text)
+    for offset, deleted, inserted, text in random_edits(rng, text, 300):
+        encoding.edit(offset, deleted, inserted)
+        assert encoding.text == text
+        assert list(encoding.ids) == list(tokenizer.encode(text))
+        assert sum(encoding.piece_lengths) == len(text)
+        assert sum(encoding.piece_tokens) == encoding.count
+
+
+def test_contractions_relexed_across_the_edit():
+    tokenizer = default_tokenizer()
+    encoding = IncrementalEncoding(tokenizer, "we will go")
+    encoding.edit(2, 5, "'ll")
+    assert list(encoding.ids) == list(tokenizer.encode("we'll go"))
+
+
+def test_edit_outside_text_rejected():
+    encoding = IncrementalEncoding(default_tokenizer(), "abc")
+    with pytest.raises(ValueError):
+        encoding.edit(2, 5)
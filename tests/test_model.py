@@ -0,0 +1,116 @@
+import threading
+
+import numpy as np
+import pytest
+
+from prompt_refiner.kv_cache import PagedKVCache
+from prompt_refiner.model import DecoderModel, KVCache, KVCacheFull, ModelConfig
+
+CONFIG = ModelConfig(vocab_size=300, d_model=32, n_layers=2, n_heads=4, d_ff=64, max_seq_len=64)
+
+
+@pytest.fixture(scope='module')
+def model():
+    return DecoderModel.random(CONFIG, seed=1)
+
+
+def test_forward_rejects_empty_ids(model):
+    with pytest.raises(ValueError, match="at least one token"):
+        model.forward([], KVCache(CONFIG))
+    with pytest.raises(ValueError):
+        model.generate([], 4)
+
+
+def test_decode_batch_rejects_mismatched_caches(model):
+    with pytest.raises(ValueError, match="one cache per token"):
+        model.decode_batch([], [])
+    with pytest.raises(ValueError, match="one cache per token"):
+        model.decode_batch([1, 2], [KVCache(CONFIG)])
+
+
+def test_forward_rejects_sequences_past_max_seq_len(model):
+    with pytest.raises(ValueError, match="max_seq_len"):
+        model.forward(list(range(CONFIG.max_seq_len + 1)), KVCache(CONFIG, CONFIG.max_seq_len + 1))
+
+
+def test_random_weights_are_deterministic():
+    a = DecoderModel.random(CONFIG, seed=3)
+    b = DecoderModel.random(CONFIG, seed=3)
+    assert all(np.array_equal(a.weights[name], b.weights[name]) for name in a.weights)
+
+
+PROMPT = [5, 17, 42, 7, 99, 3, 250, 11]
+
+
+def full_recompute_generate(model, prompt, new_tokens):
+    # Greedy decoding without reusing a cache: every step reruns the prefix
+    ids = list(prompt)
+    for _ in range(new_tokens):
+        logits = model.forward(ids, KVCache(CONFIG))
+        ids.append(int(logits[-1].argmax()))
+    return ids[len(prompt):]
+
+
+def test_cached_decoding_matches_full_recompute(model):
+    cache = KVCache(CONFIG)
+    logits = [model.forward(PROMPT[:3], cache)]
+    for token in PROMPT[3:]:
+        logits.append(model.forward([token], cache))
+    stepped = np.concatenate(logits)
+    assert np.allclose(stepped, model.forward(PROMPT, KVCache(CONFIG)), atol=1e-4)
+    assert model.generate(PROMPT, 12) == full_recompute_generate(model, PROMPT, 12)
+
+
+def test_truncate_then_redecode_matches(model):
+    cache = KVCache(CONFIG)
+    model.forward(PROMPT, cache)
+    cache.truncate(5)
+    assert np.allclose(model.forward(PROMPT[5:], cache), model.forward(PROMPT, KVCache(CONFIG))[5:], atol=1e-4)
+
+
+def test_paged_cache_matches_contiguous(model):
+    expected = model.generate(PROMPT, 16)
+    paged = DecoderModel(CONFIG, model.weights)
+    paged.kv_pool = PagedKVCache(CONFIG, num_pages=8, page_size=4)
+    assert paged.generate(PROMPT, 16) == expected
+    assert paged.kv_pool.stats().pages_used == 0
+
+
+def test_paged_pool_runs_dry():
+    paged = DecoderModel.random(CONFIG, seed=1)
+    paged.kv_pool = PagedKVCache(CONFIG, num_pages=2, page_size=4)
+    with pytest.raises(KVCacheFull):
+        paged.generate(PROMPT, 8)
+
+
+def test_decode_batch_matches_single_steps(model):
+    prompts = [PROMPT, PROMPT[:3], PROMPT[2:7]]
+    caches = [KVCache(CONFIG) for _ in prompts]
+    tokens = [int(model.forward(prompt, cache)[-1].argmax()) for prompt, cache in zip(prompts, caches)]
+    batched = model.decode_batch(tokens, caches)
+    for row, prompt, token in zip(batched, prompts, tokens):
+        single = model.forward(prompt + [token], KVCache(CONFIG))[-1]
+        assert np.allclose(row, single, atol=1e-4)
+
+
+def test_paged_pool_is_consistent_under_threads():
+    pool = PagedKVCache(CONFIG, num_pages=64, page_size=4)
+
+    def worker():
+        for _ in range(300):
+            sequence = pool.new_sequence()
+            sequence.reserve(9)
+            sequence.advance(9)
+            sequence.truncate(4)
+            sequence.free()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        pool.stats()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    assert (stats.pages_used, stats.sequences) == (0, 0)
+    assert sorted(pool._free) == list(range(64))
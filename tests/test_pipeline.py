@@ -0,0 +1,62 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from prompt_refiner.__main__ import SAMPLE_PROMPTS
+from prompt_refiner.config import LLMConfiguration
+from prompt_refiner.model import DecoderModel, ModelConfig
+from prompt_refiner.pipeline import RefinementPipeline
+from prompt_refiner.services import LLMService
+from prompt_refiner.tokenizer import default_tokenizer
+
+PROMPTS = [SAMPLE_PROMPTS[i % len(SAMPLE_PROMPTS)] + f" #{i}" for i in range(12)]
+
+
+def tiny_model(seed, d_model=32, n_layers=2):
+    config = ModelConfig(vocab_size=default_tokenizer().vocab_size, d_model=d_model, n_layers=n_layers, n_heads=4,
+                         d_ff=2 * d_model, max_seq_len=512)
+    return DecoderModel.random(config, seed)
+
+
+@pytest.fixture(scope='module')
+def local_service():
+    configuration = LLMConfiguration()
+    local_models = {configuration.primary_model: tiny_model(1, 48, 3), configuration.secondary_model: tiny_model(2)}
+    return configuration, LLMService(configuration, local_models, draft_tokens=3)
+
+
+def summary(result):
+    return result.enhanced_text, result.output, result.token_count, [step.status for step in result.steps]
+
+
+def test_refine_batch_across_processes_matches_sequential():
+    pipeline = RefinementPipeline()
+    sequential = pipeline.refine_batch(PROMPTS)
+    parallel = pipeline.refine_batch(PROMPTS, jobs=2, chunksize=4)
+    assert [summary(result) for result in parallel] == [summary(result) for result in sequential]
+
+
+def test_refine_batch_across_processes_with_local_models(local_service):
+    configuration, service = local_service
+    pipeline = RefinementPipeline(configuration, service)
+    results = pipeline.refine_batch(PROMPTS[:4], jobs=2, chunksize=1)
+    assert [summary(result) for result in results] == [summary(pipeline.refine(prompt)) for prompt in PROMPTS[:4]]
+    assert all(result.metrics.speculative_acceptance is not None for result in results)
+
+
+def test_llm_service_pickles(local_service):
+    _, service = local_service
+    service.process_with_primary_model("warm the decoder up")
+    clone = pickle.loads(pickle.dumps(service))
+    assert clone.process_with_primary_model("Create a story").content == \
+        service.process_with_primary_model("Create a story").content
+
+
+def test_concurrent_primary_calls_keep_their_own_speculative_stats(local_service):
+    _, service = local_service
+    prompts = ["Explain quantization " * n for n in range(1, 9)]
+    expected = [service.process_with_primary_model(prompt).acceptance_rate for prompt in prompts]
+    with ThreadPoolExecutor(4) as threads:
+        rates = list(threads.map(lambda prompt: service.process_with_primary_model(prompt).acceptance_rate, prompts))
+    assert rates == expected
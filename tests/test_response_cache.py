@@ -0,0 +1,111 @@
+import os
+import pickle
+
+import pytest
+
+from prompt_refiner.config import LLMConfiguration
+from prompt_refiner.models import LLMResponse
+from prompt_refiner.pipeline import RefinementPipeline
+from prompt_refiner.response_cache import ResponseCache
+from prompt_refiner.services import LLMService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def response(content):
+    return LLMResponse(content=content, model='GPT-4', token_count=1, processing_time=0.1)
+
+
+def test_keys_ignore_unicode_form_and_whitespace():
+    assert ResponseCache.key("café  au\nlait", 'GPT-4') == ResponseCache.key("café au lait", 'GPT-4')
+    assert ResponseCache.key("prompt", 'GPT-4') != ResponseCache.key("prompt", 'Claude-3')
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl=10, clock=clock)
+    cache.put('a', response('A'))
+    cache.put('b', response('B'))
+    assert cache.get('a').content == 'A'
+    cache.put('c', response('C'))
+    assert cache.get('b') is None
+    clock.now += 11
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.expirations) == (1, 2, 1, 1)
+
+
+def test_spill_file_survives_reopen_and_pickling(tmp_path):
+    path = str(tmp_path / 'responses.db')
+    cache = ResponseCache(max_entries=1, path=path)
+    cache.put('a', response('A'))
+    cache.put('b', response('B'))
+    assert cache.get('a').content == 'A'
+    assert cache.stats().disk_hits == 1
+
+    clone = pickle.loads(pickle.dumps(cache))
+    clone.put('c', response('C'))
+    cache.close()
+    clone.close()
+    reopened = ResponseCache(path=path)
+    assert [reopened.get(key).content for key in 'abc'] == ['A', 'B', 'C']
+    reopened.close()
+
+
+def test_memory_hits_keep_entries_on_disk(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, path=str(tmp_path / 'responses.db'), disk_entries=2, clock=clock)
+    cache.put('hot', response('H'))
+    clock.now += 1
+    cache.put('cold', response('C'))
+    clock.now += 1
+    assert cache.get('hot').content == 'H'  # served from memory
+    clock.now += 1
+    cache.put('new', response('N'))  # trims the spill file to two rows
+    cache.close()
+    reopened = ResponseCache(path=str(tmp_path / 'responses.db'))
+    assert reopened.get('hot').content == 'H'
+    assert reopened.get('cold') is None
+    reopened.close()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs os.fork")
+def test_forked_child_opens_its_own_connection(tmp_path):
+    cache = ResponseCache(max_entries=1, path=str(tmp_path / 'responses.db'))
+    cache.put('a', response('A'))
+    parent_db = cache._db
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = cache._db is not parent_db and cache.get('a').content == 'A'
+            cache.put('b', response('B'))
+            cache.close()
+            os.write(write, b'1' if ok else b'0')
+        finally:
+            os._exit(0)
+    os.close(write)
+    assert os.read(read, 1) == b'1'
+    os.waitpid(pid, 0)
+    assert cache._db is parent_db
+    assert cache.get('b').content == 'B'
+    cache.close()
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_refine_batch_with_a_spill_file(tmp_path, jobs):
+    configuration = LLMConfiguration()
+    cache = ResponseCache(path=str(tmp_path / 'responses.db'))
+    pipeline = RefinementPipeline(configuration, LLMService(configuration, response_cache=cache))
+    prompts = ["Create a story about AI", "Explain caching"] * 4
+    first = pipeline.refine_batch(prompts, jobs=jobs, chunksize=2)
+    second = pipeline.refine_batch(prompts, jobs=jobs, chunksize=2)
+    assert [result.output for result in second] == [result.output for result in first]
+    assert all(result.from_cache for result in second)
+    cache.close()
@@ -0,0 +1,52 @@
+import pytest
+
+from prompt_refiner.config import LLMConfiguration, OptimizationLevel
+from prompt_refiner.scaffold import CompiledScaffold, compile_scaffold, nest, unwrap, unwrap_levels
+from prompt_refiner.services import LLMService, OptimizationService, PromptService
+from prompt_refiner.tokenizer import default_tokenizer
+
+TASKS = ["Create a story about AI", "ends with space ", "", "Multi\n\nparagraph task.", "snake_case_task"]
+
+
+@pytest.mark.parametrize('task', TASKS)
+def test_wrap_matches_encoding_the_whole_text(task):
+    tokenizer = default_tokenizer()
+    scaffold = compile_scaffold(OptimizationLevel.BALANCED)
+    text, ids = scaffold.wrap(task)
+    assert text == scaffold.render(task)
+    assert list(ids) == list(tokenizer.encode(text))
+    assert scaffold.count(task) == len(ids)
+
+
+@pytest.mark.parametrize('task', [task for task in TASKS if task])
+def test_unwrap_recovers_nested_task(task):
+    scaffold = compile_scaffold(OptimizationLevel.BALANCED)
+    nested = scaffold.render(scaffold.render(task))
+    assert unwrap(nested)[0] == task
+    assert unwrap(task) == (task, ())
+
+
+@pytest.mark.parametrize('task', TASKS)
+@pytest.mark.parametrize('depth', [1, 2, 3])
+def test_nesting_tokens_match_counting_the_nested_text(task, depth):
+    scaffold = compile_scaffold(OptimizationLevel.BALANCED)
+    nested = task
+    for level in range(depth):
+        nested = LLMService().parse_with_secondary_model(nested) if level % 2 else scaffold.render(nested)
+    bare, levels = unwrap_levels(nested)
+    assert nest(bare, levels) == nested
+    assert scaffold.nesting_tokens(levels, bare) == scaffold.count(nested) - scaffold.count(bare)
+
+
+def test_enhance_prompt_does_not_tokenize_the_nested_prompt(monkeypatch):
+    service = PromptService(LLMService(), OptimizationService(LLMConfiguration()))
+    parsed = service.parse_with_secondary_model("Warm up the nesting cache")
+    expected = service.enhance_prompt(parsed).scaffold_tokens_saved
+    assert expected > 0
+
+    def count(self, task, tokenizer=None):
+        raise AssertionError("counted the whole prompt")
+
+    monkeypatch.setattr(CompiledScaffold, 'count', count)
+    enhanced = service.enhance_prompt(service.parse_with_secondary_model("Create a story about AI"))
+    assert enhanced.scaffold_tokens_saved == expected
@@ -0,0 +1,60 @@
+import pytest
+
+from prompt_refiner.kv_cache import PagedKVCache
+from prompt_refiner.model import DecoderModel, ModelConfig
+from prompt_refiner.speculative import SpeculativeDecoder, SpeculativeStats
+
+TARGET = ModelConfig(vocab_size=300, d_model=48, n_layers=3, n_heads=4, d_ff=96, max_seq_len=128)
+DRAFT = ModelConfig(vocab_size=300, d_model=32, n_layers=2, n_heads=4, d_ff=64, max_seq_len=128)
+PROMPTS = [[1], [5, 17, 42, 7, 99, 3], list(range(10, 40))]
+
+
+@pytest.fixture(scope='module')
+def models():
+    return DecoderModel.random(TARGET, seed=1), DecoderModel.random(DRAFT, seed=2)
+
+
+@pytest.mark.parametrize('draft_tokens', [1, 2, 4, 7])
+@pytest.mark.parametrize('new_tokens', [1, 2, 13])
+def test_speculative_matches_greedy(models, draft_tokens, new_tokens):
+    target, draft = models
+    decoder = SpeculativeDecoder(target, draft, draft_tokens)
+    for prompt in PROMPTS:
+        assert decoder.generate(prompt, new_tokens) == target.generate(prompt, new_tokens)
+
+
+def test_self_drafting_accepts_everything(models):
+    target, _ = models
+    decoder = SpeculativeDecoder(target, target, 4)
+    stats = SpeculativeStats()
+    assert decoder.generate(PROMPTS[1], 17, stats) == target.generate(PROMPTS[1], 17)
+    assert stats.acceptance_rate == 1.0
+    assert stats.generated == 16
+
+
+def test_stats_go_to_the_given_object(models):
+    target, draft = models
+    decoder = SpeculativeDecoder(target, draft, 3)
+    stats = SpeculativeStats()
+    decoder.generate(PROMPTS[2], 10, stats)
+    assert decoder.stats == SpeculativeStats()
+    assert stats.rounds > 0 and stats.generated == 9
+    assert stats.accepted <= stats.drafted
+
+
+def test_speculative_on_paged_caches(models):
+    target, draft = models
+    paged_target = DecoderModel(TARGET, target.weights)
+    paged_target.kv_pool = PagedKVCache(TARGET, num_pages=16, page_size=8)
+    paged_draft = DecoderModel(DRAFT, draft.weights)
+    paged_draft.kv_pool = PagedKVCache(DRAFT, num_pages=16, page_size=8)
+    decoder = SpeculativeDecoder(paged_target, paged_draft, 4)
+    assert decoder.generate(PROMPTS[2], 20) == target.generate(PROMPTS[2], 20)
+    assert paged_target.kv_pool.stats().pages_used == 0
+
+
+def test_mismatched_vocabularies_rejected(models):
+    target, _ = models
+    other = DecoderModel.random(ModelConfig(vocab_size=301, d_model=32, n_layers=1, n_heads=4, d_ff=64), seed=3)
+    with pytest.raises(ValueError, match="vocabulary"):
+        SpeculativeDecoder(target, other)
@@ -0,0 +1,69 @@
+import pytest
+
+import swift_templates
+from swift_templates import DEFAULT_CONFIGURATION, compile_template, render, template_params
+
+
+@pytest.mark.parametrize('source, values, expected', [
+    # A block placeholder indents every line of its value like itself
+    ("struct A {\n    {{body}}\n}\n", {'body': 'let a = 1\nlet b = 2'}, "struct A {\n    let a = 1\n    let b = 2\n}\n"),
+    # Blank lines inside a block stay blank, without trailing spaces
+    ("struct A {\n    {{body}}\n}\n", {'body': 'a\n\nb'}, "struct A {\n    a\n\n    b\n}\n"),
+    # An empty block drops its whole line
+    ("struct A {\n    {{body}}\n}\n", {'body': ''}, "struct A {\n}\n"),
+    # Blocks at the very start and directly after another block
+    ("{{a}}\n{{b}}\nend", {'a': '', 'b': 'B'}, "B\nend"),
+    ("{{a}}\n  {{b}}\nend", {'a': 'A1\nA2', 'b': 'B1\nB2'}, "A1\nA2\n  B1\n  B2\nend"),
+    # Inline placeholders are substituted as they are
+    ("let x = {{v}}\n", {'v': '1\n2'}, "let x = 1\n2\n"),
+    ("  {{v}} + 1\n", {'v': ''}, "   + 1\n"),
+    ("{{a}}{{b}}\n", {'a': 'x', 'b': 'y'}, "xy\n"),
+])
+def test_template_rendering(source, values, expected):
+    assert compile_template(source).render(values) == expected
+
+
+def test_templates_are_compiled_once():
+    source = "let value = {{v}}\n"
+    assert compile_template(source) is compile_template(source)
+
+
+def test_missing_parameter_names_the_placeholder():
+    with pytest.raises(KeyError, match="missing template parameter 'body'"):
+        compile_template("{{ body }}").render({})
+
+
+def test_params_expand_the_configuration():
+    values = template_params({'primaryModel': 'claude3', 'chunkSize': 256, 'useNPU': False, 'npuDelay': 0.25})
+    assert values['primaryModelName'] == 'Claude-3'
+    assert (values['chunkSize'], values['useNPU']) == ('256', 'false')
+    assert (values['npuDelay'], values['npuDelayNs']) == ('0.25', '250_000_000')
+    assert template_params() is template_params(dict(DEFAULT_CONFIGURATION))
+
+
+@pytest.mark.parametrize('config, message', [
+    ({'primaryModel': 'gpt5'}, "unknown model 'gpt5'"),
+    ({'chunk_size': 256}, "unknown configuration key"),
+])
+def test_bad_configurations_are_rejected(config, message):
+    with pytest.raises(ValueError, match=message):
+        template_params(config)
+
+
+def test_unhashable_values_are_not_cached():
+    assert template_params({'profile': 'benchmark', 'chunkSize': 64.0})['chunkSize'] == '64'
+    with pytest.raises(TypeError):
+        template_params({'chunkSize': [64]})
+
+
+def test_params_cache_is_bounded():
+    for size in range(swift_templates._PARAMS_CACHE_SIZE * 2):
+        template_params({'chunkSize': size})
+    assert len(swift_templates._params) == swift_templates._PARAMS_CACHE_SIZE
+
+
+def test_fragments_follow_the_profile():
+    source = "func run() {\n    {{work}}\n}\n"
+    fragments = {'work': {'app': 'sleep({{stepDelay}})', 'benchmark': ''}}
+    assert render(source, fragments=fragments) == "func run() {\n    sleep(0.1)\n}\n"
+    assert render(source, {'profile': 'benchmark'}, fragments) == "func run() {\n}\n"
@@ -0,0 +1,71 @@
+import pytest
+
+from prompt_refiner.tokenizer import PATTERN, BPETokenizer, default_tokenizer
+from prompt_refiner.tokenizer_mmap import DEFAULT_ARTIFACT_PATH, MappedBPETokenizer, compile_artifact
+
+SAMPLES = [
+    "",
+    "Create a story about AI",
+    "snake_case_name = __init__(self, _private)",
+    "  leading and trailing spaces  \n\n\ttabs\r\n",
+    "Numbers 1234567890 and symbols !@#$%^&*()[]{}<>~`|\\/?",
+    "Unicode: café, naïve, 日本語, emoji 🚀🔥, combining é",
+    "x" * 500 + "!" * 300 + "1" * 200,
+]
+
+
+@pytest.fixture(scope='module')
+def json_tokenizer():
+    return BPETokenizer.load()
+
+
+@pytest.fixture(scope='module')
+def mapped_tokenizer():
+    tokenizer = MappedBPETokenizer(DEFAULT_ARTIFACT_PATH)
+    yield tokenizer
+    tokenizer.close()
+
+
+@pytest.mark.parametrize('text', SAMPLES)
+def test_encode_decode_round_trip(json_tokenizer, text):
+    ids = json_tokenizer.encode(text)
+    assert json_tokenizer.decode(ids) == text
+    assert json_tokenizer.count(text) == len(ids)
+
+
+def test_pre_tokenizer_keeps_underscores(json_tokenizer):
+    # The pattern once had no alternative matching '_', so findall skipped
+    # underscores and they vanished from the encoding
+    text = "a_b __dunder__ _"
+    assert ''.join(json_tokenizer._split(text)) == text
+    assert json_tokenizer.decode(json_tokenizer.encode(text)) == text
+
+
+@pytest.mark.parametrize('text', SAMPLES)
+def test_mapped_tokenizer_matches_json(json_tokenizer, mapped_tokenizer, text):
+    assert list(mapped_tokenizer.encode(text)) == list(json_tokenizer.encode(text))
+    assert mapped_tokenizer.decode(mapped_tokenizer.encode(text)) == text
+
+
+def test_compiled_artifact_round_trips(json_tokenizer, tmp_path):
+    path = str(tmp_path / 'bpe.bin')
+    compile_artifact(json_tokenizer, path)
+    mapped = MappedBPETokenizer(path)
+    try:
+        assert mapped.pattern == PATTERN
+        assert mapped.vocab_size == json_tokenizer.vocab_size
+        for token_id in range(mapped.vocab_size):
+            assert mapped.token_to_id(mapped.vocab[token_id]) == token_id
+    finally:
+        mapped.close()
+
+
+def test_batch_matches_single(json_tokenizer):
+    ids, offsets = json_tokenizer.encode_batch(SAMPLES)
+    for i, text in enumerate(SAMPLES):
+        assert list(ids[offsets[i]:offsets[i + 1]]) == list(json_tokenizer.encode(text))
+    assert list(json_tokenizer.count_batch(SAMPLES)) == [len(json_tokenizer.encode(text)) for text in SAMPLES]
+
+
+def test_default_tokenizer_is_shared():
+    assert default_tokenizer() is default_tokenizer()